@@ -1,16 +1,99 @@
 # main.py
+# The launcher imports no window module up front: each one (and with it
+# qrcode/PIL, NumPy, QtCharts and the schema setup in database.db) is loaded
+# the first time its button is used. Once the launcher has painted, a
+# background job prewarms the likely-next subsystems so that first click is quick.
+# Each window is built once and kept: reopening raises it and refreshes only
+# what changed, so carts, loaded models and pending edits survive.
+import importlib
+import multiprocessing
+from datetime import datetime
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
 from PySide6.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget
-from cashier.ui import CashierWindow      # from cashier folder
-from database.stock import StockWindow     # from database folder
-from data_entry.ui import DataEntryWindow # from data_entry folder
-from reports.ui import ReportsWindow       # from reports folder
 
+# Window class per launcher button, as (module, class name)
+WINDOWS = {
+    "cashier": ("cashier.ui", "CashierWindow"),
+    "stock": ("database.stock", "StockWindow"),
+    "data_entry": ("data_entry.ui", "DataEntryWindow"),
+    "reports": ("reports.ui", "ReportsWindow"),
+}
+
+# Window modules imported by the prewarm job, most likely first
+PREWARM_ORDER = ("cashier", "stock", "reports", "data_entry")
+
+
+def window_class(name):
+    """Import the window module for `name` (once) and return its window class."""
+    module, cls = WINDOWS[name]
+    return getattr(importlib.import_module(module), cls)
+
+
+def _prewarm_database():
+    # Importing database.db creates/migrates the schema; reading the catalog
+    # pulls the products table into the OS page cache for the first window
+    from database.queries import get_stock
+    get_stock()
+
+
+def _prewarm_today_report():
+    from reports.cache import report_cache
+    report_cache.load(datetime.now().strftime("%Y-%m-%d"))
+
+
+class PrewarmSignals(QObject):
+    finished = Signal(float)    # seconds spent
+
+
+class PrewarmJob(QRunnable):
+    """Import and warm subsystems in the background, cheapest-to-need first.
+
+    Every step is best-effort: a failure only means the first use pays for it.
+    Python's import lock makes a click on a module still being imported wait
+    for it rather than import it twice.
+    """
 
-class Launcher(QMainWindow):
     def __init__(self):
+        super().__init__()
+        self.cancelled = False
+        self.signals = PrewarmSignals()
+        # The launcher keeps the reference; the pool must not delete it under Python
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def steps(self):
+        yield _prewarm_database
+        for name in PREWARM_ORDER:
+            yield lambda name=name: window_class(name)
+        yield _prewarm_today_report
+
+    def run(self):
+        started = datetime.now()
+        for step in self.steps():
+            if self.cancelled:
+                return
+            try:
+                step()
+            except Exception:
+                continue
+        self.signals.finished.emit((datetime.now() - started).total_seconds())
+
+
+class Launcher(QMainWindow):
+    # Emitted once, after the launcher has painted for the first time
+    first_painted = Signal()
+
+    def __init__(self, prewarm=True):
         super().__init__()
         self.setWindowTitle("Launcher")
         self.setFixedSize(300, 250)
+        self.painted = False
+        self.prewarm_job = None
+        self.windows = {}   # name -> the one open instance
+        if prewarm:
+            self.first_painted.connect(self.start_prewarm)
 
         layout = QVBoxLayout()
 
@@ -34,23 +117,63 @@ class Launcher(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            # Let this paint reach the screen before anything else runs
+            QTimer.singleShot(0, self.first_painted.emit)
+
+    def start_prewarm(self):
+        if self.prewarm_job is None:
+            self.prewarm_job = PrewarmJob()
+            QThreadPool.globalInstance().start(self.prewarm_job)
+
+    def open_window(self, name):
+        """Show the window for `name`, building it on first use.
+
+        Reopening a window (closed windows are only hidden) refreshes it
+        instead of building a new one, then brings it to the front.
+        """
+        # Imported on first click, not before the launcher's first paint
+        from database.diagnostics import run_profiled
+        return run_profiled("open_window", self._show_window, name)
+
+    def _show_window(self, name):
+        window = self.windows.get(name)
+        if window is None:
+            window = self.windows[name] = window_class(name)()
+        else:
+            window.refresh()
+        if window.isMinimized():
+            window.showNormal()
+        else:
+            window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
     def open_cashier(self):
-        self.cashier_window = CashierWindow()
-        self.cashier_window.show()
+        self.open_window("cashier")
 
     def open_stock(self):
-        self.stock_window = StockWindow()
-        self.stock_window.show()
+        self.open_window("stock")
 
     def open_data_entry(self):
-        self.data_window = DataEntryWindow()
-        self.data_window.show()
+        self.open_window("data_entry")
 
     def open_reports(self):
-        self.reports_window = ReportsWindow()
-        self.reports_window.show()
+        self.open_window("reports")
+
+    def closeEvent(self, event):
+        """Stop prewarming; the remaining steps would only delay exit."""
+        if self.prewarm_job is not None:
+            self.prewarm_job.cancel()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
+    # Needed for the report process pools in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     app = QApplication([])
     launcher = Launcher()
     launcher.show()
@@ -0,0 +1,115 @@
+# benchmarks/archive.py
+# Checks that compacting closed days into the columnar archive (JSON removed)
+# and rebuilding the rollups leaves every day's summary and report unchanged,
+# on a synthetic store in a temporary folder, and that archived amounts keep
+# their JSON types (175000 stays an int). Exits 1 on any difference.
+# Run from the project root: python -m benchmarks.archive [--days 10]
+import argparse
+import json
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from benchmarks.store import generate_store, use_store
+
+STORE_PARAMS = {"products": 300, "colors": 3, "sizes": 3, "history_days": 10,
+                "log_per_day": 20, "sales_per_day": 40}
+
+ROUND_TRIP_DAY = "2026-01-15"
+
+
+def _round_trip_report():
+    """A day whose money columns are all-int, all-float, mixed and partly missing."""
+    def item(pid, quantity, unit_price):
+        return {"product_id": pid, "product_name": f"Item {pid}", "code": str(pid), "color": None,
+                "size": "M", "quantity": quantity, "unit_price": unit_price, "line_total": quantity * unit_price}
+
+    sales = [
+        {"timestamp": "09:00:00", "transaction_id": 1, "invoice_number": "INV/20260115/001",
+         "cashier": "Ana", "payment_method": "Cash", "amount_paid": 200000, "change": 25000,
+         "items": [item(1, 1, 175000)], "subtotal": 175000, "tax": 21000.0, "total": 196000.0},
+        {"timestamp": "09:05:00", "transaction_id": 2, "invoice_number": "INV/20260115/002",
+         "cashier": None, "payment_method": None, "amount_paid": None, "change": None,
+         "items": [item(2, 2, 12.5), item(3, 1, 80000)], "subtotal": 80025.0, "tax": 9603.0, "total": 89628.0},
+    ]
+    return {"date": ROUND_TRIP_DAY, "store": {"name": "Test"}, "sales": sales,
+            "summary": {"total_sales": 255025.0, "total_tax": 30603.0, "total_revenue": 285628.0,
+                        "total_units_sold": 4, "transaction_count": 2}}
+
+
+def check_round_trip():
+    """Return a list of problems found archiving a hand-made day and reading it back."""
+    from database.archive import compact_day, load_archived_report, verify_archived_day
+
+    problems = []
+    report = _round_trip_report()
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(Path(tmp) / f"sales_{ROUND_TRIP_DAY}.json", 'w') as f:
+            json.dump(report, f, indent=2)
+        result = compact_day(ROUND_TRIP_DAY, tmp)
+        if not result["success"]:
+            return [f"round trip: compact failed: {result['error']}"]
+        if not verify_archived_day(ROUND_TRIP_DAY, tmp).get("match"):
+            problems.append("round trip: verify_archived_day reports a mismatch")
+        loaded = load_archived_report(ROUND_TRIP_DAY, tmp)["report"]
+        # json.dumps tells 175000 from 175000.0, which == does not
+        if json.dumps(loaded, sort_keys=True) != json.dumps(report, sort_keys=True):
+            problems.append(f"round trip: report changed: {json.dumps(loaded['sales'])}")
+    return problems
+
+
+def check_compact_rebuild(days=10, seed=1):
+    """Return a list of problems found after compact -> rebuild_rollups."""
+    from database.archive import compact_closed_days
+    from database.reports import get_daily_report
+    from database.rollups import get_daily_summary, rebuild_rollups
+
+    problems = []
+    # Reaching back into the previous month makes the rebuild clear whole
+    # months that hold only archived days
+    today = date.today()
+    first = today - timedelta(days=days - 1)
+    day_strs = [(first + timedelta(days=i)).isoformat() for i in range(days)]
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_store(tmp):
+            generate_store(tmp, seed=seed, report_days=days, today=today, **STORE_PARAMS)
+            before = {day: (get_daily_summary(day), get_daily_report(day)["report"]) for day in day_strs}
+
+            results = compact_closed_days(before=today.isoformat(), remove_json=True)
+            problems += [f"{day}: compact failed: {r['error']}" for day, r in results.items() if not r["success"]]
+            if len(results) != days - 1:
+                problems.append(f"compacted {len(results)} days, expected {days - 1}")
+
+            # A single archived day, then everything, as the CLI does
+            for start, end in ((day_strs[0], day_strs[0]), (None, None)):
+                rebuilt = rebuild_rollups(start, end)
+                if not rebuilt["success"]:
+                    problems.append(f"rebuild_rollups({start}, {end}) failed: {rebuilt['error']}")
+                    continue
+                for day in day_strs:
+                    summary, report = before[day]
+                    if get_daily_summary(day) != summary:
+                        problems.append(f"rebuild({start}, {end}): summary of {day} changed: "
+                                        f"{summary} -> {get_daily_summary(day)}")
+                    loaded = get_daily_report(day)
+                    if not loaded["success"] or json.dumps(loaded["report"]["sales"]) != json.dumps(report["sales"]):
+                        problems.append(f"rebuild({start}, {end}): report of {day} changed")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that archiving days keeps their rollups")
+    parser.add_argument("--days", type=int, default=10, help="Days of sales files, today included")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    problems = check_compact_rebuild(args.days, args.seed) + check_round_trip()
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} problems" if problems else
+          "compact -> rebuild_rollups: summaries unchanged; archived values keep their types")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
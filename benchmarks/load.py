@@ -0,0 +1,249 @@
+# benchmarks/load.py
+# Multi-lane checkout load simulator. Each lane is a separate process driving
+# its own CartManager through scan -> checkout -> log_sale against one shared
+# synthetic store (db file and reports/ folder), the way several registers
+# share a store. Levels of 1..N lanes run back to back on fresh stores and
+# report throughput, latency percentiles, "database is locked" errors, sale
+# entries lost or duplicated in the daily report files, and report files left
+# unreadable.
+# Run from the project root: python -m benchmarks.load [--lanes 1,2,4,8,16]
+#                            [--seconds 10] [--output load.json]
+import argparse
+import json
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from benchmarks.store import generate_store, use_store
+
+# Store each level runs against: a day of sales already logged, short history
+STORE_PARAMS = {"products": 2000, "colors": 4, "sizes": 5, "history_days": 30,
+                "log_per_day": 100, "report_days": 1, "sales_per_day": 100}
+
+# Share of scans that go to the best-selling HOT_SHARE of products
+HOT_SCANS = 0.5
+HOT_SHARE = 0.05
+
+# Seconds allowed for every lane to start before the clock runs
+START_DELAY = 1.0
+
+MARKER_PREFIX = "lane"
+
+
+def _is_locked(error):
+    return "locked" in str(error).lower()
+
+
+def _error_kind(error):
+    # Group errors that only differ in numbers (JSON offsets, product ids, counts)
+    return re.sub(r"\d+", "N", str(error))[:80]
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_lane(folder, lane, start_at, seconds, seed, think_ms=0):
+    """Drive one register until the level's time is up (runs in a worker process).
+
+    Every sale is logged with a unique marker as the cashier name, so the
+    report files can be checked for lost and duplicated entries afterwards.
+    """
+    with use_store(folder):
+        from cashier.logic import CartManager
+        from database.reports import log_sale
+
+        rng = random.Random(seed * 1000 + lane)
+        cart = CartManager()
+        ids = sorted(cart.products_by_code, key=int)
+        hot = ids[:max(1, int(len(ids) * HOT_SHARE))]
+        stats = {"lane": lane, "attempts": 0, "latencies_ms": [], "logged": [], "units_logged": 0,
+                 "locked_errors": 0, "checkout_errors": 0, "log_errors": 0, "errors": Counter()}
+
+        time.sleep(max(0.0, start_at - time.time()))
+        end = start_at + seconds
+        seq = 0
+        while time.time() < end:
+            seq += 1
+            marker = f"{MARKER_PREFIX}{lane:02d}-{seq:06d}"
+            t0 = time.perf_counter()
+            cart.clear_cart()
+            for _ in range(rng.randint(1, 4)):
+                cart.scan_code(rng.choice(hot) if rng.random() < HOT_SCANS else rng.choice(ids))
+            if not cart.get_cart():
+                continue
+            stats["attempts"] += 1
+            totals = cart.get_totals()
+            result = cart.checkout()
+            if not result["success"]:
+                stats["checkout_errors"] += 1
+                stats["locked_errors"] += _is_locked(result["error"])
+                stats["errors"][_error_kind(result["error"])] += 1
+                continue
+            logged = log_sale(result["receipt"], {
+                "cashier_name": marker, "payment_method": "Cash",
+                "amount_paid": totals["total"], "change": 0
+            })
+            if logged["success"]:
+                stats["latencies_ms"].append((time.perf_counter() - t0) * 1000)
+                stats["logged"].append(marker)
+                stats["units_logged"] += totals["unit_count"]
+            else:
+                stats["log_errors"] += 1
+                stats["locked_errors"] += _is_locked(logged["error"])
+                stats["errors"][_error_kind(logged["error"])] += 1
+            if think_ms:
+                time.sleep(think_ms / 1000)
+        stats["errors"] = dict(stats["errors"])
+        return stats
+
+
+def _store_state(folder, since_log_id=None):
+    """Return (max stock_log id, units sold in stock_log after `since_log_id`)."""
+    conn = sqlite3.connect(Path(folder) / "db")
+    try:
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM stock_log").fetchone()[0]
+        sold = 0
+        if since_log_id is not None:
+            # Sales are logged as negative quantities
+            sold = conn.execute("SELECT -COALESCE(SUM(quantity), 0) FROM stock_log "
+                                "WHERE id > ? AND action = 'sale'", (since_log_id,)).fetchone()[0]
+        return max_id, sold
+    finally:
+        conn.close()
+
+
+def _report_entries(folder):
+    """Return (the run's sale entries, daily files that no longer parse).
+
+    Entries are the ones with a lane marker as cashier; a file that is not
+    valid JSON counts as corrupt and contributes no entries.
+    """
+    entries = []
+    corrupt = 0
+    for path in sorted((Path(folder) / "reports").glob("sales_*.json")):
+        try:
+            with open(path, 'r') as f:
+                report = json.load(f)
+        except json.JSONDecodeError:
+            corrupt += 1
+            continue
+        entries += [s for s in report.get("sales", []) if str(s.get("cashier") or "").startswith(MARKER_PREFIX)]
+    return entries, corrupt
+
+
+def _sequence_gaps(folder):
+    """Count transaction ids missing from each day's 1..N run, over every readable report."""
+    gaps = 0
+    for path in sorted((Path(folder) / "reports").glob("sales_*.json")):
+        try:
+            with open(path, 'r') as f:
+                report = json.load(f)
+        except json.JSONDecodeError:
+            continue
+        ids = {s.get("transaction_id") for s in report.get("sales", [])}
+        gaps += max(ids, default=0) - len(ids)
+    return gaps
+
+
+def run_level(lanes, seconds, seed=1, think_ms=0, store_params=None):
+    """Run `lanes` registers for `seconds` on a fresh store and check the results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_store(tmp):
+            generate_store(tmp, seed=seed, **(store_params or STORE_PARAMS))
+        log_id, _ = _store_state(tmp)
+
+        start_at = time.time() + START_DELAY + 0.05 * lanes
+        with ProcessPoolExecutor(max_workers=lanes) as pool:
+            futures = [pool.submit(run_lane, tmp, lane, start_at, seconds, seed, think_ms)
+                       for lane in range(lanes)]
+            lane_stats = [future.result() for future in futures]
+        elapsed = max(seconds, time.time() - start_at)
+
+        entries, corrupt_reports = _report_entries(tmp)
+        sequence_gaps = _sequence_gaps(tmp)
+        _, units_sold = _store_state(tmp, log_id)
+
+    in_files = Counter(entry["cashier"] for entry in entries)
+    logged = [marker for stats in lane_stats for marker in stats["logged"]]
+    invoices = Counter(entry.get("invoice_number") for entry in entries)
+    latencies = sorted(ms for stats in lane_stats for ms in stats["latencies_ms"])
+    units_in_files = sum(item.get("quantity", 0) for entry in entries for item in entry.get("items", []))
+    errors = Counter()
+    for stats in lane_stats:
+        errors.update(stats["errors"])
+    return {
+        "lanes": lanes,
+        "seconds": round(elapsed, 2),
+        "attempts": sum(stats["attempts"] for stats in lane_stats),
+        "sales": len(logged),
+        "tps": round(len(logged) / elapsed, 2),
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None
+        },
+        "locked_errors": sum(stats["locked_errors"] for stats in lane_stats),
+        "checkout_errors": sum(stats["checkout_errors"] for stats in lane_stats),
+        "log_errors": sum(stats["log_errors"] for stats in lane_stats),
+        # Reported as logged by log_sale but missing from every report file
+        "lost_entries": sum(1 for marker in logged if marker not in in_files),
+        "duplicated_entries": sum(count - 1 for count in in_files.values() if count > 1),
+        "duplicate_invoices": sum(count - 1 for number, count in invoices.items() if count > 1),
+        "corrupt_reports": corrupt_reports,
+        # Transaction ids skipped in a day's report (0 with INVOICE_BLOCK_SIZE = 1)
+        "sequence_gaps": sequence_gaps,
+        # Units taken off stock that no report entry accounts for
+        "unreported_units": units_sold - units_in_files,
+        "errors": dict(errors.most_common(10))
+    }
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate several registers checking out against one store")
+    parser.add_argument("--lanes", default="1,2,4,8,16", help="Comma-separated lane counts to run")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each level")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between sales per lane")
+    parser.add_argument("--products", type=int, default=STORE_PARAMS["products"])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.lanes.split(",") if n.strip()]
+    params = dict(STORE_PARAMS, products=args.products)
+    print(f"{'lanes':>5} {'sales':>7} {'tps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'locked':>7} {'errors':>7} {'lost':>6} {'dup':>5} {'dupinv':>6} {'unrep':>6} {'corrupt':>7}")
+    results = []
+    for lanes in levels:
+        level = run_level(lanes, args.seconds, args.seed, args.think_ms, params)
+        results.append(level)
+        latency = level["latency_ms"]
+        print(f"{lanes:>5} {level['sales']:>7} {level['tps']:>8.1f} {_ms(latency['p50']):>8} "
+              f"{_ms(latency['p95']):>8} {_ms(latency['p99']):>8} {level['locked_errors']:>7} "
+              f"{level['checkout_errors'] + level['log_errors']:>7} {level['lost_entries']:>6} "
+              f"{level['duplicated_entries']:>5} {level['duplicate_invoices']:>6} {level['unreported_units']:>6} "
+              f"{level['corrupt_reports']:>7}")
+        for error, count in level["errors"].items():
+            print(f"      {count:>6} x {error}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"seconds": args.seconds, "think_ms": args.think_ms, "store": params,
+                       "levels": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
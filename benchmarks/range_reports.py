@@ -0,0 +1,87 @@
+# benchmarks/range_reports.py
+# Times date-range reporting over a year of synthetic daily report files.
+# Run from the project root: python -m benchmarks.range_reports
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from database.range_reports import get_range_report
+
+PAYMENT_METHODS = ["Cash", "QRIS", "Debit", "Credit Card"]
+CASHIERS = ["ani", "budi", "citra", "dewi"]
+
+
+def write_synthetic_days(folder, start, days, sales_per_day, products=200, seed=1):
+    """Write `days` consecutive sales_YYYY-MM-DD.json files into `folder`."""
+    rng = random.Random(seed)
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        sales = []
+        for txn in range(1, sales_per_day + 1):
+            items = []
+            for _ in range(rng.randint(1, 4)):
+                pid = rng.randint(1, products)
+                qty = rng.randint(1, 3)
+                price = float(rng.randint(10, 200) * 1000)
+                items.append({
+                    "product_id": pid, "product_name": f"product-{pid}", "code": f"PNY|{pid}",
+                    "color": "black", "size": "M", "quantity": qty,
+                    "unit_price": price, "line_total": qty * price
+                })
+            subtotal = sum(i["line_total"] for i in items)
+            tax = round(subtotal * 0.12, 2)
+            sales.append({
+                "timestamp": f"{9 + txn % 12:02d}:{txn % 60:02d}:00", "transaction_id": txn,
+                "invoice_number": f"INV/{day.replace('-', '')}/{txn:03d}",
+                "cashier": rng.choice(CASHIERS), "payment_method": rng.choice(PAYMENT_METHODS),
+                "amount_paid": subtotal + tax, "change": 0.0, "items": items,
+                "subtotal": subtotal, "tax": tax, "total": subtotal + tax
+            })
+        summary = {
+            "total_sales": sum(s["subtotal"] for s in sales),
+            "total_tax": sum(s["tax"] for s in sales),
+            "total_revenue": sum(s["total"] for s in sales),
+            "total_units_sold": sum(i["quantity"] for s in sales for i in s["items"]),
+            "transaction_count": len(sales)
+        }
+        report = {"date": day, "store": {}, "sales": sales, "summary": summary}
+        with open(Path(folder) / f"sales_{day}.json", 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+def _timed(label, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<32} {elapsed * 1000:9.1f} ms  (parsed={result['parsed']}, cached={result['cached']})")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark date-range reporting over synthetic daily files")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sales-per-day", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = date(2025, 1, 1)
+    end = (start + timedelta(days=args.days - 1)).isoformat()
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        write_synthetic_days(folder, start, args.days, args.sales_per_day)
+        print(f"{args.days} days x {args.sales_per_day} sales/day")
+
+        _timed("cold, serial", lambda: get_range_report(start.isoformat(), end, folder, max_workers=1, use_cache=False))
+        _timed("cold, process pool", lambda: get_range_report(start.isoformat(), end, folder, max_workers=args.workers))
+        _timed("warm, summary cache", lambda: get_range_report(start.isoformat(), end, folder, max_workers=args.workers))
+
+        # Touch one day: only that file should be parsed again
+        write_synthetic_days(folder, start + timedelta(days=10), 1, args.sales_per_day, seed=2)
+        _timed("one day changed", lambda: get_range_report(start.isoformat(), end, folder, max_workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
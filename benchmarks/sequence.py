@@ -0,0 +1,81 @@
+# benchmarks/sequence.py
+# Multi-process check of the invoice sequence. Lanes (separate processes) draw
+# numbers for one day from a shared temporary db at the same time, through
+# InvoiceAllocator. Every number must be unique. With block_size=1 they must
+# also run 1..N with no gaps. With larger blocks, a lane that stops mid-block
+# leaves the rest of its block unused, so only those gaps are allowed.
+# Exits 1 on any violation.
+# Run from the project root: python -m benchmarks.sequence [--lanes 8]
+#                            [--per-lane 200] [--block-sizes 1,10]
+import argparse
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.store import use_store
+
+DAY = "2026-01-15"
+
+# Seconds allowed for every lane to start before they all begin drawing
+START_DELAY = 1.0
+
+
+def draw_numbers(folder, start_at, count, block_size):
+    """Draw `count` invoice numbers for DAY in this process (runs in a worker)."""
+    with use_store(folder):
+        from database.sequence import InvoiceAllocator
+        allocator = InvoiceAllocator(block_size)
+        time.sleep(max(0.0, start_at - time.time()))
+        return [allocator.next(DAY)[0] for _ in range(count)]
+
+
+def check_sequence(lanes, per_lane, block_size):
+    """Run one level; return (numbers drawn per second, list of problems)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_store(tmp):
+            pass    # create the schema once, before the lanes race for it
+        start_at = time.time() + START_DELAY + 0.05 * lanes
+        with ProcessPoolExecutor(max_workers=lanes) as pool:
+            futures = [pool.submit(draw_numbers, tmp, start_at, per_lane, block_size) for _ in range(lanes)]
+            drawn = [future.result() for future in futures]
+        elapsed = max(time.time() - start_at, 1e-9)
+
+    problems = []
+    numbers = [n for lane in drawn for n in lane]
+    duplicates = {n: c for n, c in Counter(numbers).items() if c > 1}
+    if duplicates:
+        problems.append(f"{len(duplicates)} duplicated numbers, e.g. {sorted(duplicates)[:5]}")
+    for lane, lane_numbers in enumerate(drawn):
+        if lane_numbers != sorted(lane_numbers):
+            problems.append(f"lane {lane} drew numbers out of order")
+
+    missing = sorted(set(range(1, max(numbers) + 1)) - set(numbers))
+    # Each lane's last block is the only one it can leave partly unused
+    allowed = 0 if block_size == 1 else lanes * (block_size - 1)
+    if len(missing) > allowed:
+        problems.append(f"{len(missing)} gaps (at most {allowed} expected), e.g. {missing[:5]}")
+    return len(numbers) / elapsed, len(missing), problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check invoice numbers drawn by concurrent processes")
+    parser.add_argument("--lanes", type=int, default=8, help="Processes drawing at once")
+    parser.add_argument("--per-lane", type=int, default=200, help="Numbers each process draws")
+    parser.add_argument("--block-sizes", default="1,10", help="Comma-separated InvoiceAllocator block sizes")
+    args = parser.parse_args()
+
+    failed = False
+    for block_size in (int(n) for n in args.block_sizes.split(",") if n.strip()):
+        rate, gaps, problems = check_sequence(args.lanes, args.per_lane, block_size)
+        status = "ok" if not problems else "FAILED"
+        print(f"block_size {block_size:>4}: {args.lanes} lanes x {args.per_lane} numbers, "
+              f"{rate:8.1f} numbers/s, {gaps} unused  {status}")
+        for problem in problems:
+            print(f"    {problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/startup.py
+# Times launcher startup in fresh interpreters: time to first paint with lazy
+# window imports against importing every window up front (the old Main.py),
+# and the first Cashier open with and without background prewarming.
+# Run from the project root: python -m benchmarks.startup [--offscreen]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = (
+    ("lazy", "launcher first paint, lazy imports"),
+    ("eager", "launcher first paint, eager imports"),
+    ("open-cold", "first Cashier open, no prewarm"),
+    ("open-warm", "first Cashier open, after prewarm"),
+)
+
+
+def _child(scenario):
+    """Run one launcher in this process and report over stdout."""
+    from Main import Launcher, window_class, WINDOWS
+    if scenario == "eager":
+        for name in WINDOWS:
+            window_class(name)
+    from PySide6.QtWidgets import QApplication
+    app = QApplication([])
+    launcher = Launcher(prewarm=(scenario == "open-warm"))
+    result = {}
+
+    def open_cashier():
+        t0 = time.perf_counter()
+        launcher.open_cashier()
+        app.processEvents()
+        result["open_ms"] = (time.perf_counter() - t0) * 1000
+        app.quit()
+
+    def painted():
+        print("painted", flush=True)
+        if scenario == "open-cold":
+            open_cashier()
+        elif scenario == "open-warm":
+            launcher.prewarm_job.signals.finished.connect(open_cashier)
+        else:
+            app.quit()
+
+    launcher.first_painted.connect(painted)
+    launcher.show()
+    app.exec()
+    print(json.dumps(result), flush=True)
+
+
+def _run(scenario, env):
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.startup", "--child", scenario],
+                            stdout=subprocess.PIPE, text=True, env=env)
+    paint_ms = None
+    result = {}
+    for line in proc.stdout:
+        if line.startswith("painted") and paint_ms is None:
+            paint_ms = (time.perf_counter() - t0) * 1000
+        elif line.startswith("{"):
+            result = json.loads(line)
+    proc.wait()
+    return paint_ms, result.get("open_ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark launcher time-to-first-paint")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true", help="Use Qt's offscreen platform (no display needed)")
+    parser.add_argument("--child", choices=[s for s, _ in SCENARIOS], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child)
+        return
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    print(f"{args.runs} fresh interpreters per scenario (median / min)")
+    for scenario, label in SCENARIOS:
+        runs = [_run(scenario, env) for _ in range(args.runs)]
+        index = 1 if scenario.startswith("open") else 0
+        times = [r[index] for r in runs if r[index] is not None]
+        if not times:
+            print(f"{label:<40} failed")
+            continue
+        print(f"{label:<40} {statistics.median(times):9.1f} ms {min(times):9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+# benchmarks/store.py
+# Times the data layer against a deterministic synthetic store: products in
+# color/size variants, years of stock_log history and daily sales files, built
+# at several scales in a temporary folder (the real db and reports/ are never
+# touched). Results are written as JSON; --compare flags regressions against a
+# stored baseline run.
+# Run from the project root: python -m benchmarks.store [--scales small,medium]
+#                            [--output results.json] [--compare baseline.json]
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import database.db as db
+import database.reports as reports
+from config import TAX_RATE
+
+COLORS = ["black", "white", "navy", "red", "olive", "grey", "beige", "pink"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+GARMENTS = ["Shirt", "Blouse", "Dress", "Skirt", "Pants", "Jacket", "Hoodie", "Kaftan", "Tunic", "Cardigan"]
+PAYMENT_METHODS = ["Cash", "QRIS", "Debit", "Credit Card"]
+CASHIERS = ["ani", "budi", "citra", "dewi"]
+
+# products, colors and sizes per model, days of stock_log history, stock_log
+# rows per day, days of sales files (today included) and sales per day
+SCALES = {
+    "small": {"products": 500, "colors": 4, "sizes": 4, "history_days": 365,
+              "log_per_day": 50, "report_days": 7, "sales_per_day": 50},
+    "medium": {"products": 5000, "colors": 5, "sizes": 5, "history_days": 730,
+               "log_per_day": 300, "report_days": 30, "sales_per_day": 200},
+    "large": {"products": 50000, "colors": 8, "sizes": 6, "history_days": 1095,
+              "log_per_day": 1500, "report_days": 30, "sales_per_day": 1000},
+}
+
+# A benchmark regresses when its median is this much slower than the baseline...
+REGRESSION_THRESHOLD = 0.20
+# ...and slower by at least this many milliseconds (ignores timer noise)
+REGRESSION_MIN_MS = 0.05
+
+
+@contextmanager
+def use_store(folder):
+    """Point database.db and database.reports at `folder` for the duration."""
+    folder = Path(folder)
+    (folder / "reports").mkdir(parents=True, exist_ok=True)
+    saved = db.DB_PATH, reports.REPORTS_FOLDER
+    db.DB_PATH = folder / "db"
+    reports.REPORTS_FOLDER = folder / "reports"
+    try:
+        db.create_tables()
+        yield folder
+    finally:
+        db.DB_PATH, reports.REPORTS_FOLDER = saved
+
+
+def _products(rng, count, colors, sizes):
+    """Yield product rows (code, name, color, size, price, stock) as models x colors x sizes."""
+    made = 0
+    model = 0
+    while made < count:
+        model += 1
+        name = f"{rng.choice(GARMENTS)} {model:05d}"
+        price = rng.randint(5, 80) * 5000
+        for color in COLORS[:colors]:
+            for size in SIZES[:sizes]:
+                if made == count:
+                    return
+                made += 1
+                code = f"PNY|{name}|{color}|{size}|{made:012x}"
+                yield code, name, color, size, price, rng.randint(20, 200)
+
+
+def _stock_log(rng, product_count, history_days, log_per_day, today):
+    first = today - timedelta(days=history_days)
+    for offset in range(history_days):
+        day = (first + timedelta(days=offset)).isoformat()
+        for _ in range(log_per_day):
+            action = "restock" if rng.random() < 0.1 else "sale"
+            # Sales are logged as negative quantities, as sell_product does
+            quantity = rng.randint(10, 60) if action == "restock" else -rng.randint(1, 3)
+            seconds = rng.randint(9 * 3600, 21 * 3600)
+            yield (rng.randint(1, product_count), action, quantity,
+                   f"{day} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}")
+
+
+def _sale(rng, products, day, txn):
+    items = []
+    for product in rng.sample(products, rng.randint(1, 4)):
+        pid, code, name, color, size, price = product
+        quantity = rng.randint(1, 3)
+        items.append({
+            "product_id": pid, "product_name": name, "code": code, "color": color, "size": size,
+            "quantity": quantity, "unit_price": price, "line_total": quantity * price
+        })
+    subtotal = sum(i["line_total"] for i in items)
+    tax = round(subtotal * TAX_RATE, 2)
+    total = round(subtotal + tax, 2)
+    paid = -(-total // 50000) * 50000
+    seconds = 9 * 3600 + txn * 20
+    return {
+        "timestamp": f"{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}",
+        "transaction_id": txn,
+        "invoice_number": f"INV/{day.replace('-', '')}/{str(txn).zfill(3)}",
+        "cashier": rng.choice(CASHIERS), "payment_method": rng.choice(PAYMENT_METHODS),
+        "amount_paid": paid, "change": round(paid - total, 2), "items": items,
+        "subtotal": subtotal, "tax": tax, "total": total
+    }
+
+
+def _write_day(folder, rng, products, day, sales_per_day):
+    sales = [_sale(rng, products, day, txn) for txn in range(1, sales_per_day + 1)]
+    summary = {
+        "total_sales": sum(s["subtotal"] for s in sales),
+        "total_tax": sum(s["tax"] for s in sales),
+        "total_revenue": sum(s["total"] for s in sales),
+        "total_units_sold": sum(i["quantity"] for s in sales for i in s["items"]),
+        "transaction_count": len(sales)
+    }
+    report = {"date": day, "store": {}, "sales": sales, "summary": summary}
+    with open(Path(folder) / f"sales_{day}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def generate_store(folder, products=500, colors=4, sizes=4, history_days=365, log_per_day=50,
+                   report_days=7, sales_per_day=50, seed=1, today=None):
+    """Build a synthetic store in `folder` (db file plus reports/); same seed, same store.
+
+    Call inside use_store(folder). The last sales file is today's, so
+    log_sale() appends to a day of realistic size.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    conn = db.get_connection()
+    try:
+        conn.executemany(
+            "INSERT INTO products (code, name, color, size, price, stock) VALUES (?, ?, ?, ?, ?, ?)",
+            _products(rng, products, colors, sizes)
+        )
+        conn.executemany(
+            "INSERT INTO stock_log (product_id, action, quantity, timestamp) VALUES (?, ?, ?, ?)",
+            _stock_log(rng, products, history_days, log_per_day, today)
+        )
+        conn.commit()
+        catalog = conn.execute("SELECT id, code, name, color, size, price FROM products").fetchall()
+    finally:
+        conn.close()
+
+    first = today - timedelta(days=report_days - 1)
+    for offset in range(report_days):
+        _write_day(Path(folder) / "reports", rng, catalog, (first + timedelta(days=offset)).isoformat(),
+                   sales_per_day)
+    from database.rollups import rebuild_rollups
+    rebuild_rollups(first.isoformat(), today.isoformat())
+    return {"products": len(catalog), "stock_log": history_days * log_per_day, "report_days": report_days}
+
+
+def _measure(fn, repeat):
+    fn()    # warm-up: first-call caches and one-off work are not what is measured
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return {
+        "median_ms": round(statistics.median(times), 4),
+        "min_ms": round(min(times), 4),
+        "max_ms": round(max(times), 4),
+        "runs": repeat
+    }
+
+
+def _receipt(product_rows):
+    items = {p["id"]: {"product": p, "quantity": 1, "price": p["price"]} for p in product_rows}
+    subtotal = sum(p["price"] for p in product_rows)
+    tax = round(subtotal * TAX_RATE, 2)
+    return {"items": items, "totals": {"subtotal": subtotal, "tax": tax, "total": subtotal + tax,
+                                       "item_count": len(items), "unit_count": len(items)}}
+
+
+def run_benchmarks(scale, repeat):
+    """Return {benchmark name: timings} for the store currently in use."""
+    from database.queries import get_stock, get_stock_log, sell_product, restock_product
+    from cashier.logic import CartManager
+    today = date.today().isoformat()
+    rng = random.Random(2)
+    ids = [p.id for p in get_stock()]
+    pick = lambda: rng.choice(ids)
+    heavy = max(3, repeat // 5)
+
+    results = {}
+    results["get_stock"] = _measure(get_stock, heavy)
+    results["get_stock_log(product)"] = _measure(lambda: get_stock_log(pick()), repeat)
+    results["get_stock_log(all)"] = _measure(get_stock_log, max(3, repeat // 10))
+    results["sell_product"] = _measure(lambda: sell_product(pick(), 1), repeat)
+    results["restock_product"] = _measure(lambda: restock_product(pick(), 1), repeat)
+
+    results["CartManager()"] = _measure(CartManager, heavy)
+    cart = CartManager()
+
+    def scan():
+        cart.clear_cart()
+        for _ in range(3):
+            cart.scan_code(str(pick()))
+    results["CartManager.scan_code x3"] = _measure(scan, repeat)
+
+    def checkout():
+        scan()
+        cart.checkout()
+    results["CartManager.checkout (3 items)"] = _measure(checkout, repeat)
+
+    products = [p._asdict() for p in get_stock()[:3]]
+    receipt = _receipt(products)
+    metadata = {"cashier_name": "bench", "payment_method": "Cash", "amount_paid": receipt["totals"]["total"],
+                "change": 0}
+    results["log_sale"] = _measure(lambda: reports.log_sale(receipt, metadata), heavy)
+    results["export_daily_csv"] = _measure(lambda: reports.export_daily_csv(today), heavy)
+    results["generate_report_text"] = _measure(lambda: reports.generate_report_text(today), heavy)
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, min_ms=REGRESSION_MIN_MS):
+    """Return [(scale, benchmark, baseline ms, current ms, ratio, regressed)] for shared entries."""
+    rows = []
+    for scale, benchmarks in results["scales"].items():
+        base = baseline.get("scales", {}).get(scale, {}).get("results", {})
+        for name, timing in benchmarks["results"].items():
+            if name not in base:
+                continue
+            old, new = base[name]["median_ms"], timing["median_ms"]
+            ratio = new / old if old else float("inf")
+            regressed = ratio > 1 + threshold and new - old > min_ms
+            rows.append((scale, name, old, new, ratio, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data layer on a synthetic store")
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per benchmark (heavy ones run fewer)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Slowdown ratio counted as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "scales": {}
+    }
+    for scale in scales:
+        params = SCALES[scale]
+        with tempfile.TemporaryDirectory() as tmp, use_store(tmp):
+            t0 = time.perf_counter()
+            store = generate_store(tmp, seed=args.seed, **params)
+            print(f"[{scale}] {store['products']} products, {store['stock_log']} stock_log rows, "
+                  f"{store['report_days']} days x {params['sales_per_day']} sales "
+                  f"(generated in {time.perf_counter() - t0:.1f}s)")
+            timings = run_benchmarks(scale, args.repeat)
+        for name, timing in timings.items():
+            print(f"  {name:<34} {timing['median_ms']:10.3f} ms  (min {timing['min_ms']:.3f})")
+        results["scales"][scale] = {"params": params, "results": timings}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        print(f"\nAgainst {args.compare} (regression: >{args.threshold:.0%} slower)")
+        for scale, name, old, new, ratio, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"  [{scale}] {name:<34} {old:10.3f} -> {new:10.3f} ms  x{ratio:5.2f}  {flag}")
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
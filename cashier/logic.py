@@ -1,5 +1,5 @@
 # cashier/logic.py
-from database.queries import get_stock, sell_product
+from database.queries import get_stock, sell_product, get_catalog_version, get_catalog_changes
 from config import TAX_RATE
 
 class CartManager:
@@ -7,28 +7,48 @@ class CartManager:
     
     def __init__(self):
         self.cart = {}  # {product_id: {"product": product_data, "quantity": qty, "price": unit_price}}
+        self.removed_items = []  # names of cart lines dropped by the last refresh_products()
         self.products_by_code = self._load_products_by_code()
     
     def _load_products_by_code(self):
         """Load all products indexed by ID for quick lookup (testing phase)."""
+        # Taken first, so changes made while loading are picked up by the next refresh
+        self.catalog_version = get_catalog_version()
         products = get_stock()
         by_id = {}
         for product in products:
-            # products: id, code, name, color, size, price, discount, stock
-            product_id, code, name, color, size, price, discount, stock = product
-            by_id[str(product_id)] = {
-                "id": product_id,
-                "code": code,
-                "name": name,
-                "color": color,
-                "size": size,
-                "price": price,
-                "discount": discount,
-                "stock": stock
-            }
+            # ProductRow: id, code, name, color, size, price, discount, stock
+            by_id[str(product.id)] = product._asdict()
         self.products_by_id = by_id
         return by_id
     
+    def refresh_products(self):
+        """Apply product changes made since the last load; the cart is kept.
+
+        Cart lines of changed products get the new product data (stock, name)
+        but keep their unit price. Lines whose product was deleted are dropped
+        and their names left in `removed_items` for the cashier. Returns the
+        number of changed products, or None when everything was reloaded.
+        """
+        changes = get_catalog_changes(self.catalog_version)
+        if changes["reload"]:
+            self.products_by_code = self._load_products_by_code()
+            changed = None
+        else:
+            for product in changes["rows"]:
+                self.products_by_id[str(product.id)] = product._asdict()
+            self.catalog_version = changes["version"]
+            changed = len(changes["rows"])
+        self.removed_items = []
+        for product_id, item in list(self.cart.items()):
+            product = self.products_by_id.get(str(product_id))
+            if product is not None:
+                item["product"] = product
+            else:
+                self.removed_items.append(item["product"]["name"])
+                del self.cart[product_id]
+        return changed
+
     def scan_code(self, code, unit_price=0.0):
         """Add product to cart by scanning ID (testing phase uses product ID)."""
         if code not in self.products_by_code:
@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, Q
 from PySide6.QtCore import Qt, QTimer
 from cashier.logic import CartManager
 from database.reports import log_sale
+from database.diagnostics import profiled
 from config import STORE_NAME, STORE_ADDRESS, CONTACT_NUMBER, TAX_RATE, TAX_INCLUSIVE
 
 class CashierWindow(QMainWindow):
@@ -16,6 +17,18 @@ class CashierWindow(QMainWindow):
         
         self.cart_manager = CartManager()
         self.init_ui()
+
+    def refresh(self):
+        """Pick up product changes made elsewhere, keeping the cart."""
+        changed = self.cart_manager.refresh_products()
+        removed = self.cart_manager.removed_items
+        if (changed != 0 and self.cart_manager.get_cart()) or removed:
+            self.update_cart_display()
+            self.update_totals()
+        if removed:
+            message = f"Removed from the cart (product deleted): {', '.join(removed)}"
+            self.details_text.setText(f"<span style='color: red;'>{message}</span>")
+            QMessageBox.warning(self, "Cart Changed", message)
     
     def init_ui(self):
         """Initialize the cashier UI."""
@@ -276,6 +289,7 @@ class CashierWindow(QMainWindow):
             self.update_totals()
             self.details_text.setText("Cart cleared")
 
+    @profiled("checkout")
     def checkout(self):
         """Process checkout."""
         if not self.cart_manager.get_cart():
@@ -369,8 +383,9 @@ class CashierWindow(QMainWindow):
         dlg = ReceiptDialog(receipt_html, parent=self)
         dlg.exec()
 
-        # Reset display
+        # Reset display; stock was just sold, so bring the catalog up to date
         self.cart_manager.clear_cart()
+        self.cart_manager.refresh_products()
         self.update_cart_display()
         self.update_totals()
         self.details_text.setText("Cart cleared. Ready for next customer.")
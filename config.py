@@ -8,3 +8,33 @@ CONTACT_NUMBER = "+62-812-3456-7890"
 TAX_RATE = 0.12
 # If True, prices include tax; otherwise tax is added on top
 TAX_INCLUSIVE = False
+
+# Invoice numbering
+# Numbers each register reserves from the shared sequence at a time. 1 keeps
+# invoice numbers gapless; larger blocks cut contention between registers but
+# numbers left in a block when a register closes are skipped.
+INVOICE_BLOCK_SIZE = 1
+
+# Reorder forecasting (see database/forecast.py)
+# Days of stock_log sales history used for demand forecasts
+FORECAST_HISTORY_DAYS = 90
+# Exponential smoothing factor; higher reacts faster to recent days
+FORECAST_SMOOTHING = 0.3
+# Supplier lead time; products with less cover than this are flagged for reorder
+REORDER_LEAD_TIME_DAYS = 7
+# Days of demand a reorder should bring stock up to
+REORDER_TARGET_COVER_DAYS = 30
+
+# Product search boxes
+# Milliseconds of typing pause before a search filter is applied
+SEARCH_DEBOUNCE_MS = 150
+
+# Diagnostics (see database/diagnostics.py); off unless switched on here or by
+# the POS_SQL_TRACE / POS_SLOW_QUERY_MS / POS_PROFILE environment variables
+# Log every SQL statement with its duration and call site to diagnostics/sql.log
+SQL_TRACE = False
+# Statements faster than this many milliseconds are not logged (0 logs all)
+SLOW_QUERY_MS = 0
+# UI actions to run under cProfile, e.g. ["checkout", "save_edits"]; stats go to
+# diagnostics/profiles/. Actions: open_window, checkout, save_edits, apply_restock
+PROFILE_ACTIONS = []
@@ -0,0 +1,234 @@
+# data_entry/labels.py
+# Printable label sheets: each label holds a product's QR code with its name,
+# color, size and price, laid out in a grid on A4 pages and written as one
+# multi-page PDF or a set of PNG sheets. QR codes are encoded in a process pool
+# a page at a time and only a few pages are in flight, so memory stays bounded
+# however many labels are printed.
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PySide6.QtCore import QObject, QRunnable, QMarginsF, QRectF, Qt, Signal
+from PySide6.QtGui import QFont, QFontMetrics, QImage, QPageSize, QPainter, QPdfWriter
+from data_entry.qr_cache import QR_BORDER, get_qr_png
+
+# Sheet layout: A4 at print resolution, LABEL_COLUMNS x LABEL_ROWS labels per page
+LABEL_DPI = 300
+LABEL_COLUMNS = 3
+LABEL_ROWS = 8
+PAGE_MARGIN_MM = 8
+LABEL_PADDING_MM = 2
+
+# Labels are printed larger than the on-screen preview, so encode at a larger box size
+LABEL_QR_BOX_SIZE = 8
+
+# Below this many labels a process pool costs more than it saves
+PARALLEL_LABEL_THRESHOLD = 200
+
+# Pages of QR codes queued per worker process
+PAGES_IN_FLIGHT_PER_WORKER = 2
+
+
+def render_label_codes(codes):
+    """Return label-size QR PNG bytes for each code (runs in worker processes)."""
+    return [get_qr_png(code, box_size=LABEL_QR_BOX_SIZE, border=QR_BORDER) for code in codes]
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def iter_label_pages(labels, max_workers=None):
+    """Yield (page labels, QR PNG bytes) for each sheet, in order.
+
+    `labels` is a sequence of product rows with `code`, `name`, `color`,
+    `size` and `price`. Pages are submitted to the pool lazily, at most a few
+    per worker ahead of the one being drawn.
+    """
+    pages = _chunks(labels, LABEL_COLUMNS * LABEL_ROWS)
+    if max_workers == 1 or len(labels) < PARALLEL_LABEL_THRESHOLD:
+        for page in pages:
+            yield page, render_label_codes([label.code for label in page])
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for page in pages:
+            pending.append((page, pool.submit(render_label_codes, [label.code for label in page])))
+            if len(pending) >= workers * PAGES_IN_FLIGHT_PER_WORKER:
+                page, future = pending.popleft()
+                yield page, future.result()
+        while pending:
+            page, future = pending.popleft()
+            yield page, future.result()
+    finally:
+        # Also reached when the caller stops early (cancel); drop queued pages
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class LabelSheetPainter:
+    """Draws label pages onto any paint device of the sheet's pixel size."""
+
+    def __init__(self, width, height):
+        px_per_mm = LABEL_DPI / 25.4
+        margin = PAGE_MARGIN_MM * px_per_mm
+        self.padding = LABEL_PADDING_MM * px_per_mm
+        self.cell_width = (width - 2 * margin) / LABEL_COLUMNS
+        self.cell_height = (height - 2 * margin) / LABEL_ROWS
+        self.margin = margin
+
+        # Point sizes are resolved against the device's DPI by QPainter
+        self.name_font = QFont()
+        self.name_font.setPointSizeF(9)
+        self.name_font.setBold(True)
+        self.detail_font = QFont()
+        self.detail_font.setPointSizeF(8)
+        self.code_font = QFont()
+        self.code_font.setPointSizeF(5.5)
+
+    def draw_page(self, painter, labels, pngs):
+        for index, (label, png) in enumerate(zip(labels, pngs)):
+            row, column = divmod(index, LABEL_COLUMNS)
+            cell = QRectF(self.margin + column * self.cell_width, self.margin + row * self.cell_height,
+                          self.cell_width, self.cell_height)
+            self.draw_label(painter, cell, label, png)
+
+    def draw_label(self, painter, cell, label, png):
+        painter.setPen(Qt.lightGray)
+        painter.drawRect(cell)
+        inner = cell.adjusted(self.padding, self.padding, -self.padding, -self.padding)
+
+        side = min(inner.height(), inner.width() / 2)
+        image = QImage.fromData(png, "PNG")
+        if not image.isNull():
+            painter.drawImage(QRectF(inner.left(), inner.top(), side, side), image)
+
+        text = QRectF(inner.left() + side + self.padding, inner.top(),
+                      inner.width() - side - self.padding, inner.height())
+        painter.setPen(Qt.black)
+        y = text.top()
+        lines = (
+            (self.name_font, label.name or ""),
+            (self.detail_font, " / ".join(v for v in (label.color, label.size) if v)),
+            (self.detail_font, f"{int(label.price or 0):,} IDR"),
+            (self.code_font, label.code or ""),
+        )
+        for font, value in lines:
+            painter.setFont(font)
+            metrics = QFontMetrics(font, painter.device())
+            if y + metrics.height() > text.bottom():
+                break
+            elided = metrics.elidedText(value, Qt.ElideRight, int(text.width()))
+            painter.drawText(QRectF(text.left(), y, text.width(), metrics.height()),
+                             Qt.AlignLeft | Qt.AlignVCenter, elided)
+            y += metrics.height() * 1.15
+
+
+def _a4_pixels():
+    size = QPageSize(QPageSize.A4).sizePoints()
+    return round(size.width() * LABEL_DPI / 72), round(size.height() * LABEL_DPI / 72)
+
+
+def write_label_sheets(labels, path, progress=None, is_cancelled=None, max_workers=None):
+    """Lay `labels` out on A4 sheets and write them to `path`.
+
+    A .pdf path gives one multi-page PDF; anything else is written as PNG
+    sheets named <stem>_001.png, <stem>_002.png, ... next to it. `progress`
+    is called with (labels done, total) after each page, and `is_cancelled`
+    is polled between pages. A cancelled or failed run leaves no files behind.
+    """
+    path = Path(path)
+    if not labels:
+        return {"success": False, "error": "No products to label"}
+    paths = []
+    result = _write_sheets(labels, path, paths, progress, is_cancelled, max_workers)
+    if not result["success"]:
+        # The writer and painter are gone with _write_sheets, so the files are closed
+        for written in paths:
+            Path(written).unlink(missing_ok=True)
+    return result
+
+
+def _write_sheets(labels, path, paths, progress, is_cancelled, max_workers):
+    """write_label_sheets without the cleanup; every file opened is added to `paths`."""
+    total = len(labels)
+    as_pdf = path.suffix.lower() == ".pdf"
+    width, height = _a4_pixels()
+    sheet = LabelSheetPainter(width, height)
+    done = 0
+    painter = QPainter()
+    try:
+        if as_pdf:
+            writer = QPdfWriter(str(path))
+            writer.setPageSize(QPageSize(QPageSize.A4))
+            writer.setPageMargins(QMarginsF(0, 0, 0, 0))
+            writer.setResolution(LABEL_DPI)
+            writer.setTitle("Product labels")
+            if not painter.begin(writer):
+                return {"success": False, "error": f"Cannot write {path}"}
+            paths.append(str(path))
+
+        for page_no, (page, pngs) in enumerate(iter_label_pages(labels, max_workers), start=1):
+            if is_cancelled and is_cancelled():
+                return {"success": False, "cancelled": True, "error": "Label printing cancelled"}
+            if as_pdf:
+                if page_no > 1:
+                    writer.newPage()
+                sheet.draw_page(painter, page, pngs)
+            else:
+                # Labels are black and white; grayscale keeps a 300 DPI sheet small
+                image = QImage(width, height, QImage.Format_Grayscale8)
+                image.setDotsPerMeterX(round(LABEL_DPI / 0.0254))
+                image.setDotsPerMeterY(round(LABEL_DPI / 0.0254))
+                image.fill(Qt.white)
+                painter.begin(image)
+                sheet.draw_page(painter, page, pngs)
+                painter.end()
+                page_path = path.with_name(f"{path.stem}_{page_no:03d}.png")
+                # Listed before saving, so a half-written sheet is cleaned up too
+                paths.append(str(page_path))
+                if not image.save(str(page_path), "PNG"):
+                    return {"success": False, "error": f"Cannot write {page_path}"}
+            done += len(page)
+            if progress:
+                progress(done, total)
+        return {"success": True, "labels": total, "pages": page_no, "paths": paths}
+    except Exception as e:
+        return {"success": False, "error": f"Error printing labels: {str(e)}"}
+    finally:
+        if painter.isActive():
+            painter.end()
+
+
+class LabelSheetSignals(QObject):
+    progress = Signal(int, int)     # labels done, total
+    finished = Signal(object)       # result dict
+
+
+class LabelSheetJob(QRunnable):
+    """Run write_label_sheets off the GUI thread."""
+
+    def __init__(self, labels, path, max_workers=None):
+        super().__init__()
+        self.labels = labels
+        self.path = path
+        self.max_workers = max_workers
+        self.cancelled = False
+        self.signals = LabelSheetSignals()
+        # The window keeps the reference; the pool must not delete it under Python
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        result = write_label_sheets(
+            self.labels, self.path,
+            progress=self.signals.progress.emit,
+            is_cancelled=lambda: self.cancelled,
+            max_workers=self.max_workers
+        )
+        self.signals.finished.emit(result)
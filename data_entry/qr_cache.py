@@ -0,0 +1,153 @@
+# data_entry/qr_cache.py
+# Rendered QR codes for the data entry screen. Pixmaps are kept in a bounded
+# in-memory LRU backed by PNG files on disk, keyed by a hash of the code and the
+# render settings, so a code is encoded once and selecting it again is a lookup.
+# Rows near the selection are encoded ahead of time on a worker thread.
+import hashlib
+import io
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+import qrcode
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QPixmap
+
+# Render settings; changing any of them gives new cache keys
+QR_BOX_SIZE = 4
+QR_BORDER = 2
+QR_RENDER_VERSION = 1
+
+QR_CACHE_FOLDER = Path(__file__).parent.parent / "qr_cache"
+MAX_CACHED_PIXMAPS = 256
+
+
+def qr_cache_key(code, box_size=QR_BOX_SIZE, border=QR_BORDER):
+    """Hash identifying one rendering of `code`."""
+    text = f"{QR_RENDER_VERSION}|{box_size}|{border}|{code}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def render_qr_png(code, box_size=QR_BOX_SIZE, border=QR_BORDER):
+    """Encode `code` as a QR code and return the PNG bytes."""
+    qr = qrcode.QRCode(box_size=box_size, border=border)
+    qr.add_data(code)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def get_qr_png(code, box_size=QR_BOX_SIZE, border=QR_BORDER, folder=None):
+    """Return PNG bytes for `code` from the disk cache, rendering and storing them on a miss."""
+    folder = Path(folder or QR_CACHE_FOLDER)
+    key = qr_cache_key(code, box_size, border)
+    # Two-level fan-out keeps directories small with large catalogues
+    path = folder / key[:2] / f"{key}.png"
+    try:
+        return path.read_bytes()
+    except OSError:
+        pass
+    data = render_qr_png(code, box_size, border)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is an optimisation; a read-only folder just means re-encoding
+        pass
+    return data
+
+
+class QrPrefetchSignals(QObject):
+    rendered = Signal(str, bytes)   # code, PNG bytes
+    done = Signal()
+
+
+class QrPrefetchJob(QRunnable):
+    """Render (or read from disk) PNGs for a batch of codes off the GUI thread."""
+
+    def __init__(self, codes):
+        super().__init__()
+        self.codes = codes
+        self.cancelled = False
+        self.signals = QrPrefetchSignals()
+        # The cache keeps the reference; the pool must not delete it under Python
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        for code in self.codes:
+            if self.cancelled:
+                break
+            try:
+                self.signals.rendered.emit(code, get_qr_png(code))
+            except Exception:
+                continue
+        self.signals.done.emit()
+
+
+class QrPixmapCache(QObject):
+    """LRU of QR pixmaps by code, filled on demand or by background prefetch.
+
+    QPixmaps can only be created on the GUI thread, so workers hand back PNG
+    bytes and the pixmap is built when they arrive.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_PIXMAPS, parent=None):
+        super().__init__(parent)
+        self.max_entries = max_entries
+        self.pixmaps = OrderedDict()
+        self.prefetch_job = None
+        # Superseded jobs may still be queued in the pool, so keep them until done
+        self.jobs = set()
+
+    def _store(self, code, pixmap):
+        self.pixmaps[code] = pixmap
+        self.pixmaps.move_to_end(code)
+        while len(self.pixmaps) > self.max_entries:
+            self.pixmaps.popitem(last=False)
+
+    def pixmap(self, code):
+        """Return the QR pixmap for `code`, or None if it cannot be rendered."""
+        pixmap = self.pixmaps.get(code)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(code)
+            return pixmap
+        try:
+            pixmap = QPixmap()
+            if not pixmap.loadFromData(get_qr_png(code), "PNG"):
+                return None
+        except Exception:
+            return None
+        self._store(code, pixmap)
+        return pixmap
+
+    def prefetch(self, codes):
+        """Render the codes not yet in memory on the thread pool, replacing any earlier prefetch."""
+        if self.prefetch_job is not None:
+            self.prefetch_job.cancel()
+        wanted = [code for code in dict.fromkeys(codes) if code and code not in self.pixmaps]
+        # Never prefetch more than fits, or the batch would evict itself
+        wanted = wanted[:self.max_entries // 2]
+        if not wanted:
+            self.prefetch_job = None
+            return
+        job = QrPrefetchJob(wanted)
+        job.signals.rendered.connect(self._on_rendered)
+        job.signals.done.connect(lambda: self.jobs.discard(job))
+        self.jobs.add(job)
+        self.prefetch_job = job
+        QThreadPool.globalInstance().start(job)
+
+    def _on_rendered(self, code, data):
+        if code in self.pixmaps:
+            return
+        pixmap = QPixmap()
+        if pixmap.loadFromData(data, "PNG"):
+            self._store(code, pixmap)
@@ -2,15 +2,19 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTableWidget, QTableWidgetItem, QPushButton, QInputDialog, QMessageBox,
-    QLabel, QFileDialog, QDialog, QLineEdit, QSpinBox, QFormLayout
+    QLabel, QFileDialog, QDialog, QLineEdit, QSpinBox, QFormLayout, QProgressDialog,
+    QAbstractItemView
 )
-from PySide6.QtGui import QPixmap
-from PySide6.QtCore import Qt
-import qrcode
-import io
-from PIL.ImageQt import ImageQt
+from PySide6.QtGui import QPixmap, QBrush, QColor
+from PySide6.QtCore import Qt, QTimer, QThreadPool
 import re
-from database.queries import add_product, get_stock
+from database.queries import (add_product, get_stock, update_products, get_catalog_version,
+                              get_catalog_changes, PRODUCT_COLUMNS)
+from database.search import ProductMatcher
+from database.diagnostics import profiled
+from data_entry.qr_cache import QrPixmapCache
+from data_entry.labels import LabelSheetJob
+from config import SEARCH_DEBOUNCE_MS
 
 
 class AddProductDialog(QDialog):
@@ -58,26 +62,59 @@ class AddProductDialog(QDialog):
             self.code_edit.text().strip() or None,
         )
 
+# Rows on each side of the selection whose QR codes are rendered in advance
+QR_PREFETCH_ROWS = 20
+
+# Table columns editable in edit mode: name, color, size, price, discount, stock
+EDITABLE_TABLE_COLUMNS = (2, 3, 4, 5, 6, 7)
+INTEGER_TABLE_COLUMNS = (5, 6, 7)
+DIRTY_CELL_BRUSH = QBrush(QColor("#fff3b0"))
+
+
+def _cell_text(col_idx, value):
+    # Ensure price and discount appear as integers without decimals
+    if col_idx in (5, 6) and isinstance(value, (int, float)):
+        return str(int(value))
+    return str(value)
+
+
 class DataEntryWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Data Entry / Admin")
         self.setGeometry(200, 200, 700, 400)
         self.all_products = []  # Store all products for filtering
+        self.matcher = ProductMatcher([])
+        self.visible_rows = None  # None: no rows hidden
+        self.qr_cache = QrPixmapCache(parent=self)
+        self.label_job = None
+        self.label_progress = None
+        # (row, column) of cells edited since the last load; originals stay in all_products
+        self.dirty_cells = set()
+
+        # Filter once typing pauses rather than on every keystroke
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.filter_products)
 
         self.layout = QVBoxLayout()
 
         # Table showing all products
         self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "Code", "Name", "Color", "Size", "Stock"])
+        # Columns follow PRODUCT_COLUMNS: id, code, name, color, size, price, discount, stock
+        self.table.setColumnCount(len(PRODUCT_COLUMNS))
+        self.table.setHorizontalHeaderLabels(["ID", "Code", "Name", "Color", "Size", "Price", "Discount", "Stock"])
+        # Edit mode switches the view's triggers rather than every item's flags
+        self.edit_triggers = self.table.editTriggers()
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.layout.addWidget(self.table)
         # Search bar
         search_layout = QHBoxLayout()
         search_layout.addWidget(QLabel("Search (ID/Code/Name):"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Type ID, Code, or Product Name...")
-        self.search_input.textChanged.connect(self.filter_products)
+        self.search_input.textChanged.connect(self.filter_timer.start)
         search_layout.addWidget(self.search_input)
         self.layout.addLayout(search_layout)
         # Buttons
@@ -110,6 +147,11 @@ class DataEntryWindow(QMainWindow):
         self.btn_download_qr.clicked.connect(self.download_qr)
         code_layout.addWidget(self.btn_download_qr)
 
+        self.btn_print_labels = QPushButton("Print Labels")
+        self.btn_print_labels.setToolTip("Label sheets for the selected products, or every listed product")
+        self.btn_print_labels.clicked.connect(self.print_labels)
+        code_layout.addWidget(self.btn_print_labels)
+
         self.layout.addLayout(code_layout)
 
         # Container
@@ -119,42 +161,106 @@ class DataEntryWindow(QMainWindow):
 
         self.load_products()
         self.table.itemSelectionChanged.connect(self.on_table_select)
+        self.table.itemChanged.connect(self.on_item_changed)
 
     def load_products(self):
+        # Taken first, so changes made while loading are picked up by the next refresh
+        self.catalog_version = get_catalog_version()
         self.all_products = get_stock()
+        self.matcher = ProductMatcher(self.all_products)
         self.display_products(self.all_products)
+        self.visible_rows = None
+        self.filter_products()
     
     def display_products(self, products):
-        self.table.setRowCount(0)
-        for row_idx, product in enumerate(products):
-            self.table.insertRow(row_idx)
-            for col_idx, value in enumerate(product):
-                # Ensure price and discount appear as integers without decimals
-                if col_idx in (5, 6) and isinstance(value, (int, float)):
-                    item = QTableWidgetItem(str(int(value)))
-                else:
-                    item = QTableWidgetItem(str(value))
-                # By default items are not editable; edit only when edit mode enabled
+        self.dirty_cells.clear()
+        # Filling the table is not an edit
+        self.table.blockSignals(True)
+        try:
+            self.table.setRowCount(0)
+            for row_idx, product in enumerate(products):
+                self.table.insertRow(row_idx)
+                self._set_row_items(row_idx, product)
+        finally:
+            self.table.blockSignals(False)
+
+    def _set_row_items(self, row_idx, product):
+        for col_idx, value in enumerate(product):
+            item = QTableWidgetItem(_cell_text(col_idx, value))
+            # ID and code are never editable; the rest only in edit mode
+            if col_idx not in EDITABLE_TABLE_COLUMNS:
                 item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                self.table.setItem(row_idx, col_idx, item)
+            self.table.setItem(row_idx, col_idx, item)
+
+    def refresh(self):
+        """Pick up product changes made elsewhere without rebuilding the table.
+
+        Edited cells keep their text and their original value, so saving them
+        still reports a conflict with the newer value.
+        """
+        changes = get_catalog_changes(self.catalog_version)
+        if changes["reload"]:
+            # Deletions need a full reload; with unsaved edits it waits for the save
+            if not self.dirty_cells:
+                self.load_products()
+            return
+        if not changes["rows"]:
+            return
+        position = {product.id: row for row, product in enumerate(self.all_products)}
+        dirty_columns = {}
+        for row, col in self.dirty_cells:
+            dirty_columns.setdefault(row, set()).add(col)
+        added = []
+        self.table.blockSignals(True)
+        try:
+            for product in changes["rows"]:
+                row = position.get(product.id)
+                if row is None:
+                    row = self.table.rowCount()
+                    self.table.insertRow(row)
+                    self._set_row_items(row, product)
+                    self.all_products.append(product)
+                    added.append(row)
+                    continue
+                keep = dirty_columns.get(row, ())
+                old = self.all_products[row]
+                product = product._replace(**{PRODUCT_COLUMNS[col]: old[col] for col in keep})
+                self.all_products[row] = product
+                for col, value in enumerate(product):
+                    if col not in keep:
+                        self.table.item(row, col).setText(_cell_text(col, value))
+        finally:
+            self.table.blockSignals(False)
+        self.catalog_version = changes["version"]
+        # New rows start out visible; let the current search decide
+        if added and self.visible_rows is not None:
+            self.visible_rows.update(added)
+        self.matcher = ProductMatcher(self.all_products)
+        self.filter_products()
 
     def filter_products(self):
-        """Filter products based on search query (ID, Code, or Name)."""
-        search_text = self.search_input.text().strip().lower()
-        if not search_text:
-            self.display_products(self.all_products)
+        """Filter products based on search query (ID, Code, or Name).
+
+        Every product stays in the table; only rows whose visibility changes
+        are shown or hidden.
+        """
+        self.filter_timer.stop()
+        hits = self.matcher.match(self.search_input.text())
+        visible = None if hits is None else set(hits)
+        if visible == self.visible_rows:
             return
-        
-        filtered = []
-        for product in self.all_products:
-            product_id, code, name, color, size, price, discount, stock = product
-            # Match ID, Code, or Name (case-insensitive)
-            if (str(product_id).lower().startswith(search_text) or
-                (code and code.lower().find(search_text) != -1) or
-                (name and name.lower().find(search_text) != -1)):
-                filtered.append(product)
-        
-        self.display_products(filtered)
+        shown = set(range(self.table.rowCount())) if self.visible_rows is None else self.visible_rows
+        target = set(range(self.table.rowCount())) if visible is None else visible
+        # Repainting after every toggled row would dominate the cost
+        self.table.setUpdatesEnabled(False)
+        try:
+            for row in shown - target:
+                self.table.setRowHidden(row, True)
+            for row in target - shown:
+                self.table.setRowHidden(row, False)
+        finally:
+            self.table.setUpdatesEnabled(True)
+        self.visible_rows = visible
 
     def add_product_ui(self):
         dialog = AddProductDialog(self)
@@ -203,62 +309,113 @@ class DataEntryWindow(QMainWindow):
         else:
             self.code_label.clear()
             self.btn_download_qr.setEnabled(False)
+        self.prefetch_qr_near(row)
+
+    def prefetch_qr_near(self, row):
+        """Queue QR rendering for the visible rows around `row`, nearest first."""
+        codes = []
+        above, below = row - 1, row + 1
+        while len(codes) < 2 * QR_PREFETCH_ROWS and (above >= 0 or below < self.table.rowCount()):
+            for r in (below, above):
+                if 0 <= r < self.table.rowCount() and not self.table.isRowHidden(r):
+                    item = self.table.item(r, 1)
+                    if item and item.text():
+                        codes.append(item.text())
+            above -= 1
+            below += 1
+        self.qr_cache.prefetch(codes)
 
     def toggle_edit_mode(self, enabled: bool):
-        # Enable editing for Name, Color, Size, Price, Discount, Stock columns (2,3,4,5,6,7)
-        count = self.table.rowCount()
-        for r in range(count):
-            for c in (2, 3, 4, 5, 6, 7):
-                item = self.table.item(r, c)
-                if item:
-                    if enabled:
-                        item.setFlags(item.flags() | Qt.ItemIsEditable)
-                    else:
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+        # Name, Color, Size, Price, Discount, Stock columns (2,3,4,5,6,7) are editable in edit mode
+        self.table.setEditTriggers(self.edit_triggers if enabled else QAbstractItemView.NoEditTriggers)
         self.btn_save_edits.setEnabled(enabled)
 
+    def on_item_changed(self, item):
+        """Track which cells differ from the loaded product, highlighting them."""
+        row, col = item.row(), item.column()
+        if col not in EDITABLE_TABLE_COLUMNS or row >= len(self.all_products):
+            return
+        dirty = item.text() != _cell_text(col, self.all_products[row][col])
+        if dirty == ((row, col) in self.dirty_cells):
+            return
+        self.table.blockSignals(True)
+        try:
+            if dirty:
+                self.dirty_cells.add((row, col))
+                item.setBackground(DIRTY_CELL_BRUSH)
+            else:
+                self.dirty_cells.discard((row, col))
+                item.setBackground(QBrush())
+        finally:
+            self.table.blockSignals(False)
+
+    @profiled("save_edits")
     def save_edits(self):
-        # Iterate through table rows and update changed rows
-        from database.queries import update_product
+        """Write the edited cells only, in one transaction, checking each against its original."""
+        edits = {}
+        cells = {}      # (product id, column name) -> (row, col)
+        settled = {}    # (row, col) -> value the cell should show afterwards
         errors = []
-        for r in range(self.table.rowCount()):
-            id_item = self.table.item(r, 0)
-            if not id_item:
-                continue
-            try:
-                pid = int(id_item.text())
-            except Exception:
-                continue
-            name_item = self.table.item(r, 2)
-            color_item = self.table.item(r, 3)
-            size_item = self.table.item(r, 4)
-            price_item = self.table.item(r, 5)
-            discount_item = self.table.item(r, 6)
-            stock_item = self.table.item(r, 7)
-            name = name_item.text() if name_item else None
-            color = color_item.text() if color_item else None
-            size = size_item.text() if size_item else None
-            try:
-                price = int(price_item.text()) if price_item else None
-            except Exception:
-                price = None
-            try:
-                discount = int(discount_item.text()) if discount_item else None
-            except Exception:
-                discount = None
-            try:
-                stock = int(stock_item.text()) if stock_item else None
-            except Exception:
-                stock = None
-            res = update_product(pid, name=name, color=color, size=size, stock=stock, price=price, discount=discount)
+        for row, col in sorted(self.dirty_cells):
+            product = self.all_products[row]
+            text = self.table.item(row, col).text().strip()
+            if col in INTEGER_TABLE_COLUMNS:
+                try:
+                    value = int(text)
+                except ValueError:
+                    errors.append(f"{product.id}: invalid {PRODUCT_COLUMNS[col]} '{text}'")
+                    settled[(row, col)] = product[col]
+                    continue
+            else:
+                value = text
+            edits.setdefault(product.id, {})[PRODUCT_COLUMNS[col]] = (product[col], value)
+            cells[(product.id, PRODUCT_COLUMNS[col])] = (row, col)
+            settled[(row, col)] = value
+
+        deleted = False
+        if edits:
+            res = update_products(edits)
             if not res.get("success"):
-                errors.append(f"{pid}: {res.get('error')}")
+                # Nothing was written; keep the edits so they can be fixed and saved again
+                QMessageBox.warning(self, "Update errors", res.get("error", "Unknown error"))
+                return
+            for conflict in res["conflicts"]:
+                cell = cells[(conflict["id"], conflict["column"])]
+                if conflict["deleted"]:
+                    deleted = True
+                    errors.append(f"{conflict['id']}: product was deleted")
+                else:
+                    settled[cell] = conflict["current"]
+                    errors.append(
+                        f"{conflict['id']}: {conflict['column']} was changed elsewhere to "
+                        f"'{conflict['current']}'; your value '{conflict['value']}' was not saved"
+                    )
         self.btn_edit.setChecked(False)
         self.toggle_edit_mode(False)
-        self.load_products()
+        if deleted:
+            self.load_products()
+        else:
+            self.apply_saved_cells(settled)
         if errors:
             QMessageBox.warning(self, "Update errors", "\n".join(errors))
 
+    def apply_saved_cells(self, settled):
+        """Bring saved cells and their products up to date without reloading the table."""
+        self.table.blockSignals(True)
+        try:
+            for (row, col), value in settled.items():
+                self.all_products[row] = self.all_products[row]._replace(**{PRODUCT_COLUMNS[col]: value})
+                item = self.table.item(row, col)
+                item.setText(_cell_text(col, value))
+                item.setBackground(QBrush())
+        finally:
+            self.table.blockSignals(False)
+        self.dirty_cells.clear()
+        # Names are searchable, so the matcher has to see renamed products
+        if any(col == 2 for _, col in settled):
+            self.matcher = ProductMatcher(self.all_products)
+            self.filter_products()
+
     def delete_selected_product(self):
         sel = self.table.selectedItems()
         if not sel:
@@ -285,16 +442,8 @@ class DataEntryWindow(QMainWindow):
             QMessageBox.warning(self, "Error", res.get("error", "Unknown error"))
 
     def _qr_pixmap_for_code(self, code_text: str) -> QPixmap:
-        try:
-            qr = qrcode.QRCode(box_size=4, border=2)
-            qr.add_data(code_text)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-            qim = ImageQt(img)
-            pix = QPixmap.fromImage(qim)
-            return pix
-        except Exception:
-            return None
+        # Memory and disk cached; see data_entry/qr_cache.py
+        return self.qr_cache.pixmap(code_text)
 
     def download_qr(self):
         if not hasattr(self, 'current_qr_image') or self.current_qr_image is None:
@@ -309,3 +458,60 @@ class DataEntryWindow(QMainWindow):
             return
         # Save current_qr_image (QPixmap) to file
         self.current_qr_image.save(path, "PNG")
+
+    def label_products(self):
+        """Products to label: the selected rows, or every row the search shows."""
+        # Rows with any selected cell; the table selects items, so selectedRows() is
+        # empty after clicking a single cell
+        rows = sorted({index.row() for index in self.table.selectedIndexes()})
+        if not rows:
+            rows = range(self.table.rowCount())
+        return [self.all_products[r] for r in rows
+                if r < len(self.all_products) and not self.table.isRowHidden(r)]
+
+    def print_labels(self):
+        if self.label_job is not None:
+            return
+        products = self.label_products()
+        if not products:
+            QMessageBox.information(self, "Print Labels", "No products to label")
+            return
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save Labels", "labels.pdf", "PDF Files (*.pdf);;PNG Sheets (*.png)"
+        )
+        if not path:
+            return
+        if not path.lower().endswith((".pdf", ".png")):
+            path += ".png" if selected_filter.startswith("PNG") else ".pdf"
+
+        self.label_progress = QProgressDialog(
+            f"Rendering {len(products)} labels...", "Cancel", 0, len(products), self
+        )
+        self.label_progress.setWindowTitle("Print Labels")
+        self.label_progress.setWindowModality(Qt.WindowModal)
+        self.label_progress.setMinimumDuration(0)
+        self.label_job = LabelSheetJob(products, path)
+        self.label_job.signals.progress.connect(self.on_labels_progress)
+        self.label_job.signals.finished.connect(self.on_labels_finished)
+        self.label_progress.canceled.connect(self.label_job.cancel)
+        self.btn_print_labels.setEnabled(False)
+        QThreadPool.globalInstance().start(self.label_job)
+
+    def on_labels_progress(self, done, total):
+        if self.label_progress is not None:
+            self.label_progress.setValue(done)
+
+    def on_labels_finished(self, result):
+        self.label_job = None
+        self.btn_print_labels.setEnabled(True)
+        if self.label_progress is not None:
+            self.label_progress.close()
+            self.label_progress = None
+        if result.get("success"):
+            QMessageBox.information(
+                self, "Print Labels",
+                f"{result['labels']} labels on {result['pages']} pages saved to:\n{result['paths'][0]}"
+                + ("" if len(result["paths"]) == 1 else f"\n... and {len(result['paths']) - 1} more sheets")
+            )
+        elif not result.get("cancelled"):
+            QMessageBox.warning(self, "Print Labels", result.get("error", "Unknown error"))
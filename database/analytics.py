@@ -0,0 +1,215 @@
+# database/analytics.py
+# Product velocity analytics over a date range. Sale lines are loaded into flat
+# NumPy arrays (memory-mapped for archived days, converted once per JSON day) and
+# every metric is computed with grouped array operations.
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as date_cls, timedelta
+import numpy as np
+from database.range_reports import PARALLEL_THRESHOLD
+
+# Cumulative revenue share limits for ABC classes
+ABC_LIMITS = (0.80, 0.95)
+
+
+class SaleLines:
+    """Flat arrays of sale lines for a date range, one entry per sold item."""
+
+    __slots__ = ("start", "end", "day", "product_id", "quantity", "line_total", "names")
+
+    def __init__(self, start, end, day, product_id, quantity, line_total, names):
+        self.start = start
+        self.end = end
+        self.day = day                  # days since `start`
+        self.product_id = product_id
+        self.quantity = quantity
+        self.line_total = line_total
+        self.names = names              # product id -> product name
+
+    def __len__(self):
+        return int(self.product_id.shape[0])
+
+
+def _lines_from_json(path):
+    """Convert one daily JSON file into line arrays (runs in worker processes)."""
+    with open(path, 'r') as f:
+        report = json.load(f)
+    items = [item for sale in report.get("sales", []) for item in sale.get("items", [])]
+    product_id = np.fromiter((item.get("product_id") for item in items), dtype="int64", count=len(items))
+    quantity = np.fromiter((item.get("quantity", 0) for item in items), dtype="int64", count=len(items))
+    line_total = np.fromiter((item.get("line_total") or 0 for item in items), dtype="float64", count=len(items))
+    names = {item.get("product_id"): item.get("product_name") for item in items}
+    return product_id, quantity, line_total, names
+
+
+def _lines_from_archive(path):
+    from database.archive import ArchivedDay
+    day = ArchivedDay(path)
+    product_id = day.column("item.product_id")
+    if not product_id.shape[0]:
+        return product_id, np.empty(0, dtype="int64"), np.empty(0, dtype="float64"), {}
+    unique, first = np.unique(product_id, return_index=True)
+    strings = day.strings
+    names = dict(zip(unique.tolist(), (strings[c] for c in day.column("item.product_name")[first].tolist())))
+    return (product_id, day.column("item.quantity").astype("int64"),
+            np.nan_to_num(day.column("item.line_total")), names)
+
+
+def load_sale_lines(start, end, folder=None, max_workers=None):
+    """Load every sale line between `start` and `end` (inclusive) into a SaleLines."""
+    if folder is None:
+        from database.reports import REPORTS_FOLDER
+        folder = REPORTS_FOLDER
+    first = date_cls.fromisoformat(start)
+    last = date_cls.fromisoformat(end)
+
+    json_days, json_paths, parts = [], [], []
+    offset = 0
+    day = first
+    while day <= last:
+        json_path = folder / f"sales_{day.isoformat()}.json"
+        archive_path = folder / "archive" / day.isoformat()
+        if json_path.exists():
+            json_days.append(offset)
+            json_paths.append(str(json_path))
+        elif (archive_path / "manifest.json").exists():
+            parts.append((offset, _lines_from_archive(archive_path)))
+        day += timedelta(days=1)
+        offset += 1
+
+    if max_workers == 1 or len(json_paths) < PARALLEL_THRESHOLD:
+        converted = map(_lines_from_json, json_paths)
+        parts.extend(zip(json_days, converted))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            chunksize = max(1, len(json_paths) // ((max_workers or os.cpu_count() or 1) * 4))
+            parts.extend(zip(json_days, pool.map(_lines_from_json, json_paths, chunksize=chunksize)))
+
+    names = {}
+    for _, (_, _, _, day_names) in parts:
+        for pid, name in day_names.items():
+            names.setdefault(pid, name)
+    if not parts:
+        empty_i = np.empty(0, dtype="int64")
+        return SaleLines(start, end, np.empty(0, dtype="int32"), empty_i, empty_i, np.empty(0, dtype="float64"), names)
+    return SaleLines(
+        start, end,
+        np.concatenate([np.full(p[0].shape[0], off, dtype="int32") for off, p in parts]),
+        np.concatenate([p[0] for _, p in parts]).astype("int64", copy=False),
+        np.concatenate([p[1] for _, p in parts]).astype("int64", copy=False),
+        np.concatenate([p[2] for _, p in parts]).astype("float64", copy=False),
+        names
+    )
+
+
+def product_totals(lines):
+    """Return (product_ids, units, revenue) grouped per product, ids ascending."""
+    if not len(lines):
+        return np.empty(0, dtype="int64"), np.empty(0, dtype="int64"), np.empty(0, dtype="float64")
+    ids, inverse = np.unique(lines.product_id, return_inverse=True)
+    units = np.bincount(inverse, weights=lines.quantity, minlength=ids.shape[0]).astype("int64")
+    revenue = np.bincount(inverse, weights=lines.line_total, minlength=ids.shape[0])
+    return ids, units, revenue
+
+
+def top_n(values, n):
+    """Return indexes of the `n` largest values, largest first (partial sort)."""
+    if n >= values.shape[0]:
+        return np.argsort(-values, kind="stable")
+    part = np.argpartition(-values, n - 1)[:n]
+    return part[np.argsort(-values[part], kind="stable")]
+
+
+def abc_classes(revenue):
+    """Classify products A/B/C by cumulative share of revenue."""
+    classes = np.full(revenue.shape[0], "C", dtype="<U1")
+    total = revenue.sum()
+    if not revenue.shape[0] or total <= 0:
+        return classes
+    order = np.argsort(-revenue, kind="stable")
+    # Share of revenue *before* each product, so the product crossing a limit stays in the higher class
+    share_before = (np.cumsum(revenue[order]) - revenue[order]) / total
+    ranked = np.where(share_before < ABC_LIMITS[0], "A", np.where(share_before < ABC_LIMITS[1], "B", "C"))
+    classes[order] = ranked
+    return classes
+
+
+def sell_through(ids, units, stock_ids, stock_levels):
+    """Units sold / (units sold + units still on hand), aligned to `ids`."""
+    on_hand = np.zeros(ids.shape[0], dtype="float64")
+    if stock_ids.shape[0]:
+        order = np.argsort(stock_ids)
+        sorted_ids = stock_ids[order]
+        pos = np.clip(np.searchsorted(sorted_ids, ids), 0, sorted_ids.shape[0] - 1)
+        found = sorted_ids[pos] == ids
+        on_hand[found] = np.maximum(stock_levels[order][pos[found]], 0)
+    denominator = units + on_hand
+    return np.divide(units, denominator, out=np.zeros_like(denominator), where=denominator > 0)
+
+
+def period_growth(ids, revenue, prev_ids, prev_revenue):
+    """Revenue growth against the previous period, aligned to `ids` (NaN when new)."""
+    previous = np.zeros(ids.shape[0], dtype="float64")
+    if prev_ids.shape[0]:
+        pos = np.clip(np.searchsorted(prev_ids, ids), 0, prev_ids.shape[0] - 1)
+        found = prev_ids[pos] == ids
+        previous[found] = prev_revenue[pos[found]]
+    growth = np.full(ids.shape[0], np.nan)
+    np.divide(revenue - previous, previous, out=growth, where=previous > 0)
+    return growth
+
+
+def _stock_arrays():
+    from database.queries import get_products
+    rows = get_products(("id", "stock"))
+    return (np.fromiter((r.id for r in rows), dtype="int64", count=len(rows)),
+            np.fromiter((r.stock or 0 for r in rows), dtype="float64", count=len(rows)))
+
+
+def analyze_range(start, end, top=20, folder=None, max_workers=None):
+    """Top sellers, ABC classes, sell-through and period-over-period growth for a range."""
+    try:
+        first = date_cls.fromisoformat(start)
+        last = date_cls.fromisoformat(end)
+        length = (last - first).days + 1
+        prev_start = (first - timedelta(days=length)).isoformat()
+        prev_end = (first - timedelta(days=1)).isoformat()
+
+        lines = load_sale_lines(start, end, folder, max_workers)
+        prev_lines = load_sale_lines(prev_start, prev_end, folder, max_workers)
+
+        ids, units, revenue = product_totals(lines)
+        prev_ids, _, prev_revenue = product_totals(prev_lines)
+        classes = abc_classes(revenue)
+        through = sell_through(ids, units, *_stock_arrays())
+        growth = period_growth(ids, revenue, prev_ids, prev_revenue)
+
+        top_products = []
+        for i in top_n(revenue, top).tolist():
+            pid = int(ids[i])
+            top_products.append({
+                "product_id": pid,
+                "product_name": lines.names.get(pid),
+                "units": int(units[i]),
+                "revenue": float(revenue[i]),
+                "abc_class": str(classes[i]),
+                "sell_through": float(through[i]),
+                "growth": None if np.isnan(growth[i]) else float(growth[i])
+            })
+
+        return {
+            "success": True,
+            "start": start,
+            "end": end,
+            "previous_start": prev_start,
+            "previous_end": prev_end,
+            "line_count": len(lines),
+            "product_count": int(ids.shape[0]),
+            "total_revenue": float(revenue.sum()),
+            "previous_revenue": float(prev_revenue.sum()),
+            "abc_counts": {c: int((classes == c).sum()) for c in "ABC"},
+            "top_products": top_products
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
@@ -0,0 +1,459 @@
+# database/archive.py
+# Columnar archive for closed sales days. Each day becomes a folder under
+# reports/archive/ holding one raw little-endian file per column, a shared string
+# dictionary and a small manifest. Columns are read back through memory-mapping,
+# so range analytics run on NumPy arrays without building a dict per sale line.
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+ARCHIVE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+STRINGS_NAME = "strings.json"
+
+TIMESTAMP_RE = re.compile(r"^(\d{2}):(\d{2}):(\d{2})$")
+
+# name -> (dtype, kind); "str" columns hold indexes into the string dictionary.
+# "float" columns remember whether each value was a JSON int or float: the
+# manifest marks the column "int" or "float", or "mixed" with a per-row
+# "<column>.is_int" mask beside it, so amounts like 175000 come back as ints.
+SALE_COLUMNS = {
+    "transaction_id": ("int64", "int"),
+    "invoice_number": ("int32", "str"),
+    "timestamp": ("int32", "time"),
+    "cashier": ("int32", "str"),
+    "payment_method": ("int32", "str"),
+    "amount_paid": ("float64", "float"),
+    "change": ("float64", "float"),
+    "subtotal": ("float64", "float"),
+    "tax": ("float64", "float"),
+    "total": ("float64", "float"),
+}
+ITEM_COLUMNS = {
+    "product_id": ("int64", "int"),
+    "product_name": ("int32", "str"),
+    "code": ("int32", "str"),
+    "color": ("int32", "str"),
+    "size": ("int32", "str"),
+    "quantity": ("int32", "int"),
+    "unit_price": ("float64", "float"),
+    "line_total": ("float64", "float"),
+}
+SALE_KEYS = ("timestamp", "transaction_id", "invoice_number", "cashier", "payment_method",
+             "amount_paid", "change", "items", "subtotal", "tax", "total")
+ITEM_KEYS = ("product_id", "product_name", "code", "color", "size", "quantity", "unit_price", "line_total")
+
+
+def get_archive_folder(reports_folder=None):
+    """Return the archive root inside the reports folder."""
+    if reports_folder is None:
+        from database.reports import REPORTS_FOLDER
+        reports_folder = REPORTS_FOLDER
+    return Path(reports_folder) / "archive"
+
+
+def list_archived_days(reports_folder=None):
+    """Return the sorted "YYYY-MM-DD" dates that have an archive."""
+    root = get_archive_folder(reports_folder)
+    if not root.exists():
+        return []
+    return sorted(p.parent.name for p in root.glob(f"*/{MANIFEST_NAME}"))
+
+
+class _StringDictionary:
+    """Assigns small integer codes to strings; code 0 is reserved for None."""
+
+    def __init__(self):
+        self.values = [None]
+        self.codes = {}
+
+    def encode(self, value):
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _encode_time(value):
+    match = TIMESTAMP_RE.match(value or "")
+    if not match:
+        raise ValueError(f"Unsupported timestamp '{value}'")
+    h, m, s = (int(g) for g in match.groups())
+    return h * 3600 + m * 60 + s
+
+
+def _encode_report(report):
+    """Turn a daily report dict into column arrays plus a string dictionary."""
+    strings = _StringDictionary()
+    sale_cols = {name: [] for name in SALE_COLUMNS}
+    item_cols = {name: [] for name in ITEM_COLUMNS}
+    is_int = {f"{prefix}.{name}": [] for prefix, spec in (("sale", SALE_COLUMNS), ("item", ITEM_COLUMNS))
+              for name, (_, kind) in spec.items() if kind == "float"}
+    item_sale = []
+    item_start = [0]
+
+    def encode(kind, value, column):
+        if kind == "str":
+            return strings.encode(value)
+        if kind == "time":
+            return _encode_time(value)
+        if kind == "float":
+            if isinstance(value, int) and not isinstance(value, bool):
+                if abs(value) > 2 ** 53:
+                    raise ValueError(f"Integer {value} does not fit a float64 column")
+                is_int[column].append(True)
+            elif value is not None:
+                is_int[column].append(False)
+            return np.nan if value is None else value
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"Expected an integer, got {value!r}")
+        return value
+
+    for row, sale in enumerate(report.get("sales", [])):
+        if set(sale) - set(SALE_KEYS):
+            raise ValueError(f"Unsupported sale fields: {sorted(set(sale) - set(SALE_KEYS))}")
+        for name, (_, kind) in SALE_COLUMNS.items():
+            sale_cols[name].append(encode(kind, sale.get(name), f"sale.{name}"))
+        for item in sale.get("items", []):
+            if set(item) - set(ITEM_KEYS):
+                raise ValueError(f"Unsupported item fields: {sorted(set(item) - set(ITEM_KEYS))}")
+            for name, (_, kind) in ITEM_COLUMNS.items():
+                item_cols[name].append(encode(kind, item.get(name), f"item.{name}"))
+            item_sale.append(row)
+        item_start.append(len(item_sale))
+
+    columns = {}
+    value_types = {}
+    for prefix, spec, values in (("sale", SALE_COLUMNS, sale_cols), ("item", ITEM_COLUMNS, item_cols)):
+        for name, (dtype, kind) in spec.items():
+            column = f"{prefix}.{name}"
+            columns[column] = np.asarray(values[name], dtype=dtype)
+            if kind == "float":
+                flags = is_int[column]
+                value_types[column] = "int" if all(flags) else "float" if not any(flags) else "mixed"
+                if value_types[column] == "mixed":
+                    # None rows are NaN either way; the mask only covers real values
+                    mask = np.zeros(columns[column].shape[0], dtype="uint8")
+                    mask[~np.isnan(columns[column])] = flags
+                    columns[f"{column}.is_int"] = mask
+    columns["sale.item_start"] = np.asarray(item_start, dtype="int64")
+    columns["item.sale_index"] = np.asarray(item_sale, dtype="int32")
+    return columns, strings.values, value_types
+
+
+def _same_report(a, b):
+    """Compare two reports value by value and type by type (175000 != 175000.0)."""
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+class ArchivedDay:
+    """Read-only view of one archived day; columns are memory-mapped on first use."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_NAME, 'r') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version in {self.path}")
+        self.date = self.manifest["date"]
+        self._strings = None
+        self._columns = {}
+
+    @property
+    def strings(self):
+        if self._strings is None:
+            with open(self.path / STRINGS_NAME, 'r', encoding='utf-8') as f:
+                self._strings = json.load(f)
+        return self._strings
+
+    def column(self, name):
+        """Return column `name` (e.g. "item.quantity") as a read-only NumPy array."""
+        array = self._columns.get(name)
+        if array is None:
+            spec = self.manifest["columns"][name]
+            if spec["length"] == 0:
+                array = np.empty(0, dtype=spec["dtype"])
+            else:
+                array = np.memmap(self.path / spec["file"], dtype=spec["dtype"], mode='r', shape=(spec["length"],))
+            self._columns[name] = array
+        return array
+
+    def numbers(self, name):
+        """Return a "float" column as a list: None where missing, ints where the report had ints."""
+        values = [None if v != v else v for v in self.column(name).tolist()]
+        value_type = self.manifest["columns"][name].get("values", "float")
+        if value_type == "int":
+            return [v if v is None else int(v) for v in values]
+        if value_type == "mixed":
+            mask = self.column(f"{name}.is_int").tolist()
+            return [int(v) if flag and v is not None else v for v, flag in zip(values, mask)]
+        return values
+
+    def decode(self, name):
+        """Return a dictionary-encoded column as a list of strings."""
+        strings = self.strings
+        return [strings[code] for code in self.column(name).tolist()]
+
+    def to_report(self):
+        """Rebuild the original daily report dict from the columns."""
+        sale = {}
+        for name, (_, kind) in SALE_COLUMNS.items():
+            if kind == "str":
+                sale[name] = self.decode(f"sale.{name}")
+            elif kind == "time":
+                sale[name] = [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in self.column(f"sale.{name}").tolist()]
+            elif kind == "float":
+                sale[name] = self.numbers(f"sale.{name}")
+            else:
+                sale[name] = self.column(f"sale.{name}").tolist()
+        item = {}
+        for name, (_, kind) in ITEM_COLUMNS.items():
+            if kind == "str":
+                item[name] = self.decode(f"item.{name}")
+            elif kind == "float":
+                item[name] = self.numbers(f"item.{name}")
+            else:
+                item[name] = self.column(f"item.{name}").tolist()
+
+        starts = self.column("sale.item_start").tolist()
+        sales = []
+        for row in range(self.manifest["sales"]):
+            items = [
+                {key: item[key][i] for key in ITEM_KEYS}
+                for i in range(starts[row], starts[row + 1])
+            ]
+            entry = {key: (items if key == "items" else sale[key][row]) for key in SALE_KEYS}
+            sales.append(entry)
+        return {
+            "date": self.date,
+            "store": self.manifest.get("store", {}),
+            "sales": sales,
+            "summary": self.manifest.get("summary", {})
+        }
+
+
+def open_archived_day(date_str, reports_folder=None):
+    """Return an ArchivedDay for `date_str`, or None if it is not archived."""
+    path = get_archive_folder(reports_folder) / date_str
+    if not (path / MANIFEST_NAME).exists():
+        return None
+    return ArchivedDay(path)
+
+
+def load_archived_report(date_str, reports_folder=None):
+    """Load an archived day back into the daily report dict format."""
+    try:
+        day = open_archived_day(date_str, reports_folder)
+        if day is None:
+            return {"success": False, "error": f"No archive found for {date_str}"}
+        return {"success": True, "report": day.to_report()}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def compact_day(date_str, reports_folder=None, remove_json=False):
+    """Convert one day's JSON report into a columnar archive.
+
+    The archive is read back and compared with the JSON source before it is
+    published; with `remove_json` the JSON file is deleted only after that check.
+    """
+    if reports_folder is None:
+        from database.reports import REPORTS_FOLDER
+        reports_folder = REPORTS_FOLDER
+    json_path = Path(reports_folder) / f"sales_{date_str}.json"
+    final_path = get_archive_folder(reports_folder) / date_str
+    tmp_path = final_path.with_name(f".{date_str}.{os.getpid()}.tmp")
+    try:
+        if not json_path.exists():
+            return {"success": False, "error": f"No report found for {date_str}"}
+        with open(json_path, 'r') as f:
+            report = json.load(f)
+
+        columns, strings, value_types = _encode_report(report)
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        tmp_path.mkdir(parents=True)
+        manifest = {
+            "version": ARCHIVE_VERSION,
+            "date": report.get("date", date_str),
+            "store": report.get("store", {}),
+            "summary": report.get("summary", {}),
+            "sales": len(report.get("sales", [])),
+            "items": int(columns["item.sale_index"].shape[0]),
+            "columns": {}
+        }
+        for name, array in columns.items():
+            filename = f"{name}.bin"
+            array.astype(array.dtype.newbyteorder("<"), copy=False).tofile(tmp_path / filename)
+            manifest["columns"][name] = {"file": filename, "dtype": array.dtype.newbyteorder("<").str, "length": int(array.shape[0])}
+            if name in value_types:
+                manifest["columns"][name]["values"] = value_types[name]
+        with open(tmp_path / STRINGS_NAME, 'w', encoding='utf-8') as f:
+            json.dump(strings, f, ensure_ascii=False)
+        with open(tmp_path / MANIFEST_NAME, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Round-trip parity check before the archive replaces anything
+        if not _same_report(ArchivedDay(tmp_path).to_report(), report):
+            raise ValueError("Archived data does not match the JSON report")
+
+        if final_path.exists():
+            shutil.rmtree(final_path)
+        os.replace(tmp_path, final_path)
+
+        archive_bytes = sum(p.stat().st_size for p in final_path.iterdir())
+        json_bytes = json_path.stat().st_size
+        if remove_json:
+            json_path.unlink()
+        return {"success": True, "path": str(final_path), "json_bytes": json_bytes, "archive_bytes": archive_bytes}
+    except Exception as e:
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return {"success": False, "error": str(e)}
+
+
+def compact_closed_days(before=None, reports_folder=None, remove_json=False):
+    """Archive every day strictly before `before` (default today) that has no archive yet."""
+    if reports_folder is None:
+        from database.reports import REPORTS_FOLDER
+        reports_folder = REPORTS_FOLDER
+    before = before or datetime.now().strftime("%Y-%m-%d")
+    archived = set(list_archived_days(reports_folder))
+    results = {}
+    for path in sorted(Path(reports_folder).glob("sales_*.json")):
+        date_str = path.stem[len("sales_"):]
+        if date_str >= before or date_str in archived:
+            continue
+        results[date_str] = compact_day(date_str, reports_folder, remove_json)
+    return results
+
+
+def verify_archived_day(date_str, reports_folder=None):
+    """Compare an archived day with its JSON source, if that still exists."""
+    if reports_folder is None:
+        from database.reports import REPORTS_FOLDER
+        reports_folder = REPORTS_FOLDER
+    json_path = Path(reports_folder) / f"sales_{date_str}.json"
+    archived = load_archived_report(date_str, reports_folder)
+    if not archived["success"]:
+        return archived
+    if not json_path.exists():
+        return {"success": False, "error": f"No JSON report to compare for {date_str}"}
+    with open(json_path, 'r') as f:
+        report = json.load(f)
+    return {"success": True, "match": _same_report(archived["report"], report)}
+
+
+# -------------------------
+# Vectorized analytics
+# -------------------------
+def _days_in_range(start, end, reports_folder):
+    return [ArchivedDay(get_archive_folder(reports_folder) / d)
+            for d in list_archived_days(reports_folder)
+            if (start is None or d >= start) and (end is None or d <= end)]
+
+
+def archive_totals(start=None, end=None, reports_folder=None):
+    """Sum transactions, units, sales, tax and revenue over archived days."""
+    totals = {"days": 0, "transaction_count": 0, "total_units_sold": 0,
+              "total_sales": 0.0, "total_tax": 0.0, "total_revenue": 0.0}
+    for day in _days_in_range(start, end, reports_folder):
+        totals["days"] += 1
+        totals["transaction_count"] += day.manifest["sales"]
+        totals["total_units_sold"] += int(day.column("item.quantity").sum(dtype="int64"))
+        totals["total_sales"] += float(np.nansum(day.column("sale.subtotal")))
+        totals["total_tax"] += float(np.nansum(day.column("sale.tax")))
+        totals["total_revenue"] += float(np.nansum(day.column("sale.total")))
+    return totals
+
+
+def archive_product_totals(start=None, end=None, reports_folder=None):
+    """Return (product_ids, quantity_sold, revenue) arrays over archived days.
+
+    Each day is grouped with np.unique/np.bincount and the per-day groups are
+    merged the same way, so no per-line Python objects are created.
+    """
+    ids, qty, revenue = [], [], []
+    for day in _days_in_range(start, end, reports_folder):
+        product_ids = day.column("item.product_id")
+        if not product_ids.shape[0]:
+            continue
+        unique, inverse = np.unique(product_ids, return_inverse=True)
+        ids.append(unique)
+        qty.append(np.bincount(inverse, weights=day.column("item.quantity"), minlength=unique.shape[0]))
+        revenue.append(np.bincount(inverse, weights=np.nan_to_num(day.column("item.line_total")), minlength=unique.shape[0]))
+    if not ids:
+        return np.empty(0, dtype="int64"), np.empty(0, dtype="int64"), np.empty(0, dtype="float64")
+    unique, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+    quantity = np.bincount(inverse, weights=np.concatenate(qty), minlength=unique.shape[0])
+    line_revenue = np.bincount(inverse, weights=np.concatenate(revenue), minlength=unique.shape[0])
+    return unique, quantity.astype("int64"), line_revenue
+
+
+def archive_hourly_revenue(start=None, end=None, reports_folder=None):
+    """Return a 24-slot array of revenue by hour of day over archived days."""
+    hours = np.zeros(24, dtype="float64")
+    for day in _days_in_range(start, end, reports_folder):
+        seconds = day.column("sale.timestamp")
+        if seconds.shape[0]:
+            hours += np.bincount(seconds // 3600, weights=np.nan_to_num(day.column("sale.total")), minlength=24)[:24]
+    return hours
+
+
+def summarize_archived_day(path):
+    """Summarize an archived day in the shape of range_reports.summarize_report_file."""
+    day = ArchivedDay(path)
+    strings = day.strings
+    n_sales = day.manifest["sales"]
+    quantity = day.column("item.quantity")
+    line_total = np.nan_to_num(day.column("item.line_total"))
+    sale_total = np.nan_to_num(day.column("sale.total"))
+    sale_units = np.bincount(day.column("item.sale_index"), weights=quantity, minlength=n_sales)
+
+    products = {}
+    product_ids = day.column("item.product_id")
+    if product_ids.shape[0]:
+        unique, first, inverse = np.unique(product_ids, return_index=True, return_inverse=True)
+        qty = np.bincount(inverse, weights=quantity, minlength=unique.shape[0])
+        revenue = np.bincount(inverse, weights=line_total, minlength=unique.shape[0])
+        names = day.column("item.product_name")[first]
+        for pid, name, q, r in zip(unique.tolist(), names.tolist(), qty.tolist(), revenue.tolist()):
+            products[str(pid)] = {"product_name": strings[name], "quantity_sold": int(q), "revenue": r}
+
+    def breakdown(column):
+        codes = day.column(column)
+        result = {}
+        if not codes.shape[0]:
+            return result
+        size = len(strings)
+        transactions = np.bincount(codes, minlength=size)
+        units = np.bincount(codes, weights=sale_units, minlength=size)
+        revenue = np.bincount(codes, weights=sale_total, minlength=size)
+        for code in np.flatnonzero(transactions).tolist():
+            result[strings[code] or "-"] = {
+                "transactions": int(transactions[code]),
+                "units": int(units[code]),
+                "revenue": float(revenue[code])
+            }
+        return result
+
+    return {
+        "date": day.date,
+        "totals": {
+            "total_sales": float(np.nansum(day.column("sale.subtotal"))),
+            "total_tax": float(np.nansum(day.column("sale.tax"))),
+            "total_revenue": float(sale_total.sum()),
+            "total_units_sold": int(quantity.sum(dtype="int64")),
+            "transaction_count": n_sales
+        },
+        "products": products,
+        "cashiers": breakdown("sale.cashier"),
+        "payment_methods": breakdown("sale.payment_method")
+    }
@@ -0,0 +1,181 @@
+# database/dashboard.py
+# Chart series for the reports dashboard, read from the `sales_rollup` table
+# (never from the daily JSON files). Each series is downsampled with
+# Largest-Triangle-Three-Buckets so a multi-year range stays a bounded number
+# of points while keeping its peaks and troughs.
+from datetime import date as date_cls, datetime, timedelta
+import numpy as np
+from database.db import get_connection
+from database.rollups import GRAINS, DIMENSIONS, bucket_bounds
+
+METRICS = ("revenue", "units", "transactions", "sales", "tax")
+
+# Points per series handed to the chart
+MAX_CHART_POINTS = 400
+
+# Label of the series collecting everything outside the top keys
+OTHER_LABEL = "Other"
+
+_BUCKET_UNITS = {"hour": "h", "day": "D", "month": "M"}
+
+
+def lttb(x, y, threshold):
+    """Return indexes of the points Largest-Triangle-Three-Buckets keeps.
+
+    `x` must be ascending. The first and last points are always kept.
+    """
+    n = x.shape[0]
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype("float64", copy=False)
+    y = y.astype("float64", copy=False)
+    # Bucket edges for the n - 2 interior points
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype("int64") + 1
+    edges[-1] = n - 1
+    keep = np.empty(threshold, dtype="int64")
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the triangle's third vertex
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < edges.shape[0] else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def bucket_times(buckets, grain):
+    """Convert rollup bucket strings into epoch milliseconds (buckets read as UTC)."""
+    if grain == "hour":
+        buckets = [b.replace(" ", "T") for b in buckets]
+    times = np.array(buckets, dtype=f"datetime64[{_BUCKET_UNITS[grain]}]")
+    return times.astype("datetime64[ms]").astype("int64")
+
+
+def _full_months(start, end):
+    """Split an inclusive date range into (first, last) whole months and the leftover edge days."""
+    first = date_cls.fromisoformat(start)
+    last = date_cls.fromisoformat(end)
+    month_start = first if first.day == 1 else (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    after = last + timedelta(days=1)
+    month_end = last if after.day == 1 else last.replace(day=1) - timedelta(days=1)
+    if month_start > month_end:
+        return None, [(start, end)]
+    edges = []
+    if first < month_start:
+        edges.append((start, (month_start - timedelta(days=1)).isoformat()))
+    if month_end < last:
+        edges.append(((month_end + timedelta(days=1)).isoformat(), end))
+    return (month_start.isoformat()[:7], month_end.isoformat()[:7]), edges
+
+
+def _ranked_keys(conn, metric, dimension, start, end):
+    """Return [(key, label, total)] for `dimension` over the range, largest first.
+
+    Whole months are read from month rollups and only the partial months at
+    either end from day rollups, so ranking a multi-year range stays cheap.
+    """
+    months, edges = _full_months(start, end)
+    parts, params = [], []
+    if months:
+        parts.append(f"SELECT dim_key, label, {metric} AS value FROM sales_rollup "
+                     "WHERE grain = 'month' AND dimension = ? AND bucket BETWEEN ? AND ?")
+        params += [dimension, *months]
+    for low, high in edges:
+        parts.append(f"SELECT dim_key, label, {metric} AS value FROM sales_rollup "
+                     "WHERE grain = 'day' AND dimension = ? AND bucket BETWEEN ? AND ?")
+        params += [dimension, low, high]
+    return conn.execute(
+        f"SELECT dim_key, MAX(label), SUM(value) AS total FROM ({' UNION ALL '.join(parts)}) "
+        "GROUP BY dim_key ORDER BY total DESC, dim_key",
+        params
+    ).fetchall()
+
+
+def _series_matrix(conn, metric, dimension, grain, start, end, top):
+    """Return (keys, labels, buckets, matrix) with one matrix row per series."""
+    low, high = bucket_bounds(grain, start, end)
+    total_rows = conn.execute(
+        f"SELECT bucket, {metric} FROM sales_rollup "
+        "WHERE grain = ? AND dimension = 'all' AND bucket BETWEEN ? AND ? ORDER BY bucket",
+        (grain, low, high)
+    ).fetchall()
+    buckets = [r[0] for r in total_rows]
+    totals = np.fromiter((r[1] or 0 for r in total_rows), dtype="float64", count=len(total_rows))
+    if dimension == "all":
+        return [""], ["Total"], buckets, totals.reshape(1, -1)
+
+    ranked = _ranked_keys(conn, metric, dimension, start, end)
+    keys = [r[0] for r in ranked[:top]]
+    labels = [r[1] or r[0] for r in ranked[:top]]
+    matrix = np.zeros((len(keys) + 1, len(buckets)))
+    position = {bucket: i for i, bucket in enumerate(buckets)}
+    for row, key in enumerate(keys):
+        for bucket, value in conn.execute(
+            f"SELECT bucket, {metric} FROM sales_rollup "
+            "WHERE grain = ? AND dimension = ? AND dim_key = ? AND bucket BETWEEN ? AND ?",
+            (grain, dimension, key, low, high)
+        ):
+            # Buckets missing for a key mean it sold nothing there
+            matrix[row, position[bucket]] = value or 0
+
+    # A sale counts once per product it contains, so product transactions
+    # overlap and have no meaningful remainder
+    if len(ranked) > top and not (dimension == "product" and metric == "transactions"):
+        matrix[-1] = np.maximum(totals - matrix[:-1].sum(axis=0), 0)
+        return keys + [None], labels + [OTHER_LABEL], buckets, matrix
+    return keys, labels, buckets, matrix[:-1]
+
+
+def get_chart_series(metric="revenue", dimension="all", start=None, end=None, grain="day",
+                     top=5, max_points=MAX_CHART_POINTS):
+    """Return downsampled chart series for `metric` split by `dimension`.
+
+    With a dimension other than "all", the `top` keys by total `metric` get a
+    series each and the remainder is summed into an "Other" series (except for
+    product transactions, which overlap). Each series
+    has `x` (epoch ms), `y`, its `total` and the number of buckets before
+    downsampling.
+    """
+    try:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain '{grain}'")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}'")
+        start = start or "2000-01-01"
+        end = end or datetime.now().strftime("%Y-%m-%d")
+
+        conn = get_connection()
+        try:
+            keys, labels, buckets, matrix = _series_matrix(conn, metric, dimension, grain, start, end, top)
+        finally:
+            conn.close()
+
+        times = bucket_times(buckets, grain) if buckets else np.empty(0, dtype="int64")
+        series = []
+        for i, (key, label) in enumerate(zip(keys, labels)):
+            y = matrix[i]
+            keep = lttb(times, y, max_points)
+            series.append({
+                "key": key,
+                "label": label,
+                "total": float(y.sum()),
+                "buckets": int(y.shape[0]),
+                "x": times[keep].tolist(),
+                "y": y[keep].tolist()
+            })
+        return {
+            "success": True,
+            "metric": metric,
+            "dimension": dimension,
+            "grain": grain,
+            "series": series
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
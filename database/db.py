@@ -1,6 +1,7 @@
 # database/db.py
 import sqlite3
 from pathlib import Path
+from database import diagnostics
 
 # Ensure DB folder exists
 DB_FOLDER = Path(__file__).parent.parent
@@ -10,7 +11,9 @@ DB_FOLDER.mkdir(exist_ok=True)
 DB_PATH = DB_FOLDER / "db"
 
 def get_connection():
-    """Return a connection to the SQLite database."""
+    """Return a connection to the SQLite database (a timed, logged one when SQL tracing is on)."""
+    if diagnostics.SQL_TRACE:
+        return sqlite3.connect(DB_PATH, factory=diagnostics.TracedConnection)
     return sqlite3.connect(DB_PATH)
 
 def create_tables():
@@ -44,6 +47,43 @@ def create_tables():
     )
     """)
 
+    # Product codes are looked up when scanning and importing deliveries
+    c.execute("CREATE INDEX IF NOT EXISTS idx_products_code ON products (code)")
+
+    # Pre-aggregated sales rollups (see database/rollups.py)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS sales_rollup (
+        grain TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        dim_key TEXT NOT NULL,
+        label TEXT,
+        transactions INTEGER DEFAULT 0,
+        units INTEGER DEFAULT 0,
+        sales REAL DEFAULT 0,
+        tax REAL DEFAULT 0,
+        revenue REAL DEFAULT 0,
+        PRIMARY KEY (grain, bucket, dimension, dim_key)
+    )
+    """)
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sales_rollup_dimension ON sales_rollup (grain, dimension, bucket)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sales_rollup_key ON sales_rollup (grain, dimension, dim_key, bucket)"
+    )
+
+    # Days whose rollups no longer match their report (see database/rollups.py)
+    c.execute("CREATE TABLE IF NOT EXISTS rollup_stale (day TEXT PRIMARY KEY)")
+
+    # Per-day invoice counter (see database/sequence.py)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS invoice_sequence (
+        day TEXT PRIMARY KEY,
+        last_value INTEGER NOT NULL
+    )
+    """)
+
     conn.commit()
     # Ensure price and discount columns exist for older DBs
     try:
@@ -55,8 +95,46 @@ def create_tables():
         if 'discount' not in cols:
             c.execute("ALTER TABLE products ADD COLUMN discount INTEGER DEFAULT 0")
             conn.commit()
+        if 'revision' not in cols:
+            c.execute("ALTER TABLE products ADD COLUMN revision INTEGER DEFAULT 0")
+            conn.commit()
     except Exception:
         pass
+
+    # Catalog version: bumped by every product insert, update and delete, and
+    # stamped on the changed row, so open windows can fetch just what changed
+    # (see get_catalog_changes in database/queries.py)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS catalog_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        deletions INTEGER NOT NULL
+    )
+    """)
+    c.execute("INSERT OR IGNORE INTO catalog_version (id, version, deletions) VALUES (1, 0, 0)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_products_revision ON products (revision)")
+    c.execute("""
+    CREATE TRIGGER IF NOT EXISTS products_revision_insert AFTER INSERT ON products
+    BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+        UPDATE products SET revision = (SELECT version FROM catalog_version WHERE id = 1) WHERE id = NEW.id;
+    END
+    """)
+    c.execute("""
+    CREATE TRIGGER IF NOT EXISTS products_revision_update
+    AFTER UPDATE OF code, name, color, size, price, discount, stock ON products
+    BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+        UPDATE products SET revision = (SELECT version FROM catalog_version WHERE id = 1) WHERE id = NEW.id;
+    END
+    """)
+    c.execute("""
+    CREATE TRIGGER IF NOT EXISTS products_revision_delete AFTER DELETE ON products
+    BEGIN
+        UPDATE catalog_version SET version = version + 1, deletions = deletions + 1 WHERE id = 1;
+    END
+    """)
+    conn.commit()
     conn.close()
 
 # Automatically create tables if DB is empty
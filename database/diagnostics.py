@@ -0,0 +1,364 @@
+# database/diagnostics.py
+# Opt-in diagnostics for a lane that feels slow. With SQL tracing on
+# (config.SQL_TRACE or POS_SQL_TRACE=1) get_connection() hands out traced
+# connections: every statement is timed and written, with its call site and what
+# SQLite actually ran, to a rotating log under diagnostics/. UI actions named in
+# config.PROFILE_ACTIONS (or POS_PROFILE=checkout,save_edits) run under cProfile
+# and dump their stats to diagnostics/profiles/.
+#
+#   python -m database.diagnostics summary [--top 20] [--by site]
+#   python -m database.diagnostics profile diagnostics/profiles/checkout-....prof
+#
+# Several processes tracing at once (e.g. benchmarks.load lanes) all append to the
+# same log; rotation is per process, so keep the log large or use one lane.
+# The launcher imports this module, so logging and argparse load only when used.
+import functools
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+import config
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DIAGNOSTICS_FOLDER = PROJECT_ROOT / "diagnostics"
+SQL_LOG_NAME = "sql.log"
+PROFILES_FOLDER_NAME = "profiles"
+
+SQL_LOG_MAX_BYTES = 5 * 1024 * 1024
+SQL_LOG_BACKUPS = 5
+
+# Statements SQLite ran (trace callback) kept per record, and their length
+TRACED_KEPT = 5
+TRACED_MAX_CHARS = 200
+
+# Lines of pstats output written next to each profile
+PROFILE_TEXT_LINES = 40
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_list(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return frozenset(default)
+    return frozenset(v.strip() for v in value.split(",") if v.strip())
+
+
+# Read once at import; get_connection() and profiled() check them on every call
+SQL_TRACE = _env_flag("POS_SQL_TRACE", config.SQL_TRACE)
+SLOW_QUERY_MS = float(os.environ.get("POS_SLOW_QUERY_MS", config.SLOW_QUERY_MS))
+PROFILE_ACTIONS = _env_list("POS_PROFILE", config.PROFILE_ACTIONS)
+
+_logger = None
+_logger_lock = threading.Lock()
+# cProfile cannot run two profilers at once; a nested or concurrent action runs plain
+_profile_lock = threading.Lock()
+
+
+def sql_logger():
+    """Return the logger behind the SQL log, creating its rotating file handler once."""
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            import logging
+            from logging.handlers import RotatingFileHandler
+            DIAGNOSTICS_FOLDER.mkdir(exist_ok=True)
+            logger = logging.getLogger("pos.sql")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = RotatingFileHandler(DIAGNOSTICS_FOLDER / SQL_LOG_NAME, maxBytes=SQL_LOG_MAX_BYTES,
+                                          backupCount=SQL_LOG_BACKUPS, encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+def _call_site():
+    """Return "path:line function" of the first frame outside this module."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    path = frame.f_code.co_filename
+    try:
+        path = Path(path).relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        pass
+    return f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def _record(op, sql, ms, traced, rows=None, error=None):
+    entry = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "ms": round(ms, 3),
+        "op": op,
+        "sql": sql,
+        "site": _call_site(),
+        "pid": os.getpid(),
+        "thread": threading.current_thread().name,
+        # What SQLite ran for this call: implicit BEGIN/COMMIT, one per
+        # executemany row, trigger bodies; bound values are filled in
+        "statements": len(traced),
+        "traced": [s[:TRACED_MAX_CHARS] for s in traced[:TRACED_KEPT]],
+    }
+    if rows is not None and rows >= 0:
+        entry["rows"] = rows
+    if error is not None:
+        entry["error"] = str(error)
+    sql_logger().info(json.dumps(entry))
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor whose execute and fetch calls are timed by its TracedConnection."""
+
+    last_sql = ""   # statement the pending rows belong to
+
+    def execute(self, sql, parameters=()):
+        return self.connection.timed("execute", sql, super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.connection.timed("executemany", sql, super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.connection.timed("executescript", script, super().executescript, script)
+
+    # Rows of a SELECT are mostly produced while fetching, so fetches are
+    # recorded too, under the statement that produced them
+    def fetchone(self):
+        return self.connection.timed("fetch", self.last_sql, super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        return self.connection.timed("fetch", self.last_sql, super().fetchmany, size)
+
+    def fetchall(self):
+        return self.connection.timed("fetch", self.last_sql, super().fetchall)
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3 connection that logs each statement with its duration and call site.
+
+    Use as sqlite3.connect(path, factory=TracedConnection). Only calls made
+    through the connection and its cursors are timed; iterating a cursor
+    directly is not.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.traced = []
+        self.set_trace_callback(self.traced.append)
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def commit(self):
+        return self.timed("commit", "COMMIT", super().commit)
+
+    def rollback(self):
+        return self.timed("rollback", "ROLLBACK", super().rollback)
+
+    def timed(self, op, sql, call, *args):
+        """Run `call(*args)` and log it when it took at least SLOW_QUERY_MS."""
+        del self.traced[:]
+        error = None
+        result = None
+        t0 = time.perf_counter()
+        try:
+            result = call(*args)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            if ms >= SLOW_QUERY_MS or error is not None:
+                if isinstance(result, sqlite3.Cursor):
+                    rows = result.rowcount      # -1 for SELECTs; their rows show on the fetches
+                elif isinstance(result, list):
+                    rows = len(result)
+                else:
+                    rows = None if result is None else 1
+                _record(op, sql, ms, self.traced, rows, error)
+            if isinstance(result, TracedCursor):
+                result.last_sql = sql
+            del self.traced[:]
+
+
+def profile_call(action, func, *args, **kwargs):
+    """Run `func` under cProfile and dump its stats to diagnostics/profiles/.
+
+    Writes <action>-<timestamp>.prof (for pstats/snakeviz) and a .txt with the
+    top functions by cumulative time.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return func(*args, **kwargs)
+    try:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            folder = DIAGNOSTICS_FOLDER / PROFILES_FOLDER_NAME
+            folder.mkdir(parents=True, exist_ok=True)
+            path = folder / f"{action}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.prof"
+            profiler.dump_stats(path)
+            with open(path.with_suffix(".txt"), 'w') as f:
+                stats = pstats.Stats(profiler, stream=f)
+                stats.sort_stats("cumulative").print_stats(PROFILE_TEXT_LINES)
+    finally:
+        _profile_lock.release()
+
+
+def run_profiled(action, func, *args, **kwargs):
+    """Call `func`, under cProfile when `action` is in PROFILE_ACTIONS."""
+    if action in PROFILE_ACTIONS:
+        return profile_call(action, func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def profiled(action):
+    """Decorator form of run_profiled (the wrapper keeps the signature Qt slots see)."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return run_profiled(action, func, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---- viewer ----
+
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(\s*,\s*\?)+\s*\)", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and IN (?, ?, ...) lists so chunked queries group together."""
+    return _IN_LIST_RE.sub("IN (?, ...)", " ".join(str(sql).split()))
+
+
+def read_sql_log(folder=None):
+    """Yield the records of the SQL log, oldest rotated file first."""
+    folder = Path(folder or DIAGNOSTICS_FOLDER)
+    paths = sorted(folder.glob(SQL_LOG_NAME + ".*"), key=lambda p: -int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0)
+    paths.append(folder / SQL_LOG_NAME)
+    for path in paths:
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue    # a line cut off by a crash or a concurrent rotation
+
+
+def summarize(records, by="sql", since=None):
+    """Group records by statement (or call site); return groups sorted by total time."""
+    groups = defaultdict(lambda: {"calls": 0, "fetches": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                  "errors": 0, "sites": defaultdict(float)})
+    for r in records:
+        if since and r.get("ts", "") < since:
+            continue
+        key = normalize_sql(r.get("sql", "")) if by == "sql" else r.get("site", "?")
+        g = groups[key]
+        if r.get("op") == "fetch":
+            g["fetches"] += 1
+        else:
+            g["calls"] += 1
+        ms = r.get("ms", 0.0)
+        g["total_ms"] += ms
+        g["max_ms"] = max(g["max_ms"], ms)
+        g["errors"] += "error" in r
+        g["sites"][r.get("site", "?") if by == "sql" else normalize_sql(r.get("sql", ""))] += ms
+    result = []
+    for key, g in groups.items():
+        top_site = max(g.pop("sites").items(), key=lambda item: item[1])[0]
+        result.append(dict(g, key=key, top=top_site, mean_ms=g["total_ms"] / max(1, g["calls"])))
+    result.sort(key=lambda g: g["total_ms"], reverse=True)
+    return result
+
+
+def cmd_summary(args):
+    groups = summarize(read_sql_log(args.folder), by=args.by, since=args.since)
+    if not groups:
+        print(f"No SQL log records in {args.folder or DIAGNOSTICS_FOLDER}")
+        return 0
+    total = sum(g["total_ms"] for g in groups)
+    print(f"{len(groups)} distinct {'statements' if args.by == 'sql' else 'call sites'}, "
+          f"{sum(g['calls'] for g in groups)} calls, {total:.1f} ms in total")
+    print(f"{'total ms':>10} {'share':>6} {'calls':>7} {'ms/call':>9} {'max ms':>9} {'errors':>6}  "
+          f"{'statement' if args.by == 'sql' else 'call site'}")
+    for g in groups[:args.top]:
+        print(f"{g['total_ms']:>10.1f} {g['total_ms'] / total if total else 0:>6.1%} {g['calls']:>7} "
+              f"{g['mean_ms']:>9.2f} {g['max_ms']:>9.2f} {g['errors']:>6}  {g['key'][:100]}")
+        print(f"{'':>53}{'mostly from' if args.by == 'sql' else 'mostly'} {g['top'][:100]}")
+    return 0
+
+
+def cmd_profile(args):
+    import pstats
+    try:
+        stats = pstats.Stats(str(args.path))
+    except (OSError, EOFError, ValueError) as e:
+        print(f"Cannot read profile {args.path}: {e}", file=sys.stderr)
+        return 1
+    stats.sort_stats(args.sort).print_stats(args.limit)
+    return 0
+
+
+def build_parser():
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m database.diagnostics",
+                                     description="Summarize the SQL log and cProfile dumps")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("summary", help="top statements (or call sites) by total time")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--by", choices=("sql", "site"), default="sql")
+    p.add_argument("--since", help="only records at or after this ISO timestamp (e.g. 2026-10-19T14:00)")
+    p.add_argument("--folder", help=f"diagnostics folder (default {DIAGNOSTICS_FOLDER})")
+    p.set_defaults(func=cmd_summary)
+
+    p = sub.add_parser("profile", help="print a profile dumped by a profiled UI action")
+    p.add_argument("path", type=Path)
+    p.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, calls, ...)")
+    p.add_argument("--limit", type=int, default=30)
+    p.set_defaults(func=cmd_profile)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        sys.stderr.close()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
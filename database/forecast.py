@@ -0,0 +1,111 @@
+# database/forecast.py
+# Reorder forecasting from stock_log history. Daily sales for the whole catalog
+# are read in one grouped query into a products x days matrix; demand forecasts,
+# days of cover and reorder quantities are computed on that matrix at once.
+import math
+from datetime import datetime, timedelta
+import numpy as np
+from database.db import get_connection
+from config import (FORECAST_HISTORY_DAYS, FORECAST_SMOOTHING,
+                    REORDER_LEAD_TIME_DAYS, REORDER_TARGET_COVER_DAYS)
+
+
+def load_daily_demand(history_days=FORECAST_HISTORY_DAYS, end=None):
+    """Return (product_ids, day_labels, matrix) of units sold per product per local day."""
+    end_day = datetime.strptime(end, "%Y-%m-%d") if end else datetime.now()
+    start_day = end_day - timedelta(days=history_days - 1)
+    days = [(start_day + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(history_days)]
+
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            """
+            SELECT product_id, date(timestamp, 'localtime') AS day, -SUM(quantity)
+            FROM stock_log
+            WHERE action = 'sale' AND date(timestamp, 'localtime') BETWEEN ? AND ?
+            GROUP BY product_id, day
+            """,
+            (days[0], days[-1])
+        ).fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        return np.empty(0, dtype="int64"), days, np.zeros((0, history_days))
+    pids = np.fromiter((r[0] for r in rows), dtype="int64", count=len(rows))
+    day_index = {d: i for i, d in enumerate(days)}
+    cols = np.fromiter((day_index[r[1]] for r in rows), dtype="int64", count=len(rows))
+    units = np.fromiter((r[2] for r in rows), dtype="float64", count=len(rows))
+
+    product_ids, row_index = np.unique(pids, return_inverse=True)
+    matrix = np.zeros((product_ids.shape[0], history_days))
+    matrix[row_index, cols] = units
+    return product_ids, days, matrix
+
+
+def smoothed_demand(matrix, alpha=FORECAST_SMOOTHING):
+    """Exponentially smoothed daily demand per row, as one weighted matrix product."""
+    if not matrix.shape[1]:
+        return np.zeros(matrix.shape[0])
+    # Weight of day t is alpha * (1 - alpha) ** age, normalised over the window
+    ages = np.arange(matrix.shape[1])[::-1]
+    weights = alpha * (1 - alpha) ** ages
+    return matrix @ (weights / weights.sum())
+
+
+def rolling_mean(matrix, window):
+    """Mean daily demand over the last `window` days per row."""
+    window = min(window, matrix.shape[1])
+    if not window:
+        return np.zeros(matrix.shape[0])
+    return matrix[:, -window:].mean(axis=1)
+
+
+def build_reorder_list(history_days=FORECAST_HISTORY_DAYS, lead_time=REORDER_LEAD_TIME_DAYS,
+                       target_cover=REORDER_TARGET_COVER_DAYS, end=None):
+    """Forecast demand for every product and rank the ones running low.
+
+    Returns every product with its forecast; `needs_reorder` marks products whose
+    days of cover are below `lead_time`. Items are sorted by days of cover.
+    """
+    try:
+        from database.queries import get_products, STOCK_GRID_COLUMNS
+        products = get_products(STOCK_GRID_COLUMNS)
+        product_ids, _, matrix = load_daily_demand(history_days, end)
+
+        catalog_ids = np.fromiter((p.id for p in products), dtype="int64", count=len(products))
+        stock = np.fromiter((p.stock or 0 for p in products), dtype="float64", count=len(products))
+
+        # Align the demand rows (products with sales) to the full catalog
+        demand = np.zeros(len(products))
+        recent = np.zeros(len(products))
+        if product_ids.shape[0]:
+            pos = np.clip(np.searchsorted(product_ids, catalog_ids), 0, product_ids.shape[0] - 1)
+            found = product_ids[pos] == catalog_ids
+            demand[found] = smoothed_demand(matrix)[pos[found]]
+            recent[found] = rolling_mean(matrix, 7)[pos[found]]
+
+        cover = np.full(len(products), np.inf)
+        np.divide(np.maximum(stock, 0), demand, out=cover, where=demand > 0)
+        reorder_qty = np.maximum(np.ceil(demand * target_cover - stock), 0)
+        needs_reorder = cover < lead_time
+
+        items = []
+        for i in np.argsort(cover, kind="stable").tolist():
+            product = products[i]
+            items.append({
+                "product_id": product.id,
+                "code": product.code,
+                "name": product.name,
+                "color": product.color,
+                "size": product.size,
+                "stock": int(stock[i]),
+                "daily_demand": float(demand[i]),
+                "last_7_days_avg": float(recent[i]),
+                "days_of_cover": None if math.isinf(cover[i]) else float(cover[i]),
+                "reorder_qty": int(reorder_qty[i]) if needs_reorder[i] else 0,
+                "needs_reorder": bool(needs_reorder[i])
+            })
+        return {"success": True, "items": items, "reorder_count": int(needs_reorder.sum())}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
@@ -0,0 +1,163 @@
+# database/manifest.py
+# Delivery manifests: a supplier CSV/JSON/JSON Lines file of product codes and
+# quantities, or a plain text dump from a barcode scanner (one code per scan).
+# Lines are streamed and merged per code, codes are resolved in batches through
+# the products(code) index, and the whole delivery is applied as one restock.
+import csv
+import json
+import math
+from pathlib import Path
+from database.queries import get_products_by_codes, restock_products
+
+CODE_COLUMNS = ("code", "sku", "barcode", "product_code")
+QUANTITY_COLUMNS = ("quantity", "qty", "count", "units")
+
+
+def _quantity(value):
+    """Parse a manifest quantity; missing means a single unit."""
+    if value is None or str(value).strip() == "":
+        return 1
+    try:
+        quantity = float(str(value).strip())
+    except ValueError:
+        raise ValueError(f"invalid quantity '{value}'")
+    # inf/nan (e.g. "inf" or a JSON 1e400) would fail int() with another error type
+    if not math.isfinite(quantity) or quantity != int(quantity) or quantity <= 0:
+        raise ValueError(f"invalid quantity '{value}'")
+    return int(quantity)
+
+
+def _entry(value):
+    """Turn one JSON manifest entry into (code, raw quantity)."""
+    if isinstance(value, dict):
+        code = next((value[k] for k in CODE_COLUMNS if k in value), None)
+        return code, next((value[k] for k in QUANTITY_COLUMNS if k in value), None)
+    if isinstance(value, (list, tuple)):
+        return (value[0] if value else None), (value[1] if len(value) > 1 else None)
+    return value, None
+
+
+def _iter_csv(f):
+    reader = csv.reader(f)
+    code_col, qty_col = 0, 1
+    first_row = True
+    for line_no, row in enumerate(reader, start=1):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        # Spreadsheet exports often lead with blank lines; the header is the first non-blank row
+        if first_row:
+            first_row = False
+            header = [cell.strip().lower() for cell in row]
+            if any(name in header for name in CODE_COLUMNS):
+                code_col = next(header.index(name) for name in CODE_COLUMNS if name in header)
+                qty_col = next((header.index(name) for name in QUANTITY_COLUMNS if name in header), None)
+                continue
+        code = row[code_col] if code_col < len(row) else None
+        quantity = row[qty_col] if qty_col is not None and qty_col < len(row) else None
+        yield line_no, code, quantity
+
+
+def _iter_json_lines(f):
+    for line_no, line in enumerate(f, start=1):
+        if line.strip():
+            yield (line_no,) + _entry(json.loads(line))
+
+
+def _iter_json(f):
+    data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("items", [])
+    for line_no, value in enumerate(data, start=1):
+        yield (line_no,) + _entry(value)
+
+
+def _iter_scans(f):
+    for line_no, line in enumerate(f, start=1):
+        if line.strip():
+            yield line_no, line.strip(), None
+
+
+def iter_manifest_lines(path):
+    """Yield (line_no, code, raw quantity) from a manifest without loading it whole.
+
+    The format follows the extension: .csv, .jsonl, .json, anything else is a
+    scanner dump with one code per line.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, "r", newline="" if suffix == ".csv" else None, encoding="utf-8-sig") as f:
+        if suffix == ".csv":
+            yield from _iter_csv(f)
+        elif suffix in (".jsonl", ".ndjson"):
+            yield from _iter_json_lines(f)
+        elif suffix == ".json":
+            # A JSON document has to be parsed whole; manifests are small
+            yield from _iter_json(f)
+        else:
+            yield from _iter_scans(f)
+
+
+def merge_manifest_lines(lines):
+    """Merge lines by code. Returns (quantities in first-seen order, line count, errors)."""
+    quantities = {}
+    errors = []
+    count = 0
+    for line_no, code, raw_quantity in lines:
+        count += 1
+        code = str(code).strip() if code is not None else ""
+        if not code:
+            errors.append(f"Line {line_no}: missing code")
+            continue
+        try:
+            quantity = _quantity(raw_quantity)
+        except ValueError as e:
+            errors.append(f"Line {line_no}: {e}")
+            continue
+        quantities[code] = quantities.get(code, 0) + quantity
+    return quantities, count, errors
+
+
+def load_manifest(path):
+    """Parse and resolve a delivery manifest into a restock preview.
+
+    Each item carries the product, its current stock, the delivered quantity
+    and the resulting stock. Unknown codes and unreadable lines are reported
+    separately and are never applied.
+    """
+    try:
+        quantities, line_count, errors = merge_manifest_lines(iter_manifest_lines(path))
+        products = get_products_by_codes(quantities)
+        items, unknown = [], []
+        for code, quantity in quantities.items():
+            product = products.get(code)
+            if product is None:
+                unknown.append({"code": code, "quantity": quantity})
+                continue
+            items.append({
+                "product_id": product.id,
+                "code": code,
+                "name": product.name,
+                "color": product.color,
+                "size": product.size,
+                "stock": product.stock,
+                "quantity": quantity,
+                "new_stock": (product.stock or 0) + quantity
+            })
+        return {
+            "success": True,
+            "path": str(path),
+            "lines": line_count,
+            "items": items,
+            "unknown": unknown,
+            "errors": errors
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def apply_manifest(items):
+    """Restock every resolved manifest item in a single transaction."""
+    quantities = {}
+    for item in items:
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+    return restock_products(quantities)
@@ -1,7 +1,36 @@
 # database/queries.py
+from collections import namedtuple
+from functools import lru_cache
 from database.db import get_connection
 import uuid
 
+# Keys per IN (...) lookup, well under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# -------------------------
+# Product rows
+# -------------------------
+PRODUCT_COLUMNS = ("id", "code", "name", "color", "size", "price", "discount", "stock")
+
+# Projections for views that need less than the full row
+STOCK_GRID_COLUMNS = ("id", "code", "name", "color", "size", "stock")
+
+# Columns update_products may write
+EDITABLE_COLUMNS = ("code", "name", "color", "size", "price", "discount", "stock")
+
+
+@lru_cache(maxsize=None)
+def product_row_type(columns=PRODUCT_COLUMNS):
+    """Return the named tuple type for rows of `columns` (one type per projection)."""
+    unknown = [c for c in columns if c not in PRODUCT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown product columns: {', '.join(unknown)}")
+    return namedtuple("ProductRow" if columns == PRODUCT_COLUMNS else "ProductRow_" + "_".join(columns), columns)
+
+
+# Full product row: id, code, name, color, size, price, discount, stock
+ProductRow = product_row_type()
+
 # -------------------------
 # Product functions
 # -------------------------
@@ -62,6 +91,41 @@ def restock_product(product_id, quantity):
     finally:
         conn.close()
 
+def restock_products(quantities):
+    """Add stock to many products in one transaction.
+
+    `quantities` maps product_id -> quantity (or is an iterable of pairs).
+    Either every product is restocked and logged, or none is.
+    """
+    items = list(quantities.items() if isinstance(quantities, dict) else quantities)
+    if not items:
+        return {"success": False, "error": "Nothing to restock"}
+    if any(quantity <= 0 for _, quantity in items):
+        return {"success": False, "error": "Quantity must be positive"}
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        ids = [product_id for product_id, _ in items]
+        found = set()
+        for i in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            batch = ids[i:i + LOOKUP_BATCH_SIZE]
+            c.execute(f"SELECT id FROM products WHERE id IN ({','.join('?' * len(batch))})", batch)
+            found.update(r[0] for r in c.fetchall())
+        missing = [product_id for product_id in ids if product_id not in found]
+        if missing:
+            return {"success": False, "error": f"Product not found: {', '.join(map(str, missing[:10]))}"}
+
+        c.executemany("UPDATE products SET stock = stock + ? WHERE id=?",
+                      [(quantity, product_id) for product_id, quantity in items])
+        c.executemany("INSERT INTO stock_log (product_id, action, quantity) VALUES (?, 'restock', ?)", items)
+        conn.commit()
+        return {"success": True, "restocked": len(items), "units": sum(q for _, q in items)}
+    except Exception as e:
+        conn.rollback()
+        return {"success": False, "error": str(e)}
+    finally:
+        conn.close()
+
 def sell_product(product_id, quantity):
     """Reduce stock for a product (sale)."""
     if quantity <= 0:
@@ -92,17 +156,74 @@ def sell_product(product_id, quantity):
 # -------------------------
 # Fetching functions
 # -------------------------
+def get_products(columns=PRODUCT_COLUMNS):
+    """Return every product as a named tuple holding only `columns`."""
+    columns = tuple(columns)
+    row_type = product_row_type(columns)
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute(f"SELECT {', '.join(columns)} FROM products")
+        return list(map(row_type._make, c.fetchall()))
+    finally:
+        conn.close()
+
 def get_stock():
-    """Return all products with current stock."""
+    """Return all products with current stock, as ProductRow tuples."""
+    return get_products(PRODUCT_COLUMNS)
+
+def get_products_by_codes(codes):
+    """Return {code: ProductRow} for the given codes."""
+    codes = list(codes)
     conn = get_connection()
     c = conn.cursor()
     try:
-        c.execute("SELECT id, code, name, color, size, price, discount, stock FROM products")
-        rows = c.fetchall()
-        return rows
+        found = {}
+        for i in range(0, len(codes), LOOKUP_BATCH_SIZE):
+            batch = codes[i:i + LOOKUP_BATCH_SIZE]
+            c.execute(
+                f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products WHERE code IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            for row in map(ProductRow._make, c.fetchall()):
+                found.setdefault(row.code, row)
+        return found
+    finally:
+        conn.close()
+
+def get_catalog_version():
+    """Return the catalog version as (version, deletions); see database/db.py."""
+    conn = get_connection()
+    try:
+        row = conn.execute("SELECT version, deletions FROM catalog_version WHERE id = 1").fetchone()
+        return tuple(row) if row else (0, 0)
     finally:
         conn.close()
 
+
+def get_catalog_changes(since, columns=PRODUCT_COLUMNS):
+    """Return what changed in products since catalog version `since`.
+
+    `since` is a get_catalog_version() value taken before the caller loaded
+    its products. The result has the current `version`, the `rows` inserted
+    or updated since then, and `reload`, which is True when products were
+    deleted (or `since` is None) and the caller has to load everything again.
+    """
+    version = get_catalog_version()
+    if since is None or version[1] != since[1]:
+        return {"version": version, "rows": [], "reload": True}
+    if version == since:
+        return {"version": version, "rows": [], "reload": False}
+    row_type = product_row_type(tuple(columns))
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM products WHERE revision > ? ORDER BY id", (since[0],)
+        ).fetchall()
+    finally:
+        conn.close()
+    return {"version": version, "rows": [row_type._make(r) for r in rows], "reload": False}
+
 def get_stock_log(product_id=None):
     """Return stock log. Filter by product_id if provided."""
     conn = get_connection()
@@ -166,6 +287,65 @@ def update_product(product_id, name=None, color=None, size=None, stock=None, cod
         conn.close()
 
 
+def update_products(edits):
+    """Write many product edits in one transaction.
+
+    `edits` maps product_id -> {column: (original, new)}, with `original` the
+    value the editor started from. A field is only written while the stored
+    value still equals its original; fields changed elsewhere in the meantime
+    (or on deleted products) are returned as conflicts and left untouched,
+    and the rest of the batch is applied.
+    """
+    edits = {pid: fields for pid, fields in edits.items() if fields}
+    if not edits:
+        return {"success": False, "error": "No fields to update"}
+    unknown = {col for fields in edits.values() for col in fields if col not in EDITABLE_COLUMNS}
+    if unknown:
+        return {"success": False, "error": f"Cannot update columns: {', '.join(sorted(unknown))}"}
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        # Take the write lock up front so nothing changes between the check and the write
+        c.execute("BEGIN IMMEDIATE")
+        ids = list(edits)
+        current = {}
+        for i in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            batch = ids[i:i + LOOKUP_BATCH_SIZE]
+            c.execute(f"SELECT id, {', '.join(EDITABLE_COLUMNS)} FROM products "
+                      f"WHERE id IN ({','.join('?' * len(batch))})", batch)
+            current.update((r[0], dict(zip(EDITABLE_COLUMNS, r[1:]))) for r in c.fetchall())
+
+        conflicts = []
+        # One executemany per distinct set of changed columns
+        statements = {}
+        for pid, fields in edits.items():
+            stored = current.get(pid)
+            changes = {}
+            for col, (original, value) in fields.items():
+                if stored is None or stored[col] != original:
+                    conflicts.append({
+                        "id": pid, "column": col, "original": original, "value": value,
+                        "current": None if stored is None else stored[col], "deleted": stored is None
+                    })
+                else:
+                    changes[col] = value
+            if changes:
+                columns = tuple(sorted(changes))
+                statements.setdefault(columns, []).append(tuple(changes[col] for col in columns) + (pid,))
+        for columns, rows in statements.items():
+            c.executemany(f"UPDATE products SET {', '.join(f'{col} = ?' for col in columns)} WHERE id = ?", rows)
+        conn.commit()
+        return {
+            "success": True,
+            "updated": sum(len(rows) for rows in statements.values()),
+            "conflicts": conflicts
+        }
+    except Exception as e:
+        conn.rollback()
+        return {"success": False, "error": str(e)}
+    finally:
+        conn.close()
+
 def delete_product(product_id):
     """Delete a product and its stock log entries."""
     conn = get_connection()
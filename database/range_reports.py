@@ -0,0 +1,253 @@
+# database/range_reports.py
+# Date-range reporting over many daily `sales_*.json` files. Each file is reduced
+# to a small summary in a process pool; summaries are cached in a sidecar index
+# keyed by file name, mtime and size so only changed days are parsed again.
+import json
+import os
+from datetime import date as date_cls, timedelta
+
+SUMMARY_INDEX_NAME = ".summary_index.json"
+SUMMARY_INDEX_VERSION = 1
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+
+def _empty_totals():
+    return {
+        "total_sales": 0.0,
+        "total_tax": 0.0,
+        "total_revenue": 0.0,
+        "total_units_sold": 0,
+        "transaction_count": 0
+    }
+
+
+def summarize_report_file(path):
+    """Reduce one daily report file to totals and per-product/cashier/payment breakdowns.
+
+    Runs inside worker processes, so it only takes and returns plain data.
+    """
+    with open(path, 'r') as f:
+        report = json.load(f)
+
+    totals = _empty_totals()
+    products = {}
+    cashiers = {}
+    payment_methods = {}
+    for sale in report.get("sales", []):
+        units = 0
+        for item in sale.get("items", []):
+            key = str(item.get("product_id"))
+            entry = products.get(key)
+            if entry is None:
+                entry = products[key] = {"product_name": item.get("product_name"), "quantity_sold": 0, "revenue": 0.0}
+            entry["quantity_sold"] += item.get("quantity", 0)
+            entry["revenue"] += item.get("line_total", 0)
+            units += item.get("quantity", 0)
+
+        total = sale.get("total") or 0
+        totals["total_sales"] += sale.get("subtotal") or 0
+        totals["total_tax"] += sale.get("tax") or 0
+        totals["total_revenue"] += total
+        totals["total_units_sold"] += units
+        totals["transaction_count"] += 1
+
+        for breakdown, name in ((cashiers, sale.get("cashier") or "-"),
+                                (payment_methods, sale.get("payment_method") or "-")):
+            entry = breakdown.get(name)
+            if entry is None:
+                entry = breakdown[name] = {"transactions": 0, "units": 0, "revenue": 0.0}
+            entry["transactions"] += 1
+            entry["units"] += units
+            entry["revenue"] += total
+
+    return {
+        "date": report.get("date"),
+        "totals": totals,
+        "products": products,
+        "cashiers": cashiers,
+        "payment_methods": payment_methods
+    }
+
+
+def _load_index(folder):
+    index_path = folder / SUMMARY_INDEX_NAME
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+        if index.get("version") == SUMMARY_INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": SUMMARY_INDEX_VERSION, "files": {}}
+
+
+def _save_index(folder, index):
+    """Write the sidecar index atomically so readers never see a partial file."""
+    index_path = folder / SUMMARY_INDEX_NAME
+    tmp_path = index_path.with_name(index_path.name + f".{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        # dumps() uses the C encoder in one call; dump() streams small chunks
+        f.write(json.dumps(index))
+    os.replace(tmp_path, index_path)
+
+
+def _merge_breakdown(target, source, fields):
+    for key, values in source.items():
+        entry = target.get(key)
+        if entry is None:
+            target[key] = dict(values)
+            continue
+        for field in fields:
+            entry[field] += values[field]
+
+
+def get_day_summaries(start, end, folder=None, max_workers=None, use_cache=True):
+    """Return per-day summaries for the inclusive "YYYY-MM-DD" range.
+
+    Cached summaries are reused while a file's mtime and size are unchanged; the
+    rest are parsed in a process pool (`max_workers=1` parses in-process).
+    """
+    if folder is None:
+        # Imported here so pool workers unpickling summarize_report_file stay light
+        from database.reports import REPORTS_FOLDER
+        folder = REPORTS_FOLDER
+    first = date_cls.fromisoformat(start)
+    last = date_cls.fromisoformat(end)
+    if last < first:
+        return {"success": False, "error": "End date is before start date"}
+
+    index = _load_index(folder) if use_cache else {"version": SUMMARY_INDEX_VERSION, "files": {}}
+    files = index["files"]
+    summaries = {}
+    missing_days = []
+    to_parse = []
+    day = first
+    while day <= last:
+        name = f"sales_{day.isoformat()}.json"
+        try:
+            st = os.stat(folder / name)
+        except OSError:
+            # Fall back to the columnar archive for compacted days
+            name = f"archive/{day.isoformat()}/manifest.json"
+            try:
+                st = os.stat(folder / name)
+            except OSError:
+                missing_days.append(day.isoformat())
+                day += timedelta(days=1)
+                continue
+        entry = files.get(name)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            summaries[day.isoformat()] = entry["summary"]
+        else:
+            to_parse.append((day.isoformat(), name, st))
+        day += timedelta(days=1)
+
+    if to_parse:
+        parsed = {}
+        archived = [name for _, name, _ in to_parse if name.startswith("archive/")]
+        if archived:
+            # Archived days are memory-mapped and summarized vectorized, in-process
+            from database.archive import summarize_archived_day
+            for name in archived:
+                parsed[name] = summarize_archived_day((folder / name).parent)
+        names = [name for _, name, _ in to_parse if name not in parsed]
+        paths = [str(folder / name) for name in names]
+        if max_workers == 1 or len(paths) < PARALLEL_THRESHOLD:
+            parsed.update(zip(names, map(summarize_report_file, paths)))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                chunksize = max(1, len(paths) // ((max_workers or os.cpu_count() or 1) * 4))
+                parsed.update(zip(names, pool.map(summarize_report_file, paths, chunksize=chunksize)))
+        for day_str, name, st in to_parse:
+            summary = parsed[name]
+            summaries[day_str] = summary
+            files[name] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "summary": summary}
+        if use_cache:
+            try:
+                _save_index(folder, index)
+            except OSError:
+                # Non-fatal: the next run simply parses these days again
+                pass
+
+    return {
+        "success": True,
+        "summaries": summaries,
+        "missing_days": missing_days,
+        "parsed": len(to_parse),
+        "cached": len(summaries) - len(to_parse)
+    }
+
+
+def get_range_report(start, end, folder=None, max_workers=None, use_cache=True):
+    """Merge daily summaries into range totals and per-product/cashier/payment breakdowns."""
+    try:
+        result = get_day_summaries(start, end, folder, max_workers, use_cache)
+        if not result["success"]:
+            return result
+
+        totals = _empty_totals()
+        products = {}
+        cashiers = {}
+        payment_methods = {}
+        daily = []
+        for day_str in sorted(result["summaries"]):
+            summary = result["summaries"][day_str]
+            for field, value in summary["totals"].items():
+                totals[field] += value
+            _merge_breakdown(products, summary["products"], ("quantity_sold", "revenue"))
+            _merge_breakdown(cashiers, summary["cashiers"], ("transactions", "units", "revenue"))
+            _merge_breakdown(payment_methods, summary["payment_methods"], ("transactions", "units", "revenue"))
+            daily.append({"date": day_str, **summary["totals"]})
+
+        return {
+            "success": True,
+            "start": start,
+            "end": end,
+            "days_with_sales": len(daily),
+            "missing_days": result["missing_days"],
+            "parsed": result["parsed"],
+            "cached": result["cached"],
+            "totals": totals,
+            "daily": daily,
+            "products": products,
+            "cashiers": cashiers,
+            "payment_methods": payment_methods
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def generate_range_report_text(start, end, folder=None, max_workers=None):
+    """Generate a formatted text report covering an inclusive date range."""
+    result = get_range_report(start, end, folder, max_workers)
+    if not result["success"]:
+        return result["error"]
+
+    totals = result["totals"]
+    lines = [
+        "=" * 60,
+        "SALES REPORT",
+        f"Period: {start} to {end}",
+        f"Days with sales: {result['days_with_sales']}",
+        "=" * 60,
+        "",
+        f"Total Transactions: {totals['transaction_count']}",
+        f"Total Units Sold:  {totals['total_units_sold']}",
+        f"Total Sales:       ${totals['total_sales']:.2f}",
+        f"Total Tax:         ${totals['total_tax']:.2f}",
+        f"Total Revenue:     ${totals['total_revenue']:.2f}",
+        "",
+        "BY PRODUCT:",
+        "-" * 60,
+    ]
+    for product_id, data in sorted(result["products"].items(), key=lambda kv: -kv[1]["revenue"]):
+        lines.append(f"  [{product_id}] {data['product_name']}: {data['quantity_sold']} units, ${data['revenue']:.2f}")
+    for title, breakdown in (("BY CASHIER:", result["cashiers"]), ("BY PAYMENT METHOD:", result["payment_methods"])):
+        lines += ["", title, "-" * 60]
+        for name, data in sorted(breakdown.items(), key=lambda kv: -kv[1]["revenue"]):
+            lines.append(f"  {name}: {data['transactions']} transactions, {data['units']} units, ${data['revenue']:.2f}")
+    lines.append("=" * 60)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,147 @@
+# database/reconcile.py
+# Reconciles the two records of every sale: `stock_log` rows written by
+# sell_product() and the sale entries log_sale() writes to the daily reports.
+# Both sides are streamed as (day, product_id) totals in sorted order and
+# merge-joined, so memory stays bounded by one day of report lines.
+from datetime import date as date_cls, timedelta
+from database.db import get_connection
+
+
+def _stock_log_totals(conn, start, end):
+    """Yield (day, product_id, units_sold, events) from stock_log, sorted by day and product.
+
+    `reconcile` rows count too, so applied corrections settle the difference.
+    """
+    cursor = conn.execute(
+        """
+        SELECT date(timestamp, 'localtime') AS day, product_id, -SUM(quantity), COUNT(*)
+        FROM stock_log
+        WHERE action IN ('sale', 'reconcile') AND date(timestamp, 'localtime') BETWEEN ? AND ?
+        GROUP BY day, product_id
+        ORDER BY day, product_id
+        """,
+        (start, end)
+    )
+    for row in cursor:
+        yield row
+
+
+def _report_totals(start, end, names):
+    """Yield (day, product_id, units_sold, events) from the daily reports, one day at a time."""
+    from database.reports import get_daily_report
+    day = date_cls.fromisoformat(start)
+    last = date_cls.fromisoformat(end)
+    while day <= last:
+        day_str = day.isoformat()
+        result = get_daily_report(day_str)
+        if result["success"]:
+            totals = {}
+            for sale in result["report"].get("sales", []):
+                for item in sale.get("items", []):
+                    product_id = item.get("product_id")
+                    entry = totals.get(product_id)
+                    if entry is None:
+                        entry = totals[product_id] = [0, 0]
+                        names[product_id] = item.get("product_name")
+                    entry[0] += item.get("quantity", 0)
+                    entry[1] += 1
+            for product_id in sorted(totals):
+                yield (day_str, product_id) + tuple(totals[product_id])
+        day += timedelta(days=1)
+
+
+def iter_discrepancies(start, end):
+    """Merge-join stock_log and report totals and yield every (day, product) that disagrees."""
+    names = {}
+    conn = get_connection()
+    try:
+        log_rows = _stock_log_totals(conn, start, end)
+        report_rows = _report_totals(start, end, names)
+        log_row = next(log_rows, None)
+        report_row = next(report_rows, None)
+        while log_row is not None or report_row is not None:
+            log_key = log_row[:2] if log_row is not None else None
+            report_key = report_row[:2] if report_row is not None else None
+            if report_key is None or (log_key is not None and log_key < report_key):
+                day, product_id, logged, _ = log_row
+                reported = 0
+                log_row = next(log_rows, None)
+            elif log_key is None or report_key < log_key:
+                day, product_id, reported, _ = report_row
+                logged = 0
+                report_row = next(report_rows, None)
+            else:
+                day, product_id, logged, _ = log_row
+                reported = report_row[2]
+                log_row = next(log_rows, None)
+                report_row = next(report_rows, None)
+
+            if logged == reported:
+                continue
+            if not logged:
+                kind = "missing_in_stock_log"
+            elif not reported:
+                kind = "missing_in_report"
+            else:
+                kind = "quantity_mismatch"
+            yield {
+                "date": day,
+                "product_id": product_id,
+                "product_name": names.get(product_id),
+                "report_units": reported,
+                "stock_log_units": logged,
+                "difference": reported - logged,
+                "kind": kind
+            }
+    finally:
+        conn.close()
+
+
+def reconcile_sales(start, end, include_corrections=False):
+    """Compare stock_log sales with logged sales reports for an inclusive date range.
+
+    The sales reports (what customers were receipted for) are treated as the
+    truth; each correction moves stock by the difference and logs a `reconcile`
+    row on the affected day.
+    """
+    try:
+        discrepancies = []
+        corrections = []
+        for entry in iter_discrepancies(start, end):
+            discrepancies.append(entry)
+            if include_corrections:
+                corrections.append({
+                    "date": entry["date"],
+                    "product_id": entry["product_id"],
+                    "quantity": -entry["difference"]
+                })
+        result = {"success": True, "start": start, "end": end, "discrepancies": discrepancies}
+        if include_corrections:
+            result["corrections"] = corrections
+        return result
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def apply_corrections(corrections):
+    """Write corrective `reconcile` stock_log rows and stock adjustments in one transaction."""
+    if not corrections:
+        return {"success": True, "applied": 0}
+    conn = get_connection()
+    try:
+        conn.executemany(
+            "UPDATE products SET stock = stock + ? WHERE id = ?",
+            [(c["quantity"], c["product_id"]) for c in corrections]
+        )
+        # Midday local time keeps the row on the reconciled day after UTC conversion
+        conn.executemany(
+            "INSERT INTO stock_log (product_id, action, quantity, timestamp) VALUES (?, 'reconcile', ?, datetime(?, 'utc'))",
+            [(c["product_id"], c["quantity"], f"{c['date']} 12:00:00") for c in corrections]
+        )
+        conn.commit()
+        return {"success": True, "applied": len(corrections)}
+    except Exception as e:
+        conn.rollback()
+        return {"success": False, "error": str(e)}
+    finally:
+        conn.close()
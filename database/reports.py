@@ -1,10 +1,17 @@
 # database/reports.py
 import json
+import os
 from pathlib import Path
 from datetime import datetime
 from config import STORE_NAME, STORE_ADDRESS, CONTACT_NUMBER, TAX_RATE, TAX_INCLUSIVE
+from database.db import get_connection
+from database.rollups import record_sale_rollups, mark_rollups_stale, get_daily_summary
+from database.sequence import default_allocator
 import csv
 
+# Transactions rendered per page in the reports viewer
+REPORT_PAGE_SIZE = 200
+
 # Reports folder path
 REPORTS_FOLDER = Path(__file__).parent.parent / "reports"
 REPORTS_FOLDER.mkdir(exist_ok=True)
@@ -19,9 +26,19 @@ def log_sale(receipt_data, metadata=None):
 
     `metadata` may include: cashier_name, payment_method, amount_paid, change, invoice_number
     If `invoice_number` is not provided, one is generated: INV/YYYYMMDD/NNN
+
+    Registers share the report file, so the whole read-append-write runs inside
+    one database write transaction (BEGIN IMMEDIATE), the lock every process
+    already shares. The invoice number is drawn in that transaction too, so a
+    failed write hands it back instead of leaving a gap.
     """
+    conn = None
+    allocator_state = default_allocator.state()
     try:
         report_path = get_today_report_path()
+        conn = get_connection()
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
 
         # Create or load existing report
         if report_path.exists():
@@ -47,16 +64,13 @@ def log_sale(receipt_data, metadata=None):
                 }
             }
 
-        # Transaction sequence id
-        txn_id = len(report["sales"]) + 1
-
-        # Generate invoice number if not provided
-        today_code = datetime.now().strftime("%Y%m%d")
-        invoice_number = None
         if metadata and metadata.get("invoice_number"):
+            # The caller's invoice number; the shared sequence is left alone
             invoice_number = metadata.get("invoice_number")
+            txn_id = len(report["sales"]) + 1
         else:
-            invoice_number = f"INV/{today_code}/{str(txn_id).zfill(3)}"
+            # Transaction sequence id from the shared, process-safe sequence
+            txn_id, invoice_number = default_allocator.next(report["date"], conn)
 
         # Build sale entry
         sale_entry = {
@@ -90,7 +104,6 @@ def log_sale(receipt_data, metadata=None):
         # Add to report
         report["sales"].append(sale_entry)
 
-        # Update summary
         report["summary"]["total_sales"] += receipt_data["totals"]["subtotal"]
         report["summary"]["total_tax"] += receipt_data["totals"]["tax"]
         report["summary"]["total_revenue"] += receipt_data["totals"]["total"]
@@ -98,19 +111,73 @@ def log_sale(receipt_data, metadata=None):
         report["summary"]["transaction_count"] += 1
 
         # Save report
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        _write_report(report_path, report)
+
+        # Only a sale that reached the report is folded into the rollups
+        _record_rollups(report, sale_entry, conn)
 
-        # Also export CSV for today's report
+        # Also export CSV for today's report, from the report already in memory
         try:
-            export_daily_csv()
+            export_daily_csv(model=DailyReport(report))
         except Exception:
             # Non-fatal: continue even if CSV export fails
             pass
 
+        conn.execute("COMMIT")
         return {"success": True, "report_path": str(report_path), "invoice_number": invoice_number}
     except Exception as e:
+        if conn is not None and conn.in_transaction:
+            conn.execute("ROLLBACK")
+        default_allocator.restore(allocator_state)
         return {"success": False, "error": str(e)}
+    finally:
+        if conn is not None:
+            conn.close()
+
+def _write_report(report_path, report):
+    """Replace a daily report atomically, so readers never see a partial file."""
+    tmp_path = report_path.with_name(report_path.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, report_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def _record_rollups(report, sale_entry, conn):
+    """Fold `sale_entry` into the rollups, flagging the day if they disagree with `report`.
+
+    Runs in log_sale's transaction under a savepoint, so a rollup failure is
+    undone on its own without losing the sale. A day whose rollups miss earlier
+    sales (e.g. logged before rollups existed) is marked stale for
+    `python -m reports rebuild-rollups --stale` rather than rebuilt here, on the
+    checkout path.
+    """
+    date_str = report["date"]
+    conn.execute("SAVEPOINT sale_rollup")
+    if not record_sale_rollups(date_str, sale_entry, conn)["success"]:
+        conn.execute("ROLLBACK TO sale_rollup")
+        mark_rollups_stale(date_str, conn)
+    else:
+        summary = get_daily_summary(date_str, conn)
+        if summary is None or summary["transaction_count"] != len(report["sales"]):
+            mark_rollups_stale(date_str, conn)
+    conn.execute("RELEASE sale_rollup")
+
+def get_report_signature(date=None):
+    """Return (path, mtime_ns, size) of the file backing a day's report, or None.
+
+    Archived days are identified by their manifest; any rewrite changes the signature.
+    """
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    for path in (REPORTS_FOLDER / f"sales_{date}.json",
+                 REPORTS_FOLDER / "archive" / date / "manifest.json"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        return (str(path), st.st_mtime_ns, st.st_size)
+    return None
 
 def get_daily_report(date=None):
     """Retrieve a daily sales report."""
@@ -121,6 +188,11 @@ def get_daily_report(date=None):
             report_path = REPORTS_FOLDER / f"sales_{date}.json"
         
         if not report_path.exists():
+            # Closed days may have been compacted into the columnar archive
+            date_str = report_path.stem[len("sales_"):]
+            if (REPORTS_FOLDER / "archive" / date_str / "manifest.json").exists():
+                from database.archive import load_archived_report
+                return load_archived_report(date_str)
             return {"success": False, "error": f"No report found for {date or 'today'}"}
         
         with open(report_path, 'r') as f:
@@ -130,108 +202,117 @@ def get_daily_report(date=None):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def get_stock_changes_for_date(date=None):
-    """Get a summary of stock changes from sales on a given date."""
+# CSV columns produced by export_daily_csv
+CSV_HEADER = [
+    'invoice_number', 'timestamp', 'transaction_id', 'cashier', 'payment_method',
+    'product_id', 'product_name', 'code', 'color', 'size', 'quantity', 'unit_price', 'line_total',
+    'subtotal', 'tax', 'total', 'amount_paid', 'change'
+]
+
+class DailyReport:
+    """A day's report parsed once, with every derived view built in the same pass.
+
+    `report` is the raw report dict, `sales` its transactions, `stock_changes` the
+    per-product aggregation and `csv_rows` the export rows in CSV_HEADER order.
+    """
+
+    __slots__ = ("date", "report", "sales", "summary", "stock_changes", "csv_rows")
+
+    def __init__(self, report):
+        self.report = report
+        self.date = report["date"]
+        self.sales = report.get("sales", [])
+        self.summary = report.get("summary", {})
+        self.stock_changes = {}
+        self.csv_rows = []
+
+        stock_changes = self.stock_changes
+        csv_rows = self.csv_rows
+        for sale in self.sales:
+            sale_head = (sale.get('invoice_number'), sale.get('timestamp'), sale.get('transaction_id'),
+                         sale.get('cashier'), sale.get('payment_method'))
+            sale_tail = (sale.get('subtotal'), sale.get('tax'), sale.get('total'),
+                         sale.get('amount_paid'), sale.get('change'))
+            for item in sale.get("items", []):
+                product_id = item.get("product_id")
+                change = stock_changes.get(product_id)
+                if change is None:
+                    change = stock_changes[product_id] = {
+                        "product_name": item.get("product_name"),
+                        "quantity_sold": 0,
+                        "revenue": 0.0
+                    }
+                change["quantity_sold"] += item.get("quantity", 0)
+                change["revenue"] += item.get("line_total", 0)
+
+                csv_rows.append(sale_head + (
+                    product_id, item.get('product_name'), item.get('code'), item.get('color'),
+                    item.get('size'), item.get('quantity'), item.get('unit_price'), item.get('line_total')
+                ) + sale_tail)
+
+def load_daily_report_model(date=None):
+    """Parse a day's report once into a DailyReport."""
     try:
         result = get_daily_report(date)
         if not result["success"]:
             return result
-        
-        report = result["report"]
-        stock_changes = {}
-        
-        for sale in report["sales"]:
-            for item in sale["items"]:
-                product_id = item["product_id"]
-                if product_id not in stock_changes:
-                    stock_changes[product_id] = {
-                        "product_name": item["product_name"],
-                        "quantity_sold": 0,
-                        "revenue": 0.0
-                    }
-                
-                stock_changes[product_id]["quantity_sold"] += item["quantity"]
-                stock_changes[product_id]["revenue"] += item["line_total"]
-        
-        return {"success": True, "stock_changes": stock_changes, "date": report["date"]}
+        return {"success": True, "model": DailyReport(result["report"])}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def get_stock_changes_for_date(date=None, model=None):
+    """Get a summary of stock changes from sales on a given date."""
+    if model is None:
+        result = load_daily_report_model(date)
+        if not result["success"]:
+            return result
+        model = result["model"]
+    return {"success": True, "stock_changes": model.stock_changes, "date": model.date}
+
+def format_stock_changes(date, stock_changes):
+    """Format per-product stock changes for the reports window."""
+    if not stock_changes:
+        return f"No sales recorded for {date}"
+    lines = [f"Stock Changes for {date}:", "=" * 60, ""]
+    for product_id, data in sorted(stock_changes.items()):
+        lines.append(f"Product ID {product_id}: {data['product_name']}")
+        lines.append(f"  Units Sold: {data['quantity_sold']}")
+        lines.append(f"  Revenue: ${data['revenue']:.2f}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
 
-def export_daily_csv(date=None):
+def export_daily_csv(date=None, model=None):
     """Export the daily JSON report to a CSV file.
 
     Each CSV row corresponds to one sold item with transaction metadata.
+    Pass an already loaded DailyReport as `model` to skip reading the report.
     """
     try:
-        # Load report
-        if date is None:
-            report_path = get_today_report_path()
-            csv_name = report_path.with_suffix('.csv')
-        else:
-            report_path = REPORTS_FOLDER / f"sales_{date}.json"
-            csv_name = REPORTS_FOLDER / f"sales_{date}.csv"
-
-        if not report_path.exists():
-            return {"success": False, "error": f"No report found for {date or 'today'}"}
-
-        with open(report_path, 'r') as f:
-            report = json.load(f)
-
-        # CSV header
-        header = [
-            'invoice_number', 'timestamp', 'transaction_id', 'cashier', 'payment_method',
-            'product_id', 'product_name', 'code', 'color', 'size', 'quantity', 'unit_price', 'line_total',
-            'subtotal', 'tax', 'total', 'amount_paid', 'change'
-        ]
+        if model is None:
+            result = load_daily_report_model(date)
+            if not result["success"]:
+                return result
+            model = result["model"]
+        csv_name = REPORTS_FOLDER / f"sales_{model.date}.csv"
 
         with open(csv_name, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=header)
-            writer.writeheader()
-
-            for sale in report.get('sales', []):
-                for item in sale.get('items', []):
-                    row = {
-                        'invoice_number': sale.get('invoice_number'),
-                        'timestamp': sale.get('timestamp'),
-                        'transaction_id': sale.get('transaction_id'),
-                        'cashier': sale.get('cashier'),
-                        'payment_method': sale.get('payment_method'),
-                        'product_id': item.get('product_id'),
-                        'product_name': item.get('product_name'),
-                        'code': item.get('code'),
-                        'color': item.get('color'),
-                        'size': item.get('size'),
-                        'quantity': item.get('quantity'),
-                        'unit_price': item.get('unit_price'),
-                        'line_total': item.get('line_total'),
-                        'subtotal': sale.get('subtotal'),
-                        'tax': sale.get('tax'),
-                        'total': sale.get('total'),
-                        'amount_paid': sale.get('amount_paid'),
-                        'change': sale.get('change')
-                    }
-                    writer.writerow(row)
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(model.csv_rows)
 
         return {"success": True, "csv_path": str(csv_name)}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def generate_report_text(date=None):
-    """Generate a formatted text report for printing or viewing."""
-    try:
-        result = get_daily_report(date)
-        if not result["success"]:
-            return result["error"]
-        
-        report = result["report"]
-        summary = report["summary"]
-        store = report.get("store", {})
-        store_block = ""
-        if store:
-            store_block = f"{store.get('name','')}\n{store.get('address','')}\nTel: {store.get('contact','')}\nTax: {int(store.get('tax_rate',0)*100)}% {'(Included)' if store.get('tax_inclusive') else ''}\n\n"
-
-        text = f"""
+def _render_report_header(report):
+    """Render the title and store block of a daily report."""
+    store = report.get("store", {})
+    store_block = ""
+    if store:
+        store_block = f"{store.get('name','')}\n{store.get('address','')}\nTel: {store.get('contact','')}\nTax: {int(store.get('tax_rate',0)*100)}% {'(Included)' if store.get('tax_inclusive') else ''}\n\n"
+
+    return f"""
 {'=' * 60}
 DAILY SALES REPORT
 Date: {report['date']}
@@ -240,25 +321,28 @@ Date: {report['date']}
 {store_block}
 TRANSACTION DETAILS:
 """
-        
-        for idx, sale in enumerate(report["sales"], 1):
-            text += f"\nTransaction #{sale['transaction_id']} - {sale['timestamp']}\n"
-            text += f"Invoice: {sale.get('invoice_number','-')}\n"
-            text += f"Cashier: {sale.get('cashier','-')}    Payment: {sale.get('payment_method','-')}\n"
-            text += "-" * 60 + "\n"
-            
-            for item in sale["items"]:
-                text += f"  {item['product_name']} ({item.get('code','-')})\n"
-                text += f"    Color: {item.get('color','')}, Size: {item.get('size','')}\n"
-                text += f"    Qty: {item['quantity']} @ ${item['unit_price']:.2f} = ${item['line_total']:.2f}\n"
-            
-            text += f"  Subtotal: ${sale['subtotal']:.2f}\n"
-            text += f"  Tax:      ${sale['tax']:.2f}\n"
-            text += f"  Total:    ${sale['total']:.2f}\n"
-            text += f"  Bayar:    ${sale.get('amount_paid',0):.2f}    Kembali: ${sale.get('change',0):.2f}\n"
-        
-        # Summary section
-        text += f"""
+
+def _render_transaction(sale):
+    """Render one transaction block of a daily report."""
+    lines = [
+        f"\nTransaction #{sale['transaction_id']} - {sale['timestamp']}\n",
+        f"Invoice: {sale.get('invoice_number','-')}\n",
+        f"Cashier: {sale.get('cashier','-')}    Payment: {sale.get('payment_method','-')}\n",
+        "-" * 60 + "\n",
+    ]
+    for item in sale["items"]:
+        lines.append(f"  {item['product_name']} ({item.get('code','-')})\n")
+        lines.append(f"    Color: {item.get('color','')}, Size: {item.get('size','')}\n")
+        lines.append(f"    Qty: {item['quantity']} @ ${item['unit_price']:.2f} = ${item['line_total']:.2f}\n")
+    lines.append(f"  Subtotal: ${sale['subtotal']:.2f}\n")
+    lines.append(f"  Tax:      ${sale['tax']:.2f}\n")
+    lines.append(f"  Total:    ${sale['total']:.2f}\n")
+    lines.append(f"  Bayar:    ${sale.get('amount_paid',0):.2f}    Kembali: ${sale.get('change',0):.2f}\n")
+    return "".join(lines)
+
+def _render_summary(summary):
+    """Render the daily summary block."""
+    return f"""
 {'=' * 60}
 DAILY SUMMARY
 {'=' * 60}
@@ -269,7 +353,53 @@ Total Tax:         ${summary['total_tax']:.2f}
 Total Revenue:     ${summary['total_revenue']:.2f}
 {'=' * 60}
 """
-        
-        return text
+
+def iter_report_sections(date=None, report=None):
+    """Yield the formatted daily report section by section.
+
+    Pass an already loaded `report` dict or DailyReport to skip reading the file again.
+    """
+    try:
+        if report is None:
+            result = get_daily_report(date)
+            if not result["success"]:
+                yield result["error"]
+                return
+            report = result["report"]
+        elif isinstance(report, DailyReport):
+            report = report.report
+
+        yield _render_report_header(report)
+        for sale in report["sales"]:
+            yield _render_transaction(sale)
+        yield _render_summary(report["summary"])
     except Exception as e:
-        return f"Error generating report: {str(e)}"
+        yield f"Error generating report: {str(e)}"
+
+def generate_report_text(date=None, model=None):
+    """Generate a formatted text report for printing or viewing."""
+    return "".join(iter_report_sections(date, model))
+
+def write_report(stream, date=None, report=None):
+    """Stream the formatted daily report into a writable text `stream`."""
+    for section in iter_report_sections(date, report):
+        stream.write(section)
+
+def render_report_page(report, page, page_size=REPORT_PAGE_SIZE):
+    """Render one page of transactions (0-based `page`) with the header and summary.
+
+    Returns (text, page_count); only the transactions on that page are formatted.
+    """
+    if isinstance(report, DailyReport):
+        report = report.report
+    sales = report["sales"]
+    page_count = max(1, -(-len(sales) // page_size))
+    page = min(max(page, 0), page_count - 1)
+    start = page * page_size
+    sections = [_render_report_header(report)]
+    if page_count > 1:
+        end = min(start + page_size, len(sales))
+        sections.append(f"(Transactions {start + 1}-{end} of {len(sales)}, page {page + 1} of {page_count})\n")
+    sections.extend(_render_transaction(sale) for sale in sales[start:start + page_size])
+    sections.append(_render_summary(report["summary"]))
+    return "".join(sections), page_count
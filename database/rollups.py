@@ -0,0 +1,263 @@
+# database/rollups.py
+# Pre-aggregated sales rollups. Every logged sale is folded into `sales_rollup`
+# at hour, day and month granularity, once for the whole store ("all") and once
+# per product, cashier and payment method, so dashboards and report summaries
+# read a handful of rows instead of walking every sale line.
+from datetime import date as date_cls, datetime, timedelta
+from database.db import get_connection
+
+GRAINS = ("hour", "day", "month")
+DIMENSIONS = ("all", "product", "cashier", "payment_method")
+
+UPSERT_SQL = """
+INSERT INTO sales_rollup (grain, bucket, dimension, dim_key, label, transactions, units, sales, tax, revenue)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (grain, bucket, dimension, dim_key) DO UPDATE SET
+    label = excluded.label,
+    transactions = transactions + excluded.transactions,
+    units = units + excluded.units,
+    sales = sales + excluded.sales,
+    tax = tax + excluded.tax,
+    revenue = revenue + excluded.revenue
+"""
+
+
+def _buckets(date_str, timestamp):
+    """Return the (grain, bucket) pairs a sale at `date_str` `timestamp` falls into."""
+    hour = (timestamp or "00")[:2]
+    return (
+        ("hour", f"{date_str} {hour}"),
+        ("day", date_str),
+        ("month", date_str[:7]),
+    )
+
+
+def _sale_contributions(date_str, sale):
+    """Break one sale entry into per-dimension rollup deltas."""
+    items = sale.get("items", [])
+    subtotal = sale.get("subtotal") or 0
+    tax = sale.get("tax") or 0
+    total = sale.get("total") or 0
+    units = sum(item.get("quantity", 0) for item in items)
+
+    cashier = sale.get("cashier") or "-"
+    payment = sale.get("payment_method") or "-"
+    deltas = [
+        ("all", "", None, units, subtotal, tax, total),
+        ("cashier", cashier, cashier, units, subtotal, tax, total),
+        ("payment_method", payment, payment, units, subtotal, tax, total),
+    ]
+
+    # Products get their share of the sale tax in proportion to line totals
+    by_product = {}
+    for item in items:
+        key = str(item.get("product_id"))
+        entry = by_product.setdefault(key, [item.get("product_name"), 0, 0.0])
+        entry[1] += item.get("quantity", 0)
+        entry[2] += item.get("line_total", 0)
+    for key, (name, qty, line_total) in by_product.items():
+        line_tax = tax * line_total / subtotal if subtotal else 0
+        deltas.append(("product", key, name, qty, line_total, line_tax, line_total + line_tax))
+
+    rows = []
+    for grain, bucket in _buckets(date_str, sale.get("timestamp")):
+        for dimension, key, label, qty, sales, line_tax, revenue in deltas:
+            rows.append((grain, bucket, dimension, key, label, 1, qty, sales, line_tax, revenue))
+    return rows
+
+
+def record_sale_rollups(date_str, sale, conn=None):
+    """Fold a single sale entry into the rollup tables."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        conn.executemany(UPSERT_SQL, _sale_contributions(date_str, sale))
+        if own_conn:
+            conn.commit()
+        return {"success": True}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def _month_range(start, end):
+    """Expand a date range outward to whole months, returned as date objects."""
+    first = start.replace(day=1)
+    last = (end.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first, last
+
+
+def rebuild_rollups(start=None, end=None):
+    """Rebuild rollups from the raw daily reports.
+
+    `start`/`end` are "YYYY-MM-DD" strings; the range is widened to whole months
+    so month buckets stay complete. With no range, every report is rebuilt.
+    Days compacted into the archive (JSON removed) are read back from it.
+    Rebuilt days are no longer flagged stale.
+    """
+    from database.reports import REPORTS_FOLDER, get_daily_report
+
+    available = {p.stem[len("sales_"):] for p in REPORTS_FOLDER.glob("sales_*.json")}
+    # The month-wide DELETEs below must not drop days that only live in the
+    # archive (same layout as archive.list_archived_days, without loading NumPy)
+    available.update(p.parent.name for p in REPORTS_FOLDER.glob("archive/*/manifest.json"))
+    if not available:
+        return {"success": True, "days": 0}
+
+    if start is None or end is None:
+        days = sorted(available)
+        start = start or days[0]
+        end = end or days[-1]
+    first, last = _month_range(date_cls.fromisoformat(start), date_cls.fromisoformat(end))
+    first_str, last_str = first.isoformat(), last.isoformat()
+
+    # Sum every sale's contributions here, then insert one row per bucket
+    totals = {}
+    rebuilt = 0
+    for day in sorted(d for d in available if first_str <= d <= last_str):
+        result = get_daily_report(day)
+        if not result["success"]:
+            continue
+        for sale in result["report"].get("sales", []):
+            for grain, bucket, dimension, key, label, transactions, units, sales, tax, revenue in \
+                    _sale_contributions(day, sale):
+                row = totals.get((grain, bucket, dimension, key))
+                if row is None:
+                    totals[(grain, bucket, dimension, key)] = [label, transactions, units, sales, tax, revenue]
+                else:
+                    row[0] = label
+                    row[1] += transactions
+                    row[2] += units
+                    row[3] += sales
+                    row[4] += tax
+                    row[5] += revenue
+        rebuilt += 1
+
+    conn = get_connection()
+    try:
+        conn.execute(
+            "DELETE FROM sales_rollup WHERE grain = 'month' AND bucket BETWEEN ? AND ?",
+            (first_str[:7], last_str[:7])
+        )
+        conn.execute(
+            "DELETE FROM sales_rollup WHERE grain = 'day' AND bucket BETWEEN ? AND ?",
+            (first_str, last_str)
+        )
+        conn.execute(
+            "DELETE FROM sales_rollup WHERE grain = 'hour' AND bucket BETWEEN ? AND ?",
+            (f"{first_str} 00", f"{last_str} 99")
+        )
+        conn.executemany(
+            "INSERT INTO sales_rollup (grain, bucket, dimension, dim_key, label, transactions, units, sales, tax, revenue) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [key + tuple(values) for key, values in totals.items()]
+        )
+        conn.execute("DELETE FROM rollup_stale WHERE day BETWEEN ? AND ?", (first_str, last_str))
+        conn.commit()
+        return {"success": True, "days": rebuilt}
+    except Exception as e:
+        conn.rollback()
+        return {"success": False, "error": str(e)}
+    finally:
+        conn.close()
+
+
+def mark_rollups_stale(date_str, conn=None):
+    """Flag a day whose rollups disagree with its report, for `python -m reports rebuild-rollups`."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        conn.execute("INSERT OR IGNORE INTO rollup_stale (day) VALUES (?)", (date_str,))
+        if own_conn:
+            conn.commit()
+        return {"success": True}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def get_stale_days():
+    """Return the sorted days flagged by mark_rollups_stale."""
+    conn = get_connection()
+    try:
+        return [row[0] for row in conn.execute("SELECT day FROM rollup_stale ORDER BY day").fetchall()]
+    finally:
+        conn.close()
+
+
+def bucket_bounds(grain, start, end):
+    """Translate an inclusive "YYYY-MM-DD" range into bucket bounds for `grain`."""
+    if grain == "month":
+        return start[:7], end[:7]
+    if grain == "hour":
+        return f"{start} 00", f"{end} 99"
+    return start, end
+
+
+def get_rollups(grain="day", dimension="all", start=None, end=None, key=None, conn=None):
+    """Return pre-aggregated rows for `grain` and `dimension`, ordered by bucket.
+
+    `start`/`end` are inclusive "YYYY-MM-DD" dates; `key` restricts the rows to a
+    single product id, cashier or payment method. Pass `conn` to read inside an
+    open transaction.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}'")
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension '{dimension}'")
+
+    sql = ("SELECT bucket, dim_key, label, transactions, units, sales, tax, revenue "
+           "FROM sales_rollup WHERE grain = ? AND dimension = ?")
+    params = [grain, dimension]
+    if start or end:
+        low, high = bucket_bounds(grain, start or "0000-00-00", end or "9999-99-99")
+        sql += " AND bucket BETWEEN ? AND ?"
+        params += [low, high]
+    if key is not None:
+        sql += " AND dim_key = ?"
+        params.append(str(key))
+    sql += " ORDER BY bucket, dim_key"
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return [
+        {
+            "bucket": bucket,
+            "key": dim_key,
+            "label": label,
+            "transactions": transactions,
+            "units": units,
+            "sales": sales,
+            "tax": tax,
+            "revenue": revenue,
+        }
+        for bucket, dim_key, label, transactions, units, sales, tax, revenue in rows
+    ]
+
+
+def get_daily_summary(date_str=None, conn=None):
+    """Return the daily report `summary` block built from the day rollup, or None."""
+    date_str = date_str or datetime.now().strftime("%Y-%m-%d")
+    rows = get_rollups("day", "all", date_str, date_str, conn=conn)
+    if not rows:
+        return None
+    row = rows[0]
+    return {
+        "total_sales": round(row["sales"], 2),
+        "total_tax": round(row["tax"], 2),
+        "total_revenue": round(row["revenue"], 2),
+        "total_units_sold": row["units"],
+        "transaction_count": row["transactions"],
+    }
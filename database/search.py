@@ -0,0 +1,36 @@
+# database/search.py
+# Incremental product search for the ID/Code/Name filter boxes. Lowercased
+# search text is prepared once per product list; a query that extends an
+# earlier one is only checked against that query's hits.
+
+
+class ProductMatcher:
+    """Matches product rows (anything with id, code and name) by ID prefix or code/name substring.
+
+    `match(query)` returns the indexes of matching rows in list order, or None
+    when the query is empty (every row matches).
+    """
+
+    def __init__(self, products):
+        self.ids = [str(product.id).lower() for product in products]
+        # Code and name in one string; the separator cannot be typed into a query
+        self.texts = [f"{(product.code or '').lower()}\0{(product.name or '').lower()}" for product in products]
+        self.history = []  # (query, hits) for each step of the query being typed
+
+    def match(self, query):
+        query = query.strip().lower()
+        if not query:
+            self.history = []
+            return None
+
+        # Keep only earlier queries this one extends; a backspace falls back a step
+        while self.history and not query.startswith(self.history[-1][0]):
+            self.history.pop()
+        if self.history and self.history[-1][0] == query:
+            return self.history[-1][1]
+        candidates = self.history[-1][1] if self.history else range(len(self.ids))
+
+        ids, texts = self.ids, self.texts
+        hits = [i for i in candidates if ids[i].startswith(query) or query in texts[i]]
+        self.history.append((query, hits))
+        return hits
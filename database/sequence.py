@@ -0,0 +1,109 @@
+# database/sequence.py
+# Process-safe invoice numbering. Each day has one row in `invoice_sequence`;
+# numbers are handed out with a single UPDATE inside a write transaction, so
+# several registers sharing the db file never mint the same invoice.
+import json
+import sqlite3
+from datetime import datetime
+from database.db import get_connection
+from config import INVOICE_BLOCK_SIZE
+
+
+def format_invoice_number(day, number):
+    """Format an invoice number as INV/YYYYMMDD/NNN for a "YYYY-MM-DD" day."""
+    return f"INV/{day.replace('-', '')}/{str(number).zfill(3)}"
+
+
+def _existing_sales_count(day):
+    """Count sales already in the day's report (for days logged before the sequence existed)."""
+    from database.reports import REPORTS_FOLDER
+    report_path = REPORTS_FOLDER / f"sales_{day}.json"
+    if not report_path.exists():
+        return 0
+    try:
+        with open(report_path, 'r') as f:
+            return len(json.load(f).get("sales", []))
+    except (OSError, ValueError):
+        return 0
+
+
+def _reserve(conn, count, day):
+    row = conn.execute("SELECT last_value FROM invoice_sequence WHERE day = ?", (day,)).fetchone()
+    if row is None:
+        last = _existing_sales_count(day) + count
+        conn.execute("INSERT INTO invoice_sequence (day, last_value) VALUES (?, ?)", (day, last))
+    else:
+        last = row[0] + count
+        conn.execute("UPDATE invoice_sequence SET last_value = ? WHERE day = ?", (last, day))
+    return last - count + 1
+
+
+def reserve_invoice_numbers(count=1, day=None, conn=None):
+    """Atomically reserve `count` consecutive numbers for `day`; returns the first one.
+
+    With `conn`, the numbers are taken inside the caller's open write
+    transaction (see log_sale) and are only kept if the caller commits.
+    """
+    if count <= 0:
+        raise ValueError("count must be positive")
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    if conn is not None:
+        return _reserve(conn, count, day)
+    conn = get_connection()
+    conn.isolation_level = None
+    try:
+        # IMMEDIATE takes the write lock up front so the read-then-write below is atomic
+        conn.execute("BEGIN IMMEDIATE")
+        first = _reserve(conn, count, day)
+        conn.execute("COMMIT")
+        return first
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+class InvoiceAllocator:
+    """Hands out invoice numbers, reserving them from the shared sequence in blocks.
+
+    With `block_size=1` every number comes straight from the database and the
+    day's invoices run without gaps. Larger blocks let a register number several
+    sales per database round trip, but the numbers left in its block when the
+    register exits (or the day changes) are never used: invoices stay unique,
+    with gaps of up to block_size - 1 per register. benchmarks/sequence.py
+    checks both with concurrent processes.
+    """
+
+    def __init__(self, block_size=INVOICE_BLOCK_SIZE):
+        self.block_size = max(1, int(block_size))
+        self.day = None
+        self.next_number = 0
+        self.block_end = 0
+
+    def next(self, day=None, conn=None):
+        """Return (sequence_number, invoice_number) for the next sale on `day`.
+
+        `conn` is passed on to reserve_invoice_numbers when a new block is needed.
+        """
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        if day != self.day or self.next_number > self.block_end:
+            self.day = day
+            self.next_number = reserve_invoice_numbers(self.block_size, day, conn)
+            self.block_end = self.next_number + self.block_size - 1
+        number = self.next_number
+        self.next_number += 1
+        return number, format_invoice_number(day, number)
+
+    def state(self):
+        """Snapshot for restore(), taken before a next() that may be rolled back."""
+        return self.day, self.next_number, self.block_end
+
+    def restore(self, state):
+        """Undo next() calls since `state`, after their transaction was rolled back."""
+        self.day, self.next_number, self.block_end = state
+
+
+# Shared by log_sale() within this process
+default_allocator = InvoiceAllocator()
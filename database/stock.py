@@ -1,9 +1,283 @@
 # database/stock.py
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QTableWidget, QTableWidgetItem, QPushButton, QSpinBox,
-                               QMessageBox, QHeaderView, QApplication, QLineEdit)
-from PySide6.QtCore import Qt
-from database.queries import get_stock, restock_product
+                               QMessageBox, QHeaderView, QApplication, QLineEdit, QTabWidget,
+                               QTableView, QStyledItemDelegate, QAbstractItemView,
+                               QDialog, QDialogButtonBox, QFileDialog, QPlainTextEdit)
+from PySide6.QtCore import Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex, QTimer
+from database.queries import (get_products, restock_products, get_catalog_version, get_catalog_changes,
+                              STOCK_GRID_COLUMNS)
+from database.forecast import build_reorder_list
+from database.search import ProductMatcher
+from database.diagnostics import profiled
+from database.manifest import load_manifest, apply_manifest
+from config import SEARCH_DEBOUNCE_MS
+
+RESTOCK_COLUMN = 6
+MAX_RESTOCK_QTY = 9999
+# Restocks of up to this many products list each one in the confirmation
+RESTOCK_LIST_LIMIT = 20
+
+
+class StockTableModel(QAbstractTableModel):
+    """Products and pending restock quantities for the restock grid.
+
+    Rows are STOCK_GRID_COLUMNS product rows. Restock quantities are only
+    stored for products that have one, keyed by product id.
+    """
+
+    HEADERS = ["ID", "Name", "Code", "Color", "Size", "Current Stock", "Restock Qty"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.products = []
+        self.pending = {}  # product_id -> restock quantity
+
+    def set_products(self, products):
+        self.beginResetModel()
+        self.products = products
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.products)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == RESTOCK_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        product = self.products[index.row()]
+        col = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == 0:
+                return str(product.id)
+            if col == 1:
+                return product.name
+            if col in (2, 3, 4):
+                value = (product.code, product.color, product.size)[col - 2]
+                return value if value else "N/A"
+            if col == 5:
+                return str(product.stock)
+            if col == RESTOCK_COLUMN:
+                quantity = self.pending.get(product.id, 0)
+                return quantity if role == Qt.EditRole else str(quantity)
+        elif role == Qt.TextAlignmentRole and col in (5, RESTOCK_COLUMN):
+            return int(Qt.AlignCenter)
+        elif role == Qt.UserRole:
+            return product.id
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() != RESTOCK_COLUMN:
+            return False
+        product_id = self.products[index.row()].id
+        quantity = int(value or 0)
+        if quantity > 0:
+            self.pending[product_id] = quantity
+        else:
+            self.pending.pop(product_id, None)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def update_products(self, rows):
+        """Replace changed products in place and append new ones; pending quantities are kept."""
+        position = {product.id: i for i, product in enumerate(self.products)}
+        added = []
+        for product in rows:
+            row = position.get(product.id)
+            if row is None:
+                added.append(product)
+            else:
+                self.products[row] = product
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self.products), len(self.products) + len(added) - 1)
+            self.products.extend(added)
+            self.endInsertRows()
+
+    def clear_pending(self, product_ids=None):
+        """Drop pending quantities (all, or only for `product_ids`)."""
+        if product_ids is None:
+            self.pending.clear()
+        else:
+            for product_id in product_ids:
+                self.pending.pop(product_id, None)
+        if self.products:
+            self.dataChanged.emit(self.index(0, RESTOCK_COLUMN),
+                                  self.index(len(self.products) - 1, RESTOCK_COLUMN))
+
+
+class FilteredRowsProxyModel(QAbstractProxyModel):
+    """Shows a subset of the source rows, given as a list of source row indexes.
+
+    Changing the filter only swaps the row list; nothing in the source model
+    is rebuilt.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = None            # None shows every source row
+        self._proxy_rows = None     # source row -> proxy row, built on demand
+
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.modelReset.connect(self._source_reset)
+        model.rowsAboutToBeInserted.connect(self._source_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self._source_rows_inserted)
+        model.dataChanged.connect(self._source_data_changed)
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self._proxy_rows = None
+        self.endResetModel()
+
+    def _source_reset(self):
+        self.set_rows(None)
+
+    def _source_rows_about_to_be_inserted(self, parent, first, last):
+        # Unfiltered, new source rows are new proxy rows at the same place
+        if self.rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _source_rows_inserted(self, parent, first, last):
+        if self.rows is None:
+            self.endInsertRows()
+            return
+        # Filtered, the new rows stay hidden until the filter is applied again;
+        # only the source rows after them move
+        count = last - first + 1
+        self.rows = [row + count if row >= first else row for row in self.rows]
+        self._proxy_rows = None
+
+    def _source_data_changed(self, top_left, bottom_right, roles=()):
+        if top_left.row() == bottom_right.row():
+            top_left = self.mapFromSource(top_left)
+            bottom_right = self.mapFromSource(bottom_right)
+            if not top_left.isValid():
+                return
+        else:
+            top_left = self.index(0, top_left.column())
+            bottom_right = self.index(self.rowCount() - 1, bottom_right.column())
+        self.dataChanged.emit(top_left, bottom_right, roles)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self.rows is None else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row() if self.rows is None else self.rows[proxy_index.row()]
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self.rows is None:
+            return self.index(source_index.row(), source_index.column())
+        if self._proxy_rows is None:
+            self._proxy_rows = {row: i for i, row in enumerate(self.rows)}
+        row = self._proxy_rows.get(source_index.row())
+        return QModelIndex() if row is None else self.index(row, source_index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        if role == Qt.DisplayRole:
+            return str(section + 1)
+        return None
+
+
+class RestockSpinBoxDelegate(QStyledItemDelegate):
+    """Spin box editor for the Restock Qty column, created only while a cell is edited."""
+
+    def createEditor(self, parent, option, index):
+        spinbox = QSpinBox(parent)
+        spinbox.setMinimum(0)
+        spinbox.setMaximum(MAX_RESTOCK_QTY)
+        return spinbox
+
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(Qt.EditRole) or 0)
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
+
+
+class ManifestPreviewDialog(QDialog):
+    """Shows what a delivery manifest will change before it is applied."""
+
+    def __init__(self, manifest, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Delivery Preview")
+        self.resize(800, 500)
+        layout = QVBoxLayout(self)
+
+        items = manifest["items"]
+        units = sum(item["quantity"] for item in items)
+        layout.addWidget(QLabel(
+            f"{manifest['lines']} lines read: {len(items)} products, {units} units to restock."))
+
+        table = QTableWidget(len(items), 7)
+        table.setHorizontalHeaderLabels(["Code", "Name", "Color", "Size", "Current Stock", "Delivered", "New Stock"])
+        table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for row, item in enumerate(items):
+            values = [item["code"], item["name"] or "", item["color"] or "", item["size"] or "",
+                      str(item["stock"]), f"+{item['quantity']}", str(item["new_stock"])]
+            for col, value in enumerate(values):
+                cell = QTableWidgetItem(value)
+                if col >= 4:
+                    cell.setTextAlignment(Qt.AlignCenter)
+                table.setItem(row, col, cell)
+        layout.addWidget(table)
+
+        problems = [f"Unknown code {entry['code']} (x{entry['quantity']})" for entry in manifest["unknown"]]
+        problems += manifest["errors"]
+        if problems:
+            layout.addWidget(QLabel(f"{len(problems)} lines will be skipped:"))
+            details = QPlainTextEdit("\n".join(problems))
+            details.setReadOnly(True)
+            details.setMaximumHeight(120)
+            layout.addWidget(details)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Cancel)
+        apply_btn = buttons.addButton("Apply Restock", QDialogButtonBox.AcceptRole)
+        apply_btn.setEnabled(bool(items))
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
 
 class StockWindow(QMainWindow):
     def __init__(self):
@@ -11,14 +285,28 @@ class StockWindow(QMainWindow):
         self.setWindowTitle("Stock / Inventory Management")
         self.setGeometry(200, 200, 900, 500)
         self.all_products = []  # Store all products for filtering
+        self.matcher = ProductMatcher([])
+
+        # Filter once typing pauses rather than on every keystroke
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.filter_products)
         
         self.init_ui()
         self.load_stock_data()
     
     def init_ui(self):
         """Initialize the stock management UI."""
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
+        self.tabs.addTab(self.init_restock_tab(), "Restock")
+        self.tabs.addTab(self.init_reorder_tab(), "Reorder")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
+    def init_restock_tab(self):
+        """Build the restock tab."""
         main_widget = QWidget()
-        self.setCentralWidget(main_widget)
         main_layout = QVBoxLayout()
         
         # Title
@@ -36,18 +324,26 @@ class StockWindow(QMainWindow):
         search_layout.addWidget(QLabel("Search (ID/Code/Name):"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Type ID, Code, or Product Name...")
-        self.search_input.textChanged.connect(self.filter_products)
+        self.search_input.textChanged.connect(self.filter_timer.start)
         search_layout.addWidget(self.search_input)
         main_layout.addLayout(search_layout)
         
-        # Stock table
-        self.stock_table = QTableWidget()
-        self.stock_table.setColumnCount(7)
-        self.stock_table.setHorizontalHeaderLabels(["ID", "Name", "Code", "Color", "Size", "Current Stock", "Restock Qty"])
+        # Stock table: a model/view pair, so only visible rows are ever painted
+        # and a spin box exists only for the cell being edited
+        self.stock_model = StockTableModel(self)
+        self.proxy_model = FilteredRowsProxyModel(self)
+        self.proxy_model.setSourceModel(self.stock_model)
+        self.stock_table = QTableView()
+        self.stock_table.setModel(self.proxy_model)
+        self.stock_table.setItemDelegateForColumn(RESTOCK_COLUMN, RestockSpinBoxDelegate(self.stock_table))
+        self.stock_table.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.stock_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.stock_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         
         # Set column widths
         self.stock_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.stock_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.stock_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Interactive)
+        self.stock_table.setColumnWidth(2, 160)
         
         main_layout.addWidget(self.stock_table)
         
@@ -58,134 +354,176 @@ class StockWindow(QMainWindow):
         apply_btn.setStyleSheet("background-color: green; color: white; font-weight: bold; padding: 10px;")
         apply_btn.clicked.connect(self.apply_restock)
         
+        import_btn = QPushButton("Import Delivery...")
+        import_btn.clicked.connect(self.import_delivery)
+        
         refresh_btn = QPushButton("Refresh")
         refresh_btn.clicked.connect(self.load_stock_data)
         
         button_layout.addWidget(apply_btn)
+        button_layout.addWidget(import_btn)
         button_layout.addWidget(refresh_btn)
         button_layout.addStretch()
         
         main_layout.addLayout(button_layout)
         
         main_widget.setLayout(main_layout)
+        return main_widget
+
+    def init_reorder_tab(self):
+        """Build the reorder forecast tab."""
+        reorder_widget = QWidget()
+        reorder_layout = QVBoxLayout()
+
+        self.reorder_summary = QLabel("Forecast from recent stock_log sales.")
+        self.reorder_summary.setStyleSheet("font-style: italic; color: #555;")
+        reorder_layout.addWidget(self.reorder_summary)
+
+        self.reorder_table = QTableWidget()
+        self.reorder_table.setColumnCount(8)
+        self.reorder_table.setHorizontalHeaderLabels(
+            ["ID", "Name", "Color", "Size", "Stock", "Demand/Day", "Days of Cover", "Reorder Qty"])
+        self.reorder_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.reorder_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        reorder_layout.addWidget(self.reorder_table)
+
+        button_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh Forecast")
+        refresh_btn.clicked.connect(self.load_reorder_data)
+        button_layout.addWidget(refresh_btn)
+        button_layout.addStretch()
+        reorder_layout.addLayout(button_layout)
+
+        reorder_widget.setLayout(reorder_layout)
+        return reorder_widget
+
+    def on_tab_changed(self, index):
+        """Compute the forecast the first time the Reorder tab is opened."""
+        if self.tabs.widget(index) is self.reorder_table.parentWidget() and self.reorder_table.rowCount() == 0:
+            self.load_reorder_data()
+
+    def load_reorder_data(self):
+        """Run the reorder forecast and list products that need restocking first."""
+        result = build_reorder_list()
+        self.reorder_table.setRowCount(0)
+        if not result["success"]:
+            self.reorder_summary.setText(f"Forecast failed: {result['error']}")
+            return
+
+        # Only products that sell are worth listing
+        items = [item for item in result["items"] if item["daily_demand"] > 0]
+        self.reorder_summary.setText(
+            f"{result['reorder_count']} products need reordering; {len(items)} products sold recently.")
+        self.reorder_table.setRowCount(len(items))
+        for row, item in enumerate(items):
+            cover = item["days_of_cover"]
+            values = [
+                str(item["product_id"]), item["name"] or "", item["color"] or "", item["size"] or "",
+                str(item["stock"]), f"{item['daily_demand']:.2f}",
+                "-" if cover is None else f"{cover:.1f}",
+                str(item["reorder_qty"]) if item["needs_reorder"] else ""
+            ]
+            for col, value in enumerate(values):
+                cell = QTableWidgetItem(value)
+                if col >= 4:
+                    cell.setTextAlignment(Qt.AlignCenter)
+                if item["needs_reorder"]:
+                    cell.setForeground(Qt.red)
+                self.reorder_table.setItem(row, col, cell)
     
     def load_stock_data(self):
         """Load all products with current stock levels."""
-        self.all_products = get_stock()
+        # Taken first, so changes made while loading are picked up by the next refresh
+        self.catalog_version = get_catalog_version()
+        # Only the columns the grid shows; price and discount are not needed here
+        self.all_products = get_products(STOCK_GRID_COLUMNS)
+        self.matcher = ProductMatcher(self.all_products)
         self.display_products(self.all_products)
+        self.filter_products()
     
+    def refresh(self):
+        """Pick up product changes made elsewhere, keeping pending restock quantities."""
+        changes = get_catalog_changes(self.catalog_version, STOCK_GRID_COLUMNS)
+        if changes["reload"]:
+            self.load_stock_data()
+            ids = {product.id for product in self.all_products}
+            self.stock_model.clear_pending([pid for pid in self.stock_model.pending if pid not in ids])
+        elif changes["rows"]:
+            # The model holds all_products itself, so this updates both
+            self.stock_model.update_products(changes["rows"])
+            self.catalog_version = changes["version"]
+            self.matcher = ProductMatcher(self.all_products)
+            self.filter_products()
+        else:
+            return
+        # Stock moved, so the forecast is stale: redo it if shown, else on next open
+        if self.tabs.currentWidget() is self.reorder_table.parentWidget():
+            self.load_reorder_data()
+        else:
+            self.reorder_table.setRowCount(0)
+
     def display_products(self, products):
         """Display products in the table."""
-        self.stock_table.setRowCount(0)
-        for product in products:
-            product_id, code, name, color, size, stock = product
-            row = self.stock_table.rowCount()
-            self.stock_table.insertRow(row)
-            
-            # ID (read-only)
-            id_item = QTableWidgetItem(str(product_id))
-            id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
-            self.stock_table.setItem(row, 0, id_item)
-            
-            # Name (read-only)
-            name_item = QTableWidgetItem(name)
-            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
-            self.stock_table.setItem(row, 1, name_item)
-            
-            # Code (read-only)
-            code_item = QTableWidgetItem(code if code else "N/A")
-            code_item.setFlags(code_item.flags() & ~Qt.ItemIsEditable)
-            self.stock_table.setItem(row, 2, code_item)
-            
-            # Color (read-only)
-            color_item = QTableWidgetItem(color if color else "N/A")
-            color_item.setFlags(color_item.flags() & ~Qt.ItemIsEditable)
-            self.stock_table.setItem(row, 3, color_item)
-            
-            # Size (read-only)
-            size_item = QTableWidgetItem(size if size else "N/A")
-            size_item.setFlags(size_item.flags() & ~Qt.ItemIsEditable)
-            self.stock_table.setItem(row, 4, size_item)
-            
-            # Current Stock (read-only)
-            stock_item = QTableWidgetItem(str(stock))
-            stock_item.setFlags(stock_item.flags() & ~Qt.ItemIsEditable)
-            stock_item.setTextAlignment(Qt.AlignCenter)
-            self.stock_table.setItem(row, 5, stock_item)
-            
-            # Restock Qty (editable spinbox)
-            spinbox = QSpinBox()
-            spinbox.setMinimum(0)
-            spinbox.setMaximum(9999)
-            spinbox.setValue(0)
-            self.stock_table.setCellWidget(row, 6, spinbox)
-            
-            # Store product_id in the table for later use
-            self.stock_table.item(row, 0).setData(Qt.UserRole, product_id)
+        self.stock_model.set_products(products)
     
     def filter_products(self):
         """Filter products based on search query (ID, Code, or Name)."""
-        search_text = self.search_input.text().strip().lower()
-        if not search_text:
-            self.display_products(self.all_products)
-            return
-        
-        filtered = []
-        for product in self.all_products:
-            product_id, code, name, color, size, stock = product
-            # Match ID, Code, or Name (case-insensitive)
-            if (str(product_id).lower().startswith(search_text) or
-                (code and code.lower().find(search_text) != -1) or
-                (name and name.lower().find(search_text) != -1)):
-                filtered.append(product)
-        
-        self.display_products(filtered)
+        self.filter_timer.stop()
+        self.proxy_model.set_rows(self.matcher.match(self.search_input.text()))
     
+    @profiled("apply_restock")
     def apply_restock(self):
-        """Apply restock quantities to products."""
-        restocked = []
-        errors = []
-        
-        for row in range(self.stock_table.rowCount()):
-            spinbox = self.stock_table.cellWidget(row, 6)
-            quantity = spinbox.value()
-            
-            if quantity > 0:
-                product_id_item = self.stock_table.item(row, 0)
-                product_id = product_id_item.data(Qt.UserRole)
-                product_name = self.stock_table.item(row, 1).text()
-                
-                result = restock_product(product_id, quantity)
-                
-                if result["success"]:
-                    restocked.append(f"{product_name}: +{quantity} units")
-                    spinbox.setValue(0)  # Reset spinbox
-                else:
-                    errors.append(f"{product_name}: {result['error']}")
-        
-        if not restocked and not errors:
+        """Apply every pending restock quantity in one transaction (all or nothing)."""
+        names = {product.id: product.name for product in self.all_products}
+
+        # Commit a spin box that is still open before reading the quantities
+        self.stock_table.setCurrentIndex(QModelIndex())
+        pending = sorted(self.stock_model.pending.items())
+        if not pending:
             QMessageBox.information(self, "No Changes", "No quantities were entered for restock.")
             return
-        
-        message = ""
-        if restocked:
-            message += "Restocked:\n" + "\n".join(restocked)
-        
-        if errors:
-            if message:
-                message += "\n\nErrors:\n"
-            message += "\n".join(errors)
-        
-        if restocked and not errors:
-            QMessageBox.information(self, "Restock Complete", message)
-        elif errors and restocked:
-            QMessageBox.warning(self, "Partial Success", message)
-        else:
-            QMessageBox.critical(self, "Restock Failed", message)
-        
+
+        result = restock_products(pending)
+        if not result["success"]:
+            # Nothing was written; the quantities stay in the grid to fix and retry
+            QMessageBox.critical(self, "Restock Failed", f"No stock was changed:\n{result['error']}")
+            return
+        self.stock_model.clear_pending([product_id for product_id, _ in pending])
+        message = f"Restocked {result['restocked']} products (+{result['units']} units)."
+        if len(pending) <= RESTOCK_LIST_LIMIT:
+            message += "\n\n" + "\n".join(f"{names.get(product_id, str(product_id))}: +{quantity} units"
+                                          for product_id, quantity in pending)
+        QMessageBox.information(self, "Restock Complete", message)
+
         # Refresh the display
         self.load_stock_data()
 
+    def import_delivery(self):
+        """Restock from a delivery manifest (CSV, JSON, JSON Lines or a scanner dump)."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Delivery", "",
+            "Delivery manifests (*.csv *.json *.jsonl *.txt);;All Files (*)")
+        if not path:
+            return
+        manifest = load_manifest(path)
+        if not manifest["success"]:
+            QMessageBox.critical(self, "Import Failed", f"Could not read the manifest:\n{manifest['error']}")
+            return
+        if not manifest["items"] and not manifest["unknown"] and not manifest["errors"]:
+            QMessageBox.information(self, "Import Delivery", "The manifest has no lines.")
+            return
+        if ManifestPreviewDialog(manifest, self).exec() != QDialog.Accepted:
+            return
+
+        result = apply_manifest(manifest["items"])
+        if result["success"]:
+            QMessageBox.information(
+                self, "Restock Complete",
+                f"Restocked {result['restocked']} products (+{result['units']} units).")
+        else:
+            QMessageBox.critical(self, "Restock Failed", result["error"])
+        self.load_stock_data()
+
 # Optional: for standalone testing
 if __name__ == "__main__":
     app = QApplication([])
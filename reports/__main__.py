@@ -0,0 +1,224 @@
+# reports/__main__.py
+# Headless reporting CLI for batch jobs and cron. Only the data layer is imported
+# (never PySide6/qrcode/PIL), and heavier modules are imported per command.
+#
+#   python -m reports summary --start 2026-01-01 --end 2026-01-31
+#   python -m reports print --date 2026-02-12
+#   python -m reports export-csv --start 2026-01-01 --end 2026-01-31
+#   python -m reports rebuild-rollups [--stale]
+#   python -m reports rebuild-index
+#   python -m reports compact --before 2026-01-01 --remove-json
+#   python -m reports reconcile --start 2026-01-01 --end 2026-01-31 --apply
+import argparse
+import json
+import sys
+from datetime import date as date_cls, datetime, timedelta
+
+
+def _date(value):
+    """argparse type for YYYY-MM-DD dates."""
+    try:
+        return date_cls.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def _range(args):
+    """Resolve --date/--start/--end into an inclusive (start, end) pair, default today."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    if getattr(args, "date", None):
+        return args.date, args.date
+    start = args.start or args.end or today
+    end = args.end or (today if args.start else start)
+    return start, end
+
+
+def _days(start, end):
+    day = date_cls.fromisoformat(start)
+    last = date_cls.fromisoformat(end)
+    while day <= last:
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+def cmd_summary(args):
+    from database.range_reports import get_range_report
+    start, end = _range(args)
+    result = get_range_report(start, end, max_workers=args.workers)
+    if not result["success"]:
+        print(result["error"], file=sys.stderr)
+        return 1
+    if args.json:
+        json.dump(result, sys.stdout, indent=2, default=str)
+        print()
+        return 0
+    totals = result["totals"]
+    print(f"Period:             {start} to {end} ({result['days_with_sales']} days with sales)")
+    print(f"Total Transactions: {totals['transaction_count']}")
+    print(f"Total Units Sold:   {totals['total_units_sold']}")
+    print(f"Total Sales:        {totals['total_sales']:.2f}")
+    print(f"Total Tax:          {totals['total_tax']:.2f}")
+    print(f"Total Revenue:      {totals['total_revenue']:.2f}")
+    return 0
+
+
+def cmd_print(args):
+    from database.reports import write_report, get_report_signature
+    start, end = _range(args)
+    for day in _days(start, end):
+        if start != end and get_report_signature(day) is None:
+            continue
+        write_report(sys.stdout, day)
+    return 0
+
+
+def cmd_export_csv(args):
+    from database.reports import export_daily_csv, get_report_signature
+    start, end = _range(args)
+    failures = 0
+    for day in _days(start, end):
+        if get_report_signature(day) is None:
+            continue
+        result = export_daily_csv(day)
+        if result["success"]:
+            print(result["csv_path"])
+        else:
+            failures += 1
+            print(f"{day}: {result['error']}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def cmd_rebuild_rollups(args):
+    from database.rollups import get_stale_days, rebuild_rollups
+    if args.stale:
+        days = get_stale_days()
+        if not days:
+            print("No days flagged stale")
+            return 0
+        start, end = days[0], days[-1]
+    else:
+        start, end = args.start, args.end
+    result = rebuild_rollups(start, end)
+    if not result["success"]:
+        print(result["error"], file=sys.stderr)
+        return 1
+    print(f"Rebuilt rollups from {result['days']} daily reports")
+    return 0
+
+
+def cmd_rebuild_index(args):
+    from database.reports import REPORTS_FOLDER
+    from database.range_reports import SUMMARY_INDEX_NAME, get_day_summaries
+    from database.archive import list_archived_days
+    days = sorted({p.stem[len("sales_"):] for p in REPORTS_FOLDER.glob("sales_*.json")}
+                  | set(list_archived_days()))
+    if not days:
+        print("No daily reports found")
+        return 0
+    (REPORTS_FOLDER / SUMMARY_INDEX_NAME).unlink(missing_ok=True)
+    result = get_day_summaries(days[0], days[-1], max_workers=args.workers)
+    if not result["success"]:
+        print(result["error"], file=sys.stderr)
+        return 1
+    print(f"Indexed {result['parsed']} daily reports")
+    return 0
+
+
+def cmd_compact(args):
+    from database.archive import compact_closed_days
+    results = compact_closed_days(before=args.before, remove_json=args.remove_json)
+    failures = 0
+    for day, result in results.items():
+        if result["success"]:
+            print(f"{day}: {result['json_bytes']} -> {result['archive_bytes']} bytes")
+        else:
+            failures += 1
+            print(f"{day}: {result['error']}", file=sys.stderr)
+    if not results:
+        print("Nothing to compact")
+    return 1 if failures else 0
+
+
+def cmd_reconcile(args):
+    from database.reconcile import reconcile_sales, apply_corrections
+    start, end = _range(args)
+    result = reconcile_sales(start, end, include_corrections=args.apply)
+    if not result["success"]:
+        print(result["error"], file=sys.stderr)
+        return 1
+    if args.json:
+        json.dump(result, sys.stdout, indent=2, default=str)
+        print()
+    else:
+        for d in result["discrepancies"]:
+            print(f"{d['date']}  #{d['product_id']:<6} {str(d['product_name'] or '')[:24]:<24} "
+                  f"report {d['report_units']:>5}  stock_log {d['stock_log_units']:>5}  {d['kind']}")
+        print(f"{len(result['discrepancies'])} discrepancies between {start} and {end}")
+    if args.apply:
+        applied = apply_corrections(result["corrections"])
+        if not applied["success"]:
+            print(applied["error"], file=sys.stderr)
+            return 1
+        print(f"Applied {applied['applied']} corrections", file=sys.stderr if args.json else sys.stdout)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m reports", description="Headless sales reporting tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_range(p):
+        p.add_argument("--date", type=_date, help="single day (YYYY-MM-DD)")
+        p.add_argument("--start", type=_date, help="first day of the range")
+        p.add_argument("--end", type=_date, help="last day of the range")
+
+    p = sub.add_parser("summary", help="print totals for a day or date range")
+    add_range(p)
+    p.add_argument("--json", action="store_true", help="print the full range report as JSON")
+    p.add_argument("--workers", type=int, default=None, help="parser processes (1 = in-process)")
+    p.set_defaults(func=cmd_summary)
+
+    p = sub.add_parser("print", help="print the formatted daily report(s)")
+    add_range(p)
+    p.set_defaults(func=cmd_print)
+
+    p = sub.add_parser("export-csv", help="export daily CSV files for a day or date range")
+    add_range(p)
+    p.set_defaults(func=cmd_export_csv)
+
+    p = sub.add_parser("rebuild-rollups", help="recompute the sales_rollup table from the daily reports")
+    p.add_argument("--start", type=_date)
+    p.add_argument("--end", type=_date)
+    p.add_argument("--stale", action="store_true",
+                   help="rebuild only the months of days flagged when a sale found the rollups out of step")
+    p.set_defaults(func=cmd_rebuild_rollups)
+
+    p = sub.add_parser("rebuild-index", help="rebuild the per-day summary cache from scratch")
+    p.add_argument("--workers", type=int, default=None, help="parser processes (1 = in-process)")
+    p.set_defaults(func=cmd_rebuild_index)
+
+    p = sub.add_parser("compact", help="archive closed days into the columnar format")
+    p.add_argument("--before", type=_date, help="archive days before this date (default today)")
+    p.add_argument("--remove-json", action="store_true", help="delete each JSON file once its archive is verified")
+    p.set_defaults(func=cmd_compact)
+
+    p = sub.add_parser("reconcile", help="compare stock_log sales with the daily reports")
+    add_range(p)
+    p.add_argument("--json", action="store_true", help="print discrepancies as JSON")
+    p.add_argument("--apply", action="store_true", help="write corrective stock_log entries and stock adjustments")
+    p.set_defaults(func=cmd_reconcile)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # Output piped into `head` or similar; not an error for a batch tool
+        sys.stderr.close()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
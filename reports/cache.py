@@ -0,0 +1,86 @@
+# reports/cache.py
+# Bounded LRU cache of parsed and rendered daily reports for ReportsWindow.
+# Entries are keyed by date and validated against the backing file's mtime and
+# size, so a hit costs one stat() and a day is re-read only after it changes.
+# Loads may run on worker threads (see reports/workers.py); the entry table is
+# guarded by a lock, while parsing itself happens outside it.
+import threading
+from collections import OrderedDict
+from database.reports import (load_daily_report_model, get_report_signature,
+                              format_stock_changes, render_report_page)
+
+# Enough for flipping through a month of reports
+MAX_CACHED_REPORTS = 40
+
+
+class CachedReport:
+    """A parsed day (DailyReport) plus everything rendered from it so far."""
+
+    __slots__ = ("date", "signature", "model", "stock_text", "pages", "page_count", "lock")
+
+    def __init__(self, date, signature, model):
+        self.date = date
+        self.signature = signature
+        self.model = model
+        self.stock_text = format_stock_changes(date, model.stock_changes)
+        self.pages = {}
+        self.page_count = None
+        # Pages are rendered by load jobs and by the GUI thread
+        self.lock = threading.Lock()
+
+    def page(self, page):
+        """Return (text, page_count, page) for a page, rendering it only once."""
+        with self.lock:
+            if self.page_count is not None:
+                page = min(max(page, 0), self.page_count - 1)
+            text = self.pages.get(page)
+            if text is None:
+                text, self.page_count = render_report_page(self.model, page)
+                page = min(max(page, 0), self.page_count - 1)
+                self.pages[page] = text
+            return text, self.page_count, page
+
+
+class ReportCache:
+    """LRU of CachedReport entries keyed by date and source file version."""
+
+    def __init__(self, max_entries=MAX_CACHED_REPORTS):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, date):
+        """Return {"success", "entry", "cached"} for `date`, parsing only on a miss."""
+        signature = get_report_signature(date)
+        with self.lock:
+            entry = self.entries.get(date)
+            if entry is not None and signature is not None and entry.signature == signature:
+                self.entries.move_to_end(date)
+                self.hits += 1
+                return {"success": True, "entry": entry, "cached": True}
+            self.misses += 1
+            self.entries.pop(date, None)
+
+        result = load_daily_report_model(date)
+        if not result["success"]:
+            return result
+        try:
+            entry = CachedReport(date, signature, result["model"])
+        except Exception as e:
+            return {"success": False, "error": f"Error generating report: {str(e)}"}
+        if signature is not None:
+            with self.lock:
+                self.entries[date] = entry
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return {"success": True, "entry": entry, "cached": False}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Shared by every ReportsWindow so reopening the window keeps the cache warm
+report_cache = ReportCache()
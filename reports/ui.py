@@ -1,8 +1,16 @@
 # reports/ui.py
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                               QPushButton, QTextEdit, QApplication, QDateEdit, QMessageBox)
-from PySide6.QtCore import Qt, QDate
-from database.reports import generate_report_text, get_daily_report, get_stock_changes_for_date, export_daily_csv
+                               QPushButton, QTextEdit, QApplication, QDateEdit, QMessageBox,
+                               QTabWidget, QPlainTextEdit, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QComboBox)
+from PySide6.QtCore import Qt, QDate, QDateTime, QPointF, QThreadPool
+from PySide6.QtGui import QPainter
+from PySide6.QtCharts import QChart, QChartView, QLineSeries, QDateTimeAxis, QValueAxis
+from database.reports import write_report
+from database.range_reports import generate_range_report_text
+from database.analytics import analyze_range
+from database.dashboard import get_chart_series
+from reports.workers import ReportJob
 from datetime import datetime
 
 class ReportsWindow(QMainWindow):
@@ -10,14 +18,35 @@ class ReportsWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Sales Reports")
         self.setGeometry(100, 100, 1000, 600)
+        self.current_entry = None
+        self.current_report = None
+        self.current_page = 0
+
+        # Report loads and exports run on the pool; results are tagged with a
+        # request id so a slow, superseded load never replaces a newer one
+        self.thread_pool = QThreadPool.globalInstance()
+        self.load_request_id = 0
+        # Every started load, superseded ones included, until its finished
+        # signal arrives: the pool does not own the jobs (setAutoDelete(False))
+        self.load_jobs = {}
+        self.export_request_id = 0
+        self.export_jobs = {}
         
         self.init_ui()
         self.load_today_report()
     
     def init_ui(self):
         """Initialize the reports UI."""
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
+        self.tabs.addTab(self.init_daily_tab(), "Daily")
+        self.tabs.addTab(self.init_range_tab(), "Date Range")
+        self.tabs.addTab(self.init_analytics_tab(), "Analytics")
+        self.tabs.addTab(self.init_dashboard_tab(), "Dashboard")
+
+    def init_daily_tab(self):
+        """Build the single-day report tab."""
         main_widget = QWidget()
-        self.setCentralWidget(main_widget)
         main_layout = QVBoxLayout()
         
         # Title
@@ -32,6 +61,7 @@ class ReportsWindow(QMainWindow):
         self.date_edit = QDateEdit()
         self.date_edit.setDate(QDate.currentDate())
         self.date_edit.setCalendarPopup(True)
+        self.date_edit.dateChanged.connect(self.load_report_by_date)
         date_layout.addWidget(self.date_edit)
         
         load_btn = QPushButton("Load Report")
@@ -46,10 +76,23 @@ class ReportsWindow(QMainWindow):
         main_layout.addLayout(date_layout)
         
         # Report display
-        self.report_text = QTextEdit()
+        # Report display: one page of transactions at a time
+        self.report_text = QPlainTextEdit()
         self.report_text.setReadOnly(True)
         self.report_text.setStyleSheet("font-family: Courier; font-size: 10px;")
         main_layout.addWidget(self.report_text)
+
+        pager_layout = QHBoxLayout()
+        self.prev_page_btn = QPushButton("< Prev")
+        self.prev_page_btn.clicked.connect(lambda: self.show_report_page(self.current_page - 1))
+        self.next_page_btn = QPushButton("Next >")
+        self.next_page_btn.clicked.connect(lambda: self.show_report_page(self.current_page + 1))
+        self.page_label = QLabel("")
+        pager_layout.addWidget(self.prev_page_btn)
+        pager_layout.addWidget(self.page_label)
+        pager_layout.addWidget(self.next_page_btn)
+        pager_layout.addStretch()
+        main_layout.addLayout(pager_layout)
         
         # Stock changes section
         stock_title = QLabel("Stock Changes Summary")
@@ -71,52 +114,306 @@ class ReportsWindow(QMainWindow):
         print_btn = QPushButton("Print/Save Report")
         print_btn.clicked.connect(self.save_report)
 
-        export_csv_btn = QPushButton("Export CSV")
-        export_csv_btn.clicked.connect(self.export_csv)
+        self.export_csv_btn = QPushButton("Export CSV")
+        self.export_csv_btn.clicked.connect(self.export_csv)
         
         button_layout.addWidget(refresh_btn)
         button_layout.addWidget(print_btn)
-        button_layout.addWidget(export_csv_btn)
+        button_layout.addWidget(self.export_csv_btn)
         button_layout.addStretch()
         
         main_layout.addLayout(button_layout)
         
         main_widget.setLayout(main_layout)
+        return main_widget
+
+    def init_range_tab(self):
+        """Build the multi-day range report tab."""
+        range_widget = QWidget()
+        range_layout = QVBoxLayout()
+
+        title = QLabel("Date Range Reports")
+        title.setStyleSheet("font-weight: bold; font-size: 14px;")
+        range_layout.addWidget(title)
+
+        picker_layout = QHBoxLayout()
+        picker_layout.addWidget(QLabel("From:"))
+        self.range_start_edit = QDateEdit()
+        self.range_start_edit.setDate(QDate.currentDate().addDays(-29))
+        self.range_start_edit.setCalendarPopup(True)
+        picker_layout.addWidget(self.range_start_edit)
+
+        picker_layout.addWidget(QLabel("To:"))
+        self.range_end_edit = QDateEdit()
+        self.range_end_edit.setDate(QDate.currentDate())
+        self.range_end_edit.setCalendarPopup(True)
+        picker_layout.addWidget(self.range_end_edit)
+
+        load_range_btn = QPushButton("Load Range")
+        load_range_btn.clicked.connect(self.load_range_report)
+        picker_layout.addWidget(load_range_btn)
+        picker_layout.addStretch()
+        range_layout.addLayout(picker_layout)
+
+        self.range_text = QTextEdit()
+        self.range_text.setReadOnly(True)
+        self.range_text.setStyleSheet("font-family: Courier; font-size: 10px;")
+        range_layout.addWidget(self.range_text)
+
+        range_widget.setLayout(range_layout)
+        return range_widget
+
+    def init_analytics_tab(self):
+        """Build the product velocity analytics tab."""
+        analytics_widget = QWidget()
+        analytics_layout = QVBoxLayout()
+
+        title = QLabel("Product Velocity")
+        title.setStyleSheet("font-weight: bold; font-size: 14px;")
+        analytics_layout.addWidget(title)
+
+        picker_layout = QHBoxLayout()
+        picker_layout.addWidget(QLabel("From:"))
+        self.analytics_start_edit = QDateEdit()
+        self.analytics_start_edit.setDate(QDate.currentDate().addDays(-29))
+        self.analytics_start_edit.setCalendarPopup(True)
+        picker_layout.addWidget(self.analytics_start_edit)
+
+        picker_layout.addWidget(QLabel("To:"))
+        self.analytics_end_edit = QDateEdit()
+        self.analytics_end_edit.setDate(QDate.currentDate())
+        self.analytics_end_edit.setCalendarPopup(True)
+        picker_layout.addWidget(self.analytics_end_edit)
+
+        analyze_btn = QPushButton("Analyze")
+        analyze_btn.clicked.connect(self.load_analytics)
+        picker_layout.addWidget(analyze_btn)
+        picker_layout.addStretch()
+        analytics_layout.addLayout(picker_layout)
+
+        self.analytics_summary = QLabel("")
+        analytics_layout.addWidget(self.analytics_summary)
+
+        self.analytics_table = QTableWidget()
+        self.analytics_table.setColumnCount(7)
+        self.analytics_table.setHorizontalHeaderLabels(
+            ["ID", "Product", "Units", "Revenue", "ABC", "Sell-through", "Growth"])
+        self.analytics_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.analytics_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        analytics_layout.addWidget(self.analytics_table)
+
+        analytics_widget.setLayout(analytics_layout)
+        return analytics_widget
+
+    def init_dashboard_tab(self):
+        """Build the sales dashboard tab (charts from the rollup tables)."""
+        dashboard_widget = QWidget()
+        dashboard_layout = QVBoxLayout()
+
+        picker_layout = QHBoxLayout()
+        picker_layout.addWidget(QLabel("From:"))
+        self.dashboard_start_edit = QDateEdit()
+        self.dashboard_start_edit.setDate(QDate.currentDate().addDays(-89))
+        self.dashboard_start_edit.setCalendarPopup(True)
+        picker_layout.addWidget(self.dashboard_start_edit)
+
+        picker_layout.addWidget(QLabel("To:"))
+        self.dashboard_end_edit = QDateEdit()
+        self.dashboard_end_edit.setDate(QDate.currentDate())
+        self.dashboard_end_edit.setCalendarPopup(True)
+        picker_layout.addWidget(self.dashboard_end_edit)
+
+        self.dashboard_metric_combo = QComboBox()
+        for label, metric in (("Revenue", "revenue"), ("Units", "units"), ("Transactions", "transactions")):
+            self.dashboard_metric_combo.addItem(label, metric)
+        picker_layout.addWidget(self.dashboard_metric_combo)
+
+        self.dashboard_dimension_combo = QComboBox()
+        for label, dimension in (("Store total", "all"), ("By product", "product"),
+                                 ("By payment method", "payment_method")):
+            self.dashboard_dimension_combo.addItem(label, dimension)
+        picker_layout.addWidget(self.dashboard_dimension_combo)
+
+        self.dashboard_grain_combo = QComboBox()
+        for label, grain in (("Daily", "day"), ("Hourly", "hour"), ("Monthly", "month")):
+            self.dashboard_grain_combo.addItem(label, grain)
+        picker_layout.addWidget(self.dashboard_grain_combo)
+
+        plot_btn = QPushButton("Plot")
+        plot_btn.clicked.connect(self.load_dashboard)
+        picker_layout.addWidget(plot_btn)
+        picker_layout.addStretch()
+        dashboard_layout.addLayout(picker_layout)
+
+        self.dashboard_chart = QChart()
+        self.dashboard_chart.legend().setAlignment(Qt.AlignBottom)
+        self.dashboard_view = QChartView(self.dashboard_chart)
+        self.dashboard_view.setRenderHint(QPainter.Antialiasing)
+        dashboard_layout.addWidget(self.dashboard_view)
+
+        self.dashboard_summary = QLabel("")
+        dashboard_layout.addWidget(self.dashboard_summary)
+
+        dashboard_widget.setLayout(dashboard_layout)
+        return dashboard_widget
+
+    def load_dashboard(self):
+        """Plot the selected metric and breakdown from the pre-aggregated rollups."""
+        start = self.dashboard_start_edit.date().toString("yyyy-MM-dd")
+        end = self.dashboard_end_edit.date().toString("yyyy-MM-dd")
+        metric = self.dashboard_metric_combo.currentData()
+        grain = self.dashboard_grain_combo.currentData()
+        result = get_chart_series(metric, self.dashboard_dimension_combo.currentData(), start, end, grain)
+
+        chart = self.dashboard_chart
+        chart.removeAllSeries()
+        for axis in chart.axes():
+            chart.removeAxis(axis)
+        if not result["success"]:
+            self.dashboard_summary.setText(f"Dashboard failed: {result['error']}")
+            return
+        if not any(s["x"] for s in result["series"]):
+            self.dashboard_summary.setText(f"No sales recorded between {start} and {end}")
+            return
+
+        # Buckets are UTC-based; shift them so the axis (local time) shows the bucket itself
+        offset = QDateTime.currentDateTime().offsetFromUtc() * 1000
+        x_axis = QDateTimeAxis()
+        x_axis.setFormat({"hour": "MM-dd HH:00", "day": "yyyy-MM-dd", "month": "yyyy-MM"}[grain])
+        x_axis.setTickCount(8)
+        y_axis = QValueAxis()
+        y_axis.setLabelFormat("%.0f")
+        chart.addAxis(x_axis, Qt.AlignBottom)
+        chart.addAxis(y_axis, Qt.AlignLeft)
+
+        label = self.dashboard_metric_combo.currentText()
+        low, high = 0.0, 0.0
+        totals = []
+        for data in result["series"]:
+            series = QLineSeries()
+            series.setName(data["label"])
+            series.replace([QPointF(x - offset, y) for x, y in zip(data["x"], data["y"])])
+            chart.addSeries(series)
+            series.attachAxis(x_axis)
+            series.attachAxis(y_axis)
+            if data["y"]:
+                high = max(high, max(data["y"]))
+            totals.append(f"{data['label']}: {data['total']:,.0f}")
+        y_axis.setRange(low, high * 1.05 or 1)
+        chart.setTitle(f"{label}, {start} to {end}")
+        self.dashboard_summary.setText(" | ".join(totals))
+
+    def load_analytics(self):
+        """Run velocity analytics for the selected range and show the top sellers."""
+        start = self.analytics_start_edit.date().toString("yyyy-MM-dd")
+        end = self.analytics_end_edit.date().toString("yyyy-MM-dd")
+        result = analyze_range(start, end, top=50)
+        self.analytics_table.setRowCount(0)
+        if not result["success"]:
+            self.analytics_summary.setText(f"Analytics failed: {result['error']}")
+            return
+
+        prev = result["previous_revenue"]
+        change = f"{(result['total_revenue'] - prev) / prev * 100:+.1f}%" if prev else "n/a"
+        counts = result["abc_counts"]
+        self.analytics_summary.setText(
+            f"{result['product_count']} products, {result['line_count']} sale lines. "
+            f"Revenue ${result['total_revenue']:.2f} ({change} vs {result['previous_start']} to {result['previous_end']}). "
+            f"ABC: {counts['A']} A / {counts['B']} B / {counts['C']} C"
+        )
+        rows = result["top_products"]
+        self.analytics_table.setRowCount(len(rows))
+        for row, data in enumerate(rows):
+            growth = "new" if data["growth"] is None else f"{data['growth'] * 100:+.1f}%"
+            values = [str(data["product_id"]), data["product_name"] or "", str(data["units"]),
+                      f"{data['revenue']:.2f}", data["abc_class"], f"{data['sell_through'] * 100:.1f}%", growth]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col in (2, 3, 5, 6):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.analytics_table.setItem(row, col, item)
+
+    def load_range_report(self):
+        """Load the merged report for the selected date range."""
+        start = self.range_start_edit.date().toString("yyyy-MM-dd")
+        end = self.range_end_edit.date().toString("yyyy-MM-dd")
+        self.range_text.setText(generate_range_report_text(start, end))
     
     def load_today_report(self):
         """Load today's report."""
-        self.date_edit.setDate(QDate.currentDate())
-        self.load_report_by_date()
+        today = QDate.currentDate()
+        if self.date_edit.date() == today:
+            self.load_report_by_date()
+        else:
+            # dateChanged starts the load
+            self.date_edit.setDate(today)
     
     def load_report_by_date(self):
-        """Load report for selected date."""
+        """Start loading the report for the selected date in the background."""
         date_str = self.date_edit.date().toString("yyyy-MM-dd")
-        
-        # Load full report
-        report_text = generate_report_text(date_str)
-        self.report_text.setText(report_text)
-        
-        # Load stock changes
-        result = get_stock_changes_for_date(date_str)
+
+        # Only the newest request matters; stop whatever is still loading
+        for job in self.load_jobs.values():
+            job.cancel()
+        self.load_request_id += 1
+        job = ReportJob(self.load_request_id, date_str)
+        job.signals.progress.connect(self.on_job_progress)
+        job.signals.finished.connect(self.on_report_loaded)
+        self.load_jobs[self.load_request_id] = job
+
+        self.prev_page_btn.setEnabled(False)
+        self.next_page_btn.setEnabled(False)
+        self.thread_pool.start(job)
+
+    def refresh(self):
+        """Re-check the shown day; when its file is unchanged this is a cache hit."""
+        self.load_report_by_date()
+
+    def on_job_progress(self, request_id, message):
+        """Show progress from the current load or export in the status bar."""
+        if request_id == self.load_request_id or request_id in self.export_jobs:
+            self.statusBar().showMessage(message)
+
+    def on_report_loaded(self, request_id, result):
+        """Release a finished load; display it unless a newer request has replaced it."""
+        self.load_jobs.pop(request_id, None)
+        if request_id != self.load_request_id or result.get("cancelled"):
+            return
+        self.statusBar().clearMessage()
+        date_str = self.date_edit.date().toString("yyyy-MM-dd")
+
         if result["success"]:
-            changes = result["stock_changes"]
-            if not changes:
-                stock_text = f"No sales recorded for {date_str}"
-            else:
-                stock_text = f"Stock Changes for {date_str}:\n" + "=" * 60 + "\n\n"
-                for product_id, data in sorted(changes.items()):
-                    stock_text += f"Product ID {product_id}: {data['product_name']}\n"
-                    stock_text += f"  Units Sold: {data['quantity_sold']}\n"
-                    stock_text += f"  Revenue: ${data['revenue']:.2f}\n\n"
+            # An unchanged day comes back as the same cache entry; stay on the page shown
+            page = self.current_page if result["entry"] is self.current_entry else 0
+            self.current_entry = result["entry"]
+            self.current_report = self.current_entry.model
+            self.show_report_page(page)
+            self.stock_text.setText(self.current_entry.stock_text)
         else:
-            stock_text = f"No data available for {date_str}\n{result['error']}"
-        
-        self.stock_text.setText(stock_text)
+            self.current_entry = None
+            self.current_report = None
+            self.report_text.setPlainText(result["error"])
+            self.page_label.setText("")
+            self.prev_page_btn.setEnabled(False)
+            self.next_page_btn.setEnabled(False)
+            self.stock_text.setText(f"No data available for {date_str}\n{result['error']}")
     
+    def show_report_page(self, page):
+        """Render one page of the loaded report into the viewer."""
+        if self.current_entry is None:
+            return
+        try:
+            text, page_count, self.current_page = self.current_entry.page(page)
+        except Exception as e:
+            text, page_count, self.current_page = f"Error generating report: {str(e)}", 1, 0
+        self.report_text.setPlainText(text)
+        self.page_label.setText(f"Page {self.current_page + 1} of {page_count}")
+        self.prev_page_btn.setEnabled(self.current_page > 0)
+        self.next_page_btn.setEnabled(self.current_page < page_count - 1)
+
     def save_report(self):
         """Save/print the report."""
         date_str = self.date_edit.date().toString("yyyy-MM-dd")
-        report_text = self.report_text.toPlainText()
         
         try:
             # Save to file
@@ -125,22 +422,46 @@ class ReportsWindow(QMainWindow):
             exports_folder.mkdir(exist_ok=True)
             
             filename = exports_folder / f"report_{date_str}.txt"
+            # Stream every page straight to the file, not just the visible one
             with open(filename, 'w') as f:
-                f.write(report_text)
+                report = self.current_report
+                if report is not None and report.date != date_str:
+                    report = None
+                write_report(f, date_str, report)
             
             QMessageBox.information(self, "Success", f"Report saved to:\n{filename}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save report:\n{str(e)}")
 
     def export_csv(self):
-        """Export the selected day's report to CSV."""
+        """Export the selected day's report to CSV in the background."""
         date_str = self.date_edit.date().toString("yyyy-MM-dd")
-        result = export_daily_csv(date_str)
+        # Export request ids are negative so they never collide with loads
+        self.export_request_id -= 1
+        job = ReportJob(self.export_request_id, date_str, export_csv=True)
+        job.signals.progress.connect(self.on_job_progress)
+        job.signals.finished.connect(self.on_csv_exported)
+        self.export_jobs[self.export_request_id] = job
+        self.export_csv_btn.setEnabled(False)
+        self.thread_pool.start(job)
+
+    def on_csv_exported(self, request_id, result):
+        """Report the outcome of a background CSV export."""
+        self.export_jobs.pop(request_id, None)
+        if not self.export_jobs:
+            self.export_csv_btn.setEnabled(True)
+        self.statusBar().clearMessage()
         if result.get("success"):
             QMessageBox.information(self, "Exported", f"CSV exported to:\n{result['csv_path']}")
         else:
             QMessageBox.critical(self, "Error", f"Failed to export CSV:\n{result.get('error')}")
 
+    def closeEvent(self, event):
+        """Cancel pending loads; they stay referenced until they report back."""
+        for job in self.load_jobs.values():
+            job.cancel()
+        super().closeEvent(event)
+
 # Optional: for standalone testing
 if __name__ == "__main__":
     app = QApplication([])
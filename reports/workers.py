@@ -0,0 +1,69 @@
+# reports/workers.py
+# Background report jobs for ReportsWindow. Each job runs on a QThreadPool
+# thread and reports back through queued signals tagged with the caller's
+# request id, so the window can drop results from requests it has superseded.
+from PySide6.QtCore import QObject, QRunnable, Signal
+from database.reports import export_daily_csv
+from reports.cache import report_cache
+
+
+class ReportJobSignals(QObject):
+    """Signals for a ReportJob (QRunnable itself cannot emit)."""
+    progress = Signal(int, str)         # request id, message
+    finished = Signal(int, object)      # request id, result dict
+
+
+class ReportJob(QRunnable):
+    """Load (and optionally export) one day's report off the GUI thread.
+
+    The result dict follows the usual {"success", ...} shape; on success it
+    carries the CachedReport as `entry`, and `csv_path` when exporting.
+    Cancellation is checked between stages. A cancelled job still emits
+    finished, with {"success": False, "cancelled": True}, so the window knows
+    when it may drop its reference.
+    """
+
+    def __init__(self, request_id, date, export_csv=False):
+        super().__init__()
+        self.request_id = request_id
+        self.date = date
+        self.export_csv = export_csv
+        self.cancelled = False
+        self.signals = ReportJobSignals()
+        # The window keeps the reference; the pool must not delete it under Python
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            result = self._run()
+        except Exception as e:
+            result = {"success": False, "error": f"Error generating report: {str(e)}"}
+        if result is None or self.cancelled:
+            result = {"success": False, "cancelled": True, "error": "Cancelled"}
+        self.signals.finished.emit(self.request_id, result)
+
+    def _run(self):
+        self.signals.progress.emit(self.request_id, f"Loading report for {self.date}...")
+        loaded = report_cache.load(self.date)
+        if self.cancelled:
+            return None
+        if not loaded["success"]:
+            return loaded
+        entry = loaded["entry"]
+
+        if self.export_csv:
+            self.signals.progress.emit(self.request_id, f"Exporting CSV for {self.date}...")
+            result = export_daily_csv(self.date, model=entry.model)
+            if not result["success"]:
+                return result
+            return {"success": True, "entry": entry, "csv_path": result["csv_path"]}
+
+        # Render the first page here so the window only has to display it
+        self.signals.progress.emit(self.request_id, f"Rendering report for {self.date}...")
+        entry.page(0)
+        if self.cancelled:
+            return None
+        return {"success": True, "entry": entry, "cached": loaded["cached"]}
@@ -0,0 +1,12 @@
+# tests/test_archive.py
+# Columnar archive round trips, via the checks in benchmarks/archive.py.
+# Run from the project root: python -m pytest tests
+from benchmarks.archive import check_compact_rebuild, check_round_trip
+
+
+def test_archive_keeps_value_types():
+    assert check_round_trip() == []
+
+
+def test_compact_then_rebuild_keeps_summaries():
+    assert check_compact_rebuild(days=5) == []
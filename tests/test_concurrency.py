@@ -0,0 +1,31 @@
+# tests/test_concurrency.py
+# Several processes sharing one store, as several registers do. Each test runs
+# the matching benchmark check on a temporary store and asserts on its result.
+# Run from the project root: python -m pytest tests
+import pytest
+from benchmarks.load import run_level
+from benchmarks.sequence import check_sequence
+
+# A small store keeps each level to a few seconds
+STORE_PARAMS = {"products": 200, "colors": 2, "sizes": 2, "history_days": 5,
+                "log_per_day": 10, "report_days": 1, "sales_per_day": 20}
+
+
+@pytest.mark.parametrize("block_size", [1, 10])
+def test_invoice_sequence_across_processes(block_size):
+    _, gaps, problems = check_sequence(lanes=4, per_lane=50, block_size=block_size)
+    assert problems == []
+    if block_size == 1:
+        assert gaps == 0
+
+
+def test_log_sale_across_processes():
+    level = run_level(lanes=4, seconds=2, store_params=STORE_PARAMS)
+    assert level["sales"] > 0
+    assert level["log_errors"] == 0 and level["checkout_errors"] == 0, level["errors"]
+    assert level["lost_entries"] == 0
+    assert level["duplicated_entries"] == 0
+    assert level["duplicate_invoices"] == 0
+    assert level["corrupt_reports"] == 0
+    assert level["unreported_units"] == 0
+    assert level["sequence_gaps"] == 0